@@ -0,0 +1,156 @@
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from weakref import WeakKeyDictionary
+
+from web3 import Web3
+
+INDEXED_KINDS = ('function', 'error', 'event')
+
+
+def canonical_type(param):
+    """ABI type as used in signatures, expanding tuples into their component types."""
+    abi_type = param['type']
+    if abi_type.startswith('tuple'):
+        inner = ','.join(canonical_type(c) for c in param.get('components', []))
+        return f"({inner}){abi_type[len('tuple'):]}"
+    return abi_type
+
+
+def signature_text(fragment):
+    return f"{fragment['name']}({','.join(canonical_type(p) for p in fragment.get('inputs', []))})"
+
+
+@lru_cache(maxsize=65536)
+def _signature_digest(signature):
+    # Saved ABIs repeat the same standard signatures (ERC-20, Ownable, ...) a lot
+    digest = Web3.keccak(text=signature).hex()
+    return digest[2:] if digest.startswith('0x') else digest
+
+
+def abi_selectors(abi):
+    """Yields (kind, selector, signature, fragment) for every function, error and event.
+
+    Functions and errors use the 4-byte selector, events the full 32-byte topic0.
+    """
+    for fragment in abi:
+        kind = fragment.get('type')
+        if kind not in INDEXED_KINDS or 'name' not in fragment:
+            continue
+        signature = signature_text(fragment)
+        digest = _signature_digest(signature)
+        selector = '0x' + (digest if kind == 'event' else digest[:8])
+        yield kind, selector, signature, fragment
+
+
+class SelectorIndex:
+    """In-memory map of (kind, selector) to the saved contracts that define it."""
+
+    def __init__(self):
+        self.entries = {}  # (kind, selector) -> list of entry dicts
+        self.lock = threading.Lock()
+
+    def add(self, contract_id, contract_name, rows):
+        """Registers (kind, selector, signature, fragment) rows for one contract."""
+        with self.lock:
+            for kind, selector, signature, fragment in rows:
+                self.entries.setdefault((kind, selector), []).append({
+                    'contract_id': contract_id,
+                    'contract_name': contract_name,
+                    'signature': signature,
+                    'fragment': fragment,
+                })
+
+    def remove(self, contract_id):
+        with self.lock:
+            for key in list(self.entries):
+                remaining = [e for e in self.entries[key] if e['contract_id'] != contract_id]
+                if remaining:
+                    self.entries[key] = remaining
+                else:
+                    del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def lookup(self, kind, selector, contract_id=None):
+        """All entries for a selector, those of `contract_id` (if given) first."""
+        matches = self.entries.get((kind, selector.lower()), [])
+        if contract_id is not None:
+            matches = sorted(matches, key=lambda e: e['contract_id'] != contract_id)
+        return matches
+
+
+# Global instance
+selector_index = SelectorIndex()
+
+
+class AbiCache:
+    """LRU of parsed ABIs and per-Web3 contract factories, keyed by ContractABI.id.
+
+    Entries must be invalidated whenever a contract row is deleted or its id could be
+    reused (SQLite recycles the highest rowid), so callers drop them on delete, clear
+    and import.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # contract_id -> {'abi': list, 'factories': {w3: factory}}
+        self.lock = threading.Lock()
+        # Bumped on every invalidation so an ABI loaded concurrently with a delete is not stored
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, contract_id, load_abi_text):
+        with self.lock:
+            entry = self.entries.get(contract_id)
+            if entry is not None:
+                self.entries.move_to_end(contract_id)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            version = self.version
+        abi_text = load_abi_text()
+        if abi_text is None:
+            return None
+        entry = {'abi': json.loads(abi_text), 'factories': WeakKeyDictionary()}
+        with self.lock:
+            if version != self.version:
+                return entry
+            self.entries[contract_id] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return entry
+
+    def abi(self, contract_id, load_abi_text):
+        """Parsed ABI (shared; do not mutate), or None if `load_abi_text` returns None."""
+        entry = self._entry(contract_id, load_abi_text)
+        return entry['abi'] if entry else None
+
+    def factory(self, w3, contract_id, load_abi_text):
+        """Address-less contract class for `w3`; call it with address=... for an instance."""
+        entry = self._entry(contract_id, load_abi_text)
+        if entry is None:
+            return None
+        factory = entry['factories'].get(w3)
+        if factory is None:
+            factory = w3.eth.contract(abi=entry['abi'])
+            entry['factories'][w3] = factory
+        return factory
+
+    def invalidate(self, contract_id):
+        with self.lock:
+            self.entries.pop(contract_id, None)
+            self.version += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.version += 1
+
+
+# Global instance
+abi_cache = AbiCache()
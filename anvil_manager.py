@@ -1,18 +1,108 @@
 import subprocess
 import time
 import os
+import fcntl
 import signal
+import socket
 import threading
+import itertools
+import hashlib
+import shutil
 from collections import deque
 
-class AnvilManager:
-    def __init__(self, port=8545):
+import requests
+
+DEFAULT_FORK = 'default'
+
+
+class AnvilError(Exception):
+    pass
+
+
+class ForkExistsError(AnvilError):
+    """A named fork with that name is already running."""
+
+
+class PoolFullError(AnvilError):
+    """Starting another fork would exceed max_forks."""
+
+
+class AnvilLockedError(AnvilError):
+    """Another server process manages the Anvil forks."""
+
+
+class AnvilDisabledError(AnvilError):
+    """Anvil forks are turned off for this server (ANVIL_ENABLED)."""
+
+
+def _free_port():
+    """A port the OS considers free right now."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _port_accepts(port, timeout=0.2):
+    """Whether something accepts TCP connections on localhost:`port`."""
+    try:
+        with socket.create_connection(('127.0.0.1', port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def fork_key(fork_url, chain_id=None, fork_block_number=None):
+    """Identifies a fork configuration: forks with equal keys start from identical chain state."""
+    return (fork_url, chain_id, fork_block_number)
+
+
+class AnvilFork:
+    """One Anvil process: its port, configuration, log ring and snapshot generation."""
+
+    def __init__(self, name, port, max_log_bytes=1024 * 1024, state_dir=None):
+        self.name = name
+        self.state_dir = state_dir
         self.process = None
         self.port = port
         self.current_config = {}
         self.lock = threading.Lock()
-        self.logs = deque(maxlen=2000) # Store last 2000 lines
+        # Ring of (seq, line) bounded by total line bytes; seq keeps growing across restarts
+        self.logs = deque()
+        self.log_bytes = 0
+        self.max_log_bytes = max_log_bytes
+        self.next_seq = 1
+        self.log_cond = threading.Condition()
         self.stop_logging = threading.Event()
+        # Bumped on every evm_revert: cached chain data from before the revert is stale
+        self.generation = 0
+        self.session = requests.Session()
+        # Timings of the latest start, see start() and wait_until_serving()
+        self.startup = {}
+
+    @property
+    def rpc_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def key(self):
+        config = self.current_config
+        return fork_key(config.get('fork_url'), config.get('chain_id'), config.get('fork_block_number'))
+
+    def cache_path(self, fork_url, chain_id=None, fork_block_number=None):
+        """Anvil's cache directory for a configuration, or None if its remote data can't be reused.
+
+        Only forks pinned to a block are cached: at 'latest' the remote chain moves on
+        and yesterday's data would be wrong.
+        """
+        if not self.state_dir or fork_block_number is None:
+            return None
+        digest = hashlib.sha256(f"{fork_url}|{chain_id}".encode()).hexdigest()[:16]
+        return os.path.join(self.state_dir, f"{digest}-{fork_block_number}")
+
+    @property
+    def scope_id(self):
+        """Identifies this fork's chain state: changes on restart and on revert."""
+        return f"{self.current_config.get('start_time')}:{self.generation}"
 
     def _log_reader(self, proc):
         """Reads stdout from the process and appends to logs."""
@@ -23,8 +113,7 @@ class AnvilManager:
                 try:
                     decoded_line = line.decode('utf-8', errors='replace').rstrip()
                     if decoded_line:
-                        with self.lock:
-                            self.logs.append(decoded_line)
+                        self._append_log(decoded_line)
                 except Exception:
                     pass
         except ValueError:
@@ -33,37 +122,50 @@ class AnvilManager:
             if proc.stdout:
                 proc.stdout.close()
 
+    def _append_log(self, line):
+        with self.log_cond:
+            self.logs.append((self.next_seq, line))
+            self.next_seq += 1
+            self.log_bytes += len(line)
+            while self.log_bytes > self.max_log_bytes and len(self.logs) > 1:
+                _, dropped = self.logs.popleft()
+                self.log_bytes -= len(dropped)
+            self.log_cond.notify_all()
+
     def is_running(self):
         with self.lock:
             return self.process is not None and self.process.poll() is None
 
-    def _kill_process_on_port(self):
-        """Finds and kills any process listening on the configured port."""
-        try:
-            # lsof -t -i:PORT returns the PID of the process
-            pid_str = subprocess.check_output(["lsof", "-t", "-i", f":{self.port}"]).decode().strip()
-            if pid_str:
-                pids = pid_str.split('\n')
-                for pid in pids:
-                    if pid:
-                        print(f"Force killing process {pid} on port {self.port}")
-                        os.kill(int(pid), signal.SIGKILL)
-                time.sleep(1) # Give OS a moment to release the port
-        except (subprocess.CalledProcessError, ValueError, OSError):
-            pass # No process found or error killing it
-
-    def start_fork(self, fork_url, chain_id=None):
-        self.stop() # Stop any existing instance managed by this class
-        self._kill_process_on_port() # Ensure port is free regardless of who owns it
+    def start(self, fork_url, chain_id=None, fork_block_number=None, reset_state=False):
+        """Spawns Anvil; it is not serving yet, see wait_until_serving().
 
+        With a `fork_block_number` and a state directory, Anvil keeps the accounts and
+        storage it fetched from the remote node in a cache directory of that exact
+        configuration, so the next fork skips refetching them. Only remote data is
+        cached, never local transactions: every fork starts clean, and forks of the same
+        configuration can share the directory. `reset_state` discards it.
+        """
         cmd = ["anvil", "--port", str(self.port), "--fork-url", fork_url]
         if chain_id:
             cmd.extend(["--chain-id", str(chain_id)])
-        
+        if fork_block_number is not None:
+            cmd.extend(["--fork-block-number", str(fork_block_number)])
+
+        cache_path = self.cache_path(fork_url, chain_id, fork_block_number)
+        state_reused = False
+        if cache_path:
+            if reset_state:
+                shutil.rmtree(cache_path, ignore_errors=True)
+            os.makedirs(cache_path, exist_ok=True)
+            state_reused = bool(os.listdir(cache_path))
+            # Anvil's own fork cache, on unless --no-storage-caching; unlike --state it never
+            # loads or dumps the local chain
+            cmd.extend(["--cache-path", cache_path])
+
         cmd.extend(["--host", "0.0.0.0"])
 
-        print(f"Starting Anvil: {' '.join(cmd)}")
-        
+        print(f"Starting Anvil ({self.name}): {' '.join(cmd)}")
+
         with self.lock:
             try:
                 # Merge stderr into stdout to capture everything in one stream
@@ -73,21 +175,26 @@ class AnvilManager:
                     stderr=subprocess.STDOUT,
                     preexec_fn=os.setsid
                 )
-                
-                self.logs.clear()
+
+                with self.log_cond:
+                    self.logs.clear()
+                    self.log_bytes = 0
                 self.stop_logging.clear()
-                
+
                 # Start logging thread
                 t = threading.Thread(target=self._log_reader, args=(self.process,))
                 t.daemon = True
                 t.start()
 
+                self.generation = 0
                 self.current_config = {
                     'fork_url': fork_url,
                     'chain_id': chain_id,
+                    'fork_block_number': fork_block_number,
                     'port': self.port,
                     'start_time': time.time()
                 }
+                self.startup = {'state_reused': state_reused, 'ready_seconds': None}
                 return True, "Anvil started successfully"
             except FileNotFoundError:
                 return False, "Anvil executable not found. Please install Foundry."
@@ -112,17 +219,429 @@ class AnvilManager:
                 return True
             return False
 
+    def rpc(self, method, params=None, timeout=10):
+        """Sends one JSON-RPC call straight to this fork. Raises AnvilError."""
+        try:
+            resp = self.session.post(self.rpc_url, timeout=timeout, json={
+                'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params or [],
+            })
+            body = resp.json()
+        except Exception as e:
+            raise AnvilError(f"Fork {self.name} is not reachable: {e}")
+        if body.get('error'):
+            raise AnvilError(body['error'].get('message', 'Unknown error'))
+        return body.get('result')
+
+    def wait_until_serving(self, timeout=30, interval=0.02):
+        """Polls the port, then the RPC, until Anvil answers or `timeout` expires.
+
+        Returns False if the process died or the deadline passed. Records how long
+        the fork took from spawn to serving in `startup`.
+        """
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if not self.is_running():
+                return False
+            # A refused connection is much cheaper to detect than an HTTP timeout
+            if _port_accepts(self.port):
+                try:
+                    self.rpc('eth_blockNumber', timeout=max(min(deadline - time.time(), 2), 0.1))
+                    started = self.current_config.get('start_time')
+                    if started and self.startup.get('ready_seconds') is None:
+                        self.startup['ready_seconds'] = round(time.time() - started, 3)
+                    return True
+                except AnvilError:
+                    pass
+            time.sleep(interval)
+        return False
+
+    def snapshot(self):
+        """evm_snapshot: returns an id to revert to later."""
+        return self.rpc('evm_snapshot')
+
+    def revert(self, snapshot_id):
+        """evm_revert to `snapshot_id` (which Anvil then forgets). Returns whether it reverted."""
+        reverted = bool(self.rpc('evm_revert', [snapshot_id]))
+        if reverted:
+            self.generation += 1
+        return reverted
+
+    def process_stats(self):
+        """Resident memory and CPU seconds of the running Anvil process, from /proc (empty elsewhere)."""
+        process = self.process
+        if process is None or process.poll() is not None:
+            return {}
+        try:
+            with open(f'/proc/{process.pid}/stat') as f:
+                # Fields after the parenthesised command name; utime and stime are the 12th and 13th
+                fields = f.read().rsplit(')', 1)[1].split()
+            with open(f'/proc/{process.pid}/statm') as f:
+                resident_pages = int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return {}
+        ticks = os.sysconf('SC_CLK_TCK')
+        return {
+            'rss_bytes': resident_pages * os.sysconf('SC_PAGE_SIZE'),
+            'cpu_seconds': (int(fields[11]) + int(fields[12])) / ticks,
+            'uptime_seconds': time.time() - self.current_config.get('start_time', time.time()),
+        }
+
     def get_status(self):
         running = self.is_running()
         return {
+            'name': self.name,
             'running': running,
             'pid': self.process.pid if running and self.process else None,
-            'config': self.current_config if running else {}
+            'config': self.current_config if running else {},
+            'rpc_url': self.rpc_url,
+            'startup': self.startup if running else {},
         }
-    
-    def get_logs(self):
-        with self.lock:
-            return list(self.logs)
+
+    def get_logs(self, since=0):
+        """Returns (lines, cursor, truncated) for lines with seq > `since`.
+
+        Pass the returned cursor back as `since` to get only newer lines. `truncated` is
+        True when lines after `since` already fell out of the ring.
+        """
+        with self.log_cond:
+            return self._logs_since(since)
+
+    def wait_for_logs(self, since, timeout):
+        """Like get_logs(), but blocks up to `timeout` seconds until a line newer than `since` exists."""
+        with self.log_cond:
+            self.log_cond.wait_for(lambda: self.next_seq - 1 > since, timeout=timeout)
+            return self._logs_since(since)
+
+    def _logs_since(self, since):
+        # Caller must hold self.log_cond
+        cursor = self.next_seq - 1
+        if since >= cursor:
+            return [], cursor, False
+        first_seq = self.logs[0][0] if self.logs else self.next_seq
+        # Sequence numbers are contiguous, so only the newest `count` entries are walked
+        count = min(cursor - since, len(self.logs))
+        newest = itertools.islice(reversed(self.logs), count)
+        lines = [line for _, line in newest][::-1]
+        truncated = since > 0 and since + 1 < first_seq
+        return lines, cursor, truncated
+
+
+class AnvilManager:
+    """Runs the default Anvil fork on a fixed port plus a pool of named forks.
+
+    Named forks get auto-allocated ports. For configurations registered with
+    set_warm_pool(), a background thread keeps that many idle forks started and
+    serving, so acquire() can hand one out instantly instead of cold-starting.
+    """
+
+    def __init__(self, port=8545, max_log_bytes=1024 * 1024, max_forks=8, state_dir=None, ready_timeout=30,
+                 lock_path=None, enabled=True):
+        self.port = port
+        # Off for servers running several worker processes, which can't share the forks
+        self.enabled = enabled
+        # Held by the one server process allowed to run Anvil, see _claim()
+        self.lock_path = lock_path
+        self.lock_file = None
+        self.claimed = False
+        self.claim_lock = threading.Lock()
+        # Called once this process has become the one managing Anvil forks
+        self.claim_hooks = []
+        self.max_log_bytes = max_log_bytes
+        self.max_forks = max_forks
+        self.state_dir = state_dir
+        self.ready_timeout = ready_timeout
+        self.forks = {DEFAULT_FORK: self._new_fork(DEFAULT_FORK, port)}
+        self.idle = []  # Warm forks not handed out yet
+        self.warm_targets = {}  # fork_key() -> number of idle forks to keep
+        # Startup timings per kind ('cold', 'state_reused', 'warm'): count, total, last, max seconds
+        self.startup_stats = {}
+        self.stats_lock = threading.Lock()
+        self.pool_lock = threading.Lock()
+        self.pool_wakeup = threading.Event()
+        self.pool_thread = None
+        self.idle_names = itertools.count(1)
+
+    def register_claim_hook(self, hook):
+        self.claim_hooks.append(hook)
+
+    def _claim(self):
+        """Makes this process the only one managing Anvil forks. Raises AnvilLockedError if another one is,
+        AnvilDisabledError if Anvil is turned off.
+
+        Every server process has its own AnvilManager; without this, a second one
+        would kill the first one's fork when it frees the default port. The lock is an
+        flock, so it goes away with the process that held it, however it ends. Claim
+        hooks run once, when this process first becomes the owner.
+        """
+        if not self.enabled:
+            raise AnvilDisabledError("Anvil forks are disabled on this server (ANVIL_ENABLED=0)")
+        with self.claim_lock:
+            if self.claimed:
+                return
+            if self.lock_path is not None:
+                os.makedirs(os.path.dirname(self.lock_path) or '.', exist_ok=True)
+                lock_file = open(self.lock_path, 'a+')
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    lock_file.seek(0)
+                    owner = lock_file.read().strip() or 'unknown'
+                    lock_file.close()
+                    raise AnvilLockedError(f"Anvil forks are managed by another server process (pid {owner}); "
+                                           f"run a single worker process to use them")
+                lock_file.seek(0)
+                lock_file.truncate()
+                lock_file.write(str(os.getpid()))
+                lock_file.flush()
+                self.lock_file = lock_file
+            self.claimed = True
+            for hook in self.claim_hooks:
+                try:
+                    hook()
+                except Exception as e:
+                    print(f"Anvil claim hook {hook.__name__} failed: {e}")
+
+    def _new_fork(self, name, port):
+        return AnvilFork(name, port, self.max_log_bytes, self.state_dir)
+
+    def _record_startup(self, kind, seconds):
+        with self.stats_lock:
+            stats = self.startup_stats.setdefault(kind, {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            stats['count'] += 1
+            stats['total_seconds'] += seconds
+            stats['last_seconds'] = round(seconds, 3)
+            stats['max_seconds'] = round(max(stats['max_seconds'], seconds), 3)
+
+    def _start_and_wait(self, fork, fork_url, chain_id=None, fork_block_number=None, reset_state=False, timeout=None):
+        """Starts `fork` and waits until it serves. Returns (success, message); stops it on failure."""
+        timeout = timeout or self.ready_timeout
+        started = time.time()
+        success, message = fork.start(fork_url, chain_id, fork_block_number, reset_state)
+        if success and not fork.wait_until_serving(timeout):
+            success = False
+            message = f"Anvil did not start serving within {timeout}s" if fork.is_running() \
+                else "Anvil exited during startup, see the logs"
+        if not success:
+            fork.stop()
+            return False, message
+        self._record_startup('state_reused' if fork.startup.get('state_reused') else 'cold', time.time() - started)
+        return True, message
+
+    # --- Default fork (single-fork API) ---
+
+    @property
+    def default(self):
+        return self.forks[DEFAULT_FORK]
+
+    @property
+    def current_config(self):
+        return self.default.current_config
+
+    def is_running(self):
+        return self.default.is_running()
+
+    def _kill_process_on_port(self, timeout=5):
+        """Finds and kills any process listening on the configured port, then waits for it to free up."""
+        if not _port_accepts(self.port):
+            return  # Nothing is listening: skip spawning lsof
+        try:
+            # lsof -t -i:PORT returns the PID of the process
+            pid_str = subprocess.check_output(["lsof", "-t", "-i", f":{self.port}"]).decode().strip()
+            if pid_str:
+                pids = pid_str.split('\n')
+                for pid in pids:
+                    if pid:
+                        print(f"Force killing process {pid} on port {self.port}")
+                        os.kill(int(pid), signal.SIGKILL)
+        except (subprocess.CalledProcessError, ValueError, OSError):
+            pass # No process found or error killing it
+        deadline = time.time() + timeout
+        while _port_accepts(self.port) and time.time() < deadline:
+            time.sleep(0.02)
+
+    def start_fork(self, fork_url, chain_id=None, fork_block_number=None, reset_state=False, timeout=None):
+        """(Re)starts the default fork and returns (success, message) once it serves RPC."""
+        try:
+            self._claim()
+        except AnvilError as e:
+            return False, str(e)
+        self.stop() # Stop any existing instance managed by this class
+        self._kill_process_on_port() # Ensure port is free regardless of who owns it
+        success, message = self._start_and_wait(self.default, fork_url, chain_id, fork_block_number, reset_state, timeout)
+        return success, "Anvil started successfully" if success else message
+
+    def stop(self):
+        return self.default.stop()
+
+    def get_status(self):
+        status = self.default.get_status()
+        status['enabled'] = self.enabled
+        status['forks'] = [fork.get_status() for name, fork in self.forks.items() if name != DEFAULT_FORK]
+        with self.pool_lock:
+            status['pool'] = {
+                'idle': [fork.get_status() for fork in self.idle],
+                'targets': [{'fork_url': url, 'chain_id': chain_id, 'fork_block_number': block, 'count': count}
+                            for (url, chain_id, block), count in self.warm_targets.items()],
+                'max_forks': self.max_forks,
+            }
+        with self.stats_lock:
+            status['startup_stats'] = {
+                kind: {**stats, 'total_seconds': round(stats['total_seconds'], 3),
+                       'avg_seconds': round(stats['total_seconds'] / stats['count'], 3)}
+                for kind, stats in self.startup_stats.items()
+            }
+        status['state_dir'] = self.state_dir
+        return status
+
+    def get_logs(self, since=0):
+        return self.default.get_logs(since)
+
+    def wait_for_logs(self, since, timeout):
+        return self.default.wait_for_logs(since, timeout)
+
+    # --- Named forks ---
+
+    def get_fork(self, name):
+        return self.forks.get(name)
+
+    def fork_for_port(self, port):
+        """The running fork (named, idle or default) listening on `port`, or None.
+
+        A stopped fork matches nothing: another node may be serving on its port now.
+        """
+        return next((fork for fork in self.all_forks() if fork.port == port and fork.is_running()), None)
+
+    def all_forks(self):
+        """Every fork: default, named and idle."""
+        with self.pool_lock:
+            return list(self.forks.values()) + self.idle
+
+    def _fork_count(self):
+        # Caller must hold self.pool_lock
+        return sum(1 for name in self.forks if name != DEFAULT_FORK) + len(self.idle)
+
+    def acquire(self, name, fork_url, chain_id=None, timeout=60, fork_block_number=None):
+        """Starts named fork `name`, taking a warm idle fork when one matches.
+
+        Returns (fork, warm). Raises AnvilError if the name is taken, the pool is
+        full, or the fork does not start serving within `timeout` seconds.
+        """
+        key = fork_key(fork_url, chain_id, fork_block_number)
+        started = time.time()
+        self._claim()
+        with self.pool_lock:
+            if name in self.forks:
+                raise ForkExistsError(f"A fork named '{name}' already exists")
+            fork = next((f for f in self.idle if f.key == key and f.is_running()), None)
+            if fork is not None:
+                self.idle.remove(fork)
+            elif self._fork_count() >= self.max_forks:
+                raise PoolFullError(f"The fork pool is full ({self.max_forks} forks)")
+            else:
+                fork = self._new_fork(name, _free_port())
+            warm = fork.is_running()
+            fork.name = name
+            # Reserve the name while a cold fork starts
+            self.forks[name] = fork
+        self.pool_wakeup.set()
+
+        if warm:
+            self._record_startup('warm', time.time() - started)
+        else:
+            success, message = self._start_and_wait(fork, fork_url, chain_id, fork_block_number, timeout=timeout)
+            if not success:
+                with self.pool_lock:
+                    self.forks.pop(name, None)
+                raise AnvilError(f"Fork {name}: {message}")
+        return fork, warm
+
+    def release(self, name):
+        """Stops and forgets named fork `name`. Returns the fork, or None if unknown."""
+        if name == DEFAULT_FORK:
+            raise AnvilError("The default fork is stopped with stop()")
+        with self.pool_lock:
+            fork = self.forks.pop(name, None)
+        if fork is not None:
+            fork.stop()
+            self.pool_wakeup.set()
+        return fork
+
+    # --- Warm pool ---
+
+    def set_warm_pool(self, fork_url, chain_id=None, count=1, fork_block_number=None):
+        """Keeps `count` idle forks of this configuration ready (0 removes the target)."""
+        key = fork_key(fork_url, chain_id, fork_block_number)
+        self._claim()
+        with self.pool_lock:
+            if count > 0:
+                self.warm_targets[key] = count
+            else:
+                self.warm_targets.pop(key, None)
+            if self.pool_thread is None or not self.pool_thread.is_alive():
+                self.pool_thread = threading.Thread(target=self._maintain_pool, daemon=True)
+                self.pool_thread.start()
+        self.pool_wakeup.set()
+
+    def _maintain_pool(self):
+        while True:
+            self.pool_wakeup.wait(timeout=5)
+            self.pool_wakeup.clear()
+            try:
+                self._rebalance_pool()
+            except Exception as e:
+                print(f"Anvil pool maintenance failed: {e}")
+
+    def _rebalance_pool(self):
+        with self.pool_lock:
+            self.idle = [fork for fork in self.idle if fork.is_running()]
+            surplus, wanted = [], []
+            for key in set(self.warm_targets) | {f.key for f in self.idle}:
+                matching = [f for f in self.idle if f.key == key]
+                target = self.warm_targets.get(key, 0)
+                surplus += matching[target:]
+                wanted += [key] * max(target - len(matching), 0)
+            for fork in surplus:
+                self.idle.remove(fork)
+        for fork in surplus:
+            fork.stop()
+
+        for key in wanted:
+            with self.pool_lock:
+                if self._fork_count() >= self.max_forks:
+                    return
+            fork = self._new_fork(f"idle-{next(self.idle_names)}", _free_port())
+            success, message = self._start_and_wait(fork, *key)
+            if not success:
+                print(f"Could not warm an Anvil fork of {key[0]}: {message}")
+                return
+            with self.pool_lock:
+                if self.warm_targets.get(key, 0) > 0:
+                    self.idle.append(fork)
+                    fork = None
+            if fork is not None:
+                fork.stop()  # Target removed while it was starting
+
+    def shutdown(self):
+        """Stops every fork, idle ones included, and gives up the Anvil lock."""
+        with self.pool_lock:
+            self.warm_targets.clear()
+            forks = list(self.forks.values()) + self.idle
+            self.idle = []
+        for fork in forks:
+            fork.stop()
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+
 
 # Global instance
-anvil_manager = AnvilManager()
+anvil_manager = AnvilManager(
+    max_log_bytes=int(os.getenv('ANVIL_LOG_MAX_BYTES', str(1024 * 1024))),
+    max_forks=int(os.getenv('ANVIL_MAX_FORKS', '8')),
+    # Empty disables state reuse; the default sits next to the app's database
+    state_dir=os.getenv('ANVIL_STATE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'anvil_state')) or None,
+    ready_timeout=float(os.getenv('ANVIL_READY_TIMEOUT', '30')),
+    # Empty disables the check; only needed when several server processes share one machine
+    lock_path=os.getenv('ANVIL_LOCK_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'anvil.lock')) or None,
+    enabled=os.getenv('ANVIL_ENABLED', '1').lower() not in ('0', 'false', 'no'),
+)
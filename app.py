@@ -2,23 +2,108 @@
 
 import os
 import json
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session
+import math
+import queue
+import threading
+import time
+import uuid
+from flask import Flask, Response, render_template, request, redirect, url_for, jsonify, session, g, stream_template
 from flask_sqlalchemy import SQLAlchemy
+from jinja2 import Template
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import deferred, undefer
 from web3 import Web3
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from datetime import datetime
+from urllib.parse import urlparse
 from dotenv import load_dotenv
-from anvil_manager import anvil_manager
+from anvil_manager import AnvilDisabledError, AnvilError, AnvilLockedError, DEFAULT_FORK, ForkExistsError, PoolFullError, anvil_manager
+from rpc_clients import client_registry
+from rpc_batch import RpcError, batch_request, format_result, request as rpc_request
+from chain_cache import UNVERIFIED_SCOPE, ChainCache
+from abi_index import abi_cache, abi_selectors, canonical_type, selector_index, signature_text
+from log_decoder import decode_logs
+from chain_indexer import ChainIndexer
+from head_stream import HeadStreamer
+from json_stream import JSONStreamError, iter_json_array
+from multicall import read_many
+from tx_sender import TxError, tx_sender
+from search_index import HashKindCache, contract_search_index
+from block_analytics import AnalyticsError, BlockAnalytics
+from metrics import (ContextThreadPoolExecutor, end_request_timings, metrics,
+                     record_timing, start_request_timings, timed)
 
 # Load environment variables from .env file
 load_dotenv()
 
-app = Flask(__name__)
+# INSTANCE_PATH relocates contracts.db and the caches, e.g. for benchmark runs on a throwaway copy
+app = Flask(__name__, instance_path=os.path.abspath(os.getenv('INSTANCE_PATH')) if os.getenv('INSTANCE_PATH') else None)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///contracts.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Seconds a connection waits for another writer (thread or server process) before "database is locked"
+SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '5'))
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'connect_args': {'timeout': SQLITE_BUSY_TIMEOUT},
+    # Enough connections for every server thread; SQLAlchemy's default of 5 + 10 queues requests
+    'pool_size': int(os.getenv('SQLITE_POOL_SIZE', '16')),
+    'max_overflow': int(os.getenv('SQLITE_POOL_OVERFLOW', '16')),
+}
 app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY', 'dev-secret-key')
+app.config['LATEST_BLOCKS_COUNT'] = int(os.getenv('LATEST_BLOCKS_COUNT', '10'))
+app.config['IMPORT_CHUNK_SIZE'] = int(os.getenv('IMPORT_CHUNK_SIZE', '500'))
+app.config['BLOCK_TXS_PER_PAGE'] = int(os.getenv('BLOCK_TXS_PER_PAGE', '50'))
+app.config['BLOCK_TXS_MAX_PER_PAGE'] = int(os.getenv('BLOCK_TXS_MAX_PER_PAGE', '500'))
+app.config['REVERT_SCAN_MAX_BLOCKS'] = int(os.getenv('REVERT_SCAN_MAX_BLOCKS', '1000'))
+app.config['REVERT_SCAN_CHUNK_SIZE'] = int(os.getenv('REVERT_SCAN_CHUNK_SIZE', '50'))
+app.config['REVERT_SCAN_WORKERS'] = int(os.getenv('REVERT_SCAN_WORKERS', '8'))
+app.config['INTERACT_BATCH_MAX_CALLS'] = int(os.getenv('INTERACT_BATCH_MAX_CALLS', '1000'))
+# Longest a batch with "wait" may hold its server thread polling for receipts
+app.config['INTERACT_BATCH_MAX_WAIT'] = float(os.getenv('INTERACT_BATCH_MAX_WAIT', '120'))
+app.config['ADDRESS_BATCH_SIZE'] = int(os.getenv('ADDRESS_BATCH_SIZE', '100'))
+app.config['ADDRESS_BATCH_WORKERS'] = int(os.getenv('ADDRESS_BATCH_WORKERS', '4'))
+app.config['ADDRESS_MAX_COUNT'] = int(os.getenv('ADDRESS_MAX_COUNT', '20000'))
+# Send a Server-Timing header on every response, not only when the request asks with X-Server-Timing
+app.config['SERVER_TIMING'] = os.getenv('SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
 db = SQLAlchemy(app)
 
 RPC_URL = os.getenv("GETH_RPC_URL")
+# Comma-separated further endpoints of the same chain, used with GETH_RPC_URL
+BACKUP_RPC_URLS = [url.strip() for url in os.getenv("GETH_BACKUP_RPC_URLS", "").split(',') if url.strip()]
+
+# Shared pool for fanning out independent RPC calls within a request
+RPC_CALL_TIMEOUT = float(os.getenv('RPC_CALL_TIMEOUT', '10'))
+# Tasks inherit the submitting request's context, so their RPC time shows up in its Server-Timing
+rpc_executor = ContextThreadPoolExecutor(max_workers=int(os.getenv('RPC_FANOUT_WORKERS', '16')), thread_name_prefix='rpc')
+
+# Set by shutdown_services(); Server-Sent Event streams check it every STREAM_POLL_SECONDS and end
+shutting_down = threading.Event()
+STREAM_POLL_SECONDS = 1
+STREAM_KEEPALIVE_SECONDS = 15
+
+os.makedirs(app.instance_path, exist_ok=True)
+chain_cache = ChainCache(
+    os.path.join(app.instance_path, 'chain_cache.db'),
+    max_bytes=int(os.getenv('CHAIN_CACHE_MAX_BYTES', str(64 * 1024 * 1024))),
+    finality_depth=int(os.getenv('CHAIN_CACHE_FINALITY_DEPTH', '64')),
+    recent_ttl=float(os.getenv('CHAIN_CACHE_RECENT_TTL', '5')),
+    busy_timeout=SQLITE_BUSY_TIMEOUT,
+)
+chain_indexer = ChainIndexer(
+    os.path.join(app.instance_path, 'address_index.db'),
+    batch_size=int(os.getenv('INDEXER_BATCH_SIZE', '50')),
+    poll_interval=float(os.getenv('INDEXER_POLL_INTERVAL', '4')),
+    busy_timeout=SQLITE_BUSY_TIMEOUT,
+)
+head_streamer = HeadStreamer(
+    poll_interval=float(os.getenv('HEADS_POLL_INTERVAL', '2')),
+    queue_size=int(os.getenv('HEADS_QUEUE_SIZE', '32')),
+)
+hash_kinds = HashKindCache(int(os.getenv('SEARCH_HASH_CACHE_SIZE', '10000')))
+block_analytics = BlockAnalytics(
+    chunk_size=int(os.getenv('ANALYTICS_CHUNK_SIZE', '250')),
+    workers=int(os.getenv('ANALYTICS_WORKERS', '4')),
+    max_range=int(os.getenv('ANALYTICS_MAX_RANGE', '100000')),
+)
 
 # --- Models ---
 
@@ -27,39 +112,267 @@ class ContractABI(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     address = db.Column(db.String(42), unique=True, nullable=False) # Ethereum address
-    abi = db.Column(db.Text, nullable=False)
+    # Lowercase copy of `address` so lookups are indexed equality instead of ILIKE scans
+    address_lower = db.Column(db.String(42), unique=True, index=True)
+    # Deferred: listings should not load multi-hundred-KB ABIs for every row
+    abi = deferred(db.Column(db.Text, nullable=False))
 
     def __repr__(self):
         return f'<ContractABI {self.name}>'
 
+# Precomputed function/error selectors and event topics of every saved ABI
+class AbiSignature(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    contract_id = db.Column(db.Integer, db.ForeignKey('contract_abi.id'), nullable=False, index=True)
+    kind = db.Column(db.String(10), nullable=False) # function, error or event
+    selector = db.Column(db.String(66), nullable=False, index=True)
+    signature = db.Column(db.Text, nullable=False)
+    fragment = db.Column(db.Text, nullable=False) # JSON of the ABI item
+
+    def __repr__(self):
+        return f'<AbiSignature {self.signature}>'
+
 class Network(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
     rpc_url = db.Column(db.String(255), unique=True, nullable=False)
+    # JSON list of further RPC URLs for the same chain; requests are routed across all of them
+    backup_rpc_urls = db.Column(db.Text, nullable=True)
     is_default = db.Column(db.Boolean, default=False, nullable=False)
+    # Name of the pooled Anvil fork that registered this network; such rows go away with the fork
+    anvil_fork = db.Column(db.String(100), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
+    @property
+    def backups(self):
+        return json.loads(self.backup_rpc_urls) if self.backup_rpc_urls else []
+
+    @property
+    def rpc_urls(self):
+        """Every endpoint of the network, primary first."""
+        return [self.rpc_url] + self.backups
+
+    def to_dict(self):
+        return {'id': self.id, 'name': self.name, 'rpc_url': self.rpc_url,
+                'backup_rpc_urls': self.backups, 'is_default': self.is_default}
+
     def __repr__(self):
         return f'<Network {self.name}>'
 
 def get_active_network():
+    # Memoized per request: the context processor and the view both need it
+    if 'active_network' in g:
+        return g.active_network
     net_id = session.get('network_id')
     network = None
     if net_id:
         network = Network.query.get(net_id)
     if not network:
         network = Network.query.filter_by(is_default=True).first()
+    g.active_network = network
     return network
 
-def make_w3(rpc_url: str):
-    try:
-        instance = Web3(Web3.HTTPProvider(rpc_url))
-        if instance.is_connected():
-            return instance
-    except Exception:
-        pass
-    return None
+def get_active_client():
+    """Returns the pooled RpcClient for the active network, or None if the node is offline."""
+    active_network = get_active_network()
+    if active_network:
+        return client_registry.get(active_network.id, active_network.rpc_urls, active_network.name)
+    return client_registry.get(None, [RPC_URL] + BACKUP_RPC_URLS if RPC_URL else None)
+
+def get_w3():
+    client = get_active_client()
+    return client.w3 if client else None
+
+
+def find_contracts_by_address(addresses):
+    """Resolves many addresses with one indexed IN query.
+
+    Returns {lowercase address: (id, name, checksum address)} for the saved ones.
+    """
+    keys = {address.lower() for address in addresses}
+    if not keys:
+        return {}
+    rows = db.session.query(ContractABI.id, ContractABI.name, ContractABI.address, ContractABI.address_lower) \
+        .filter(ContractABI.address_lower.in_(keys))
+    return {address_lower: (contract_id, name, address) for contract_id, name, address, address_lower in rows}
+
+def migrate_contract_addresses():
+    """Adds and backfills ContractABI.address_lower in contracts.db files created before it existed."""
+    columns = {column['name'] for column in inspect(db.engine).get_columns('contract_abi')}
+    with db.engine.begin() as conn:
+        if 'address_lower' not in columns:
+            conn.execute(text('ALTER TABLE contract_abi ADD COLUMN address_lower VARCHAR(42)'))
+        conn.execute(text('UPDATE contract_abi SET address_lower = lower(address) WHERE address_lower IS NULL'))
+        conn.execute(text(
+            'CREATE UNIQUE INDEX IF NOT EXISTS ix_contract_abi_address_lower ON contract_abi (address_lower)'))
+
+def migrate_network_endpoints():
+    """Adds Network.backup_rpc_urls and Network.anvil_fork to contracts.db files created before they existed."""
+    columns = {column['name'] for column in inspect(db.engine).get_columns('network')}
+    with db.engine.begin() as conn:
+        if 'backup_rpc_urls' not in columns:
+            conn.execute(text('ALTER TABLE network ADD COLUMN backup_rpc_urls TEXT'))
+        if 'anvil_fork' not in columns:
+            conn.execute(text('ALTER TABLE network ADD COLUMN anvil_fork VARCHAR(100)'))
+
+def index_contract_abi(contract, rows):
+    """Stores the abi_selectors() rows of a flushed contract. The caller commits, then
+    calls selector_index.add() with the same rows."""
+    db.session.add_all([
+        AbiSignature(contract_id=contract.id, kind=kind, selector=selector,
+                     signature=signature, fragment=json.dumps(fragment))
+        for kind, selector, signature, fragment in rows
+    ])
+
+def load_selector_index():
+    """Backfills selector rows for contracts saved before the index existed, then
+    loads the whole table into memory."""
+    indexed = db.session.query(AbiSignature.contract_id)
+    for contract in ContractABI.query.options(undefer(ContractABI.abi)).filter(~ContractABI.id.in_(indexed)).all():
+        try:
+            index_contract_abi(contract, list(abi_selectors(json.loads(contract.abi))))
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+            print(f"Could not index ABI of {contract.name}: {e}")
+    db.session.commit()
 
+    selector_index.clear()
+    names = dict(db.session.query(ContractABI.id, ContractABI.name).all())
+    rows_by_contract = {}
+    for row in AbiSignature.query.all():
+        rows_by_contract.setdefault(row.contract_id, []).append(
+            (row.kind, row.selector, row.signature, json.loads(row.fragment)))
+    for contract_id, rows in rows_by_contract.items():
+        selector_index.add(contract_id, names.get(contract_id), rows)
+
+def load_search_index():
+    contract_search_index.clear()
+    for contract_id, name, address in db.session.query(ContractABI.id, ContractABI.name, ContractABI.address):
+        contract_search_index.add(contract_id, name, address)
+
+
+def _abi_text_loader(contract_id):
+    return lambda: db.session.query(ContractABI.abi).filter(ContractABI.id == contract_id).scalar()
+
+def get_contract_abi(contract_id):
+    """Parsed ABI of a saved contract from the shared cache. Do not mutate it."""
+    return abi_cache.abi(contract_id, _abi_text_loader(contract_id))
+
+def get_contract_factory(w3, contract_id):
+    """Prebuilt contract class for a saved ABI; instantiate it with address=..."""
+    return abi_cache.factory(w3, contract_id, _abi_text_loader(contract_id))
+
+
+# --- Metrics ---
+
+http_duration = metrics.histogram('http_request_duration_seconds', 'Time to build a response, per route',
+                                  ('route', 'method', 'status'))
+# Streamed pages are measured up to the first byte
+http_rpc_calls = metrics.histogram('http_request_rpc_calls', 'JSON-RPC calls made while serving a request',
+                                   ('route',), buckets=(0, 1, 2, 5, 10, 20, 50, 100, 500))
+http_db_queries = metrics.histogram('http_request_db_queries', 'SQL statements run while serving a request',
+                                    ('route',), buckets=(0, 1, 2, 5, 10, 20, 50, 100))
+db_duration = metrics.histogram('db_query_duration_seconds', 'SQL statements against contracts.db')
+revert_replays = metrics.counter('revert_replays_total', 'Failed transactions replayed with eth_call for revert data')
+revert_decodes = metrics.counter('revert_decodes_total', 'Revert data decoded against saved ABIs')
+
+class TimedTemplate(Template):
+    """Counts template rendering as 'render' time in Server-Timing."""
+
+    def render(self, *args, **kwargs):
+        with timed('render'):
+            return super().render(*args, **kwargs)
+
+app.jinja_env.template_class = TimedTemplate
+
+def _configure_sqlite(dbapi_conn, connection_record):
+    # WAL lets page loads read while an import writes; NORMAL is durable enough under WAL
+    cursor = dbapi_conn.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    db_duration.observe(elapsed)
+    record_timing('db', elapsed)
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.request_timings, g.request_timings_token = start_request_timings()
+
+@app.after_request
+def record_request_metrics(response):
+    started = g.get('request_started')
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    timings = g.request_timings
+    http_duration.observe(elapsed, route, request.method, str(response.status_code))
+    http_rpc_calls.observe(timings.counts.get('rpc', 0), route)
+    http_db_queries.observe(timings.counts.get('db', 0), route)
+    if app.config['SERVER_TIMING'] or request.headers.get('X-Server-Timing'):
+        response.headers['Server-Timing'] = timings.server_timing(elapsed)
+    return response
+
+@app.teardown_request
+def end_request_metrics(exc):
+    token = g.pop('request_timings_token', None)
+    if token is not None:
+        end_request_timings(token)
+
+def cache_metrics():
+    chain_lookups = [({'kind': kind, 'outcome': outcome}, count)
+                     for (kind, outcome), count in list(chain_cache.lookups.items())]
+    hit_misses = [
+        ({'cache': 'abi', 'outcome': 'hit'}, abi_cache.hits), ({'cache': 'abi', 'outcome': 'miss'}, abi_cache.misses),
+        ({'cache': 'hash_kind', 'outcome': 'hit'}, hash_kinds.hits), ({'cache': 'hash_kind', 'outcome': 'miss'}, hash_kinds.misses),
+        ({'cache': 'analytics', 'outcome': 'hit'}, block_analytics.hits),
+        ({'cache': 'analytics', 'outcome': 'miss'}, block_analytics.misses),
+    ]
+    return [
+        ('chain_cache_lookups_total', 'counter', 'Chain cache lookups by object kind and the tier that answered',
+         chain_lookups),
+        ('chain_cache_memory_bytes', 'gauge', 'Bytes held by the in-memory chain cache', [({}, chain_cache.total_bytes)]),
+        ('cache_lookups_total', 'counter', 'In-memory cache lookups', hit_misses),
+    ]
+
+def anvil_metrics():
+    forks = anvil_manager.all_forks()
+    running = [(fork, fork.process_stats()) for fork in forks if fork.is_running()]
+    status = anvil_manager.get_status()
+    return [
+        ('anvil_forks', 'gauge', 'Anvil forks by state',
+         [({'state': 'running'}, len(running)), ({'state': 'idle'}, len(status['pool']['idle']))]),
+        ('anvil_process_resident_bytes', 'gauge', 'Resident memory of each Anvil process',
+         [({'fork': fork.name}, stats['rss_bytes']) for fork, stats in running if stats]),
+        ('anvil_process_cpu_seconds_total', 'counter', 'CPU time of each Anvil process',
+         [({'fork': fork.name}, stats['cpu_seconds']) for fork, stats in running if stats]),
+        ('anvil_startups_total', 'counter', 'Fork startups by kind',
+         [({'kind': kind}, stats['count']) for kind, stats in status['startup_stats'].items()]),
+        ('anvil_startup_seconds_total', 'counter', 'Time from spawn to serving RPC, summed per kind',
+         [({'kind': kind}, stats['total_seconds']) for kind, stats in status['startup_stats'].items()]),
+    ]
+
+def rpc_endpoint_metrics():
+    clients = list(client_registry.clients.values())
+    return [
+        ('rpc_endpoint_available', 'gauge', 'Whether the endpoint\'s circuit breaker lets traffic through',
+         [({'network': client.label, 'endpoint': str(i)}, int(endpoint.available()))
+          for client in clients for i, endpoint in enumerate(client.endpoints)]),
+    ]
+
+metrics.register_collector(cache_metrics)
+metrics.register_collector(anvil_metrics)
+metrics.register_collector(rpc_endpoint_metrics)
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 @app.context_processor
 def utility_processor():
@@ -72,17 +385,13 @@ def utility_processor():
 
     active_network = get_active_network()
     rpc_url = active_network.rpc_url if active_network else RPC_URL
-    w3_instance = make_w3(rpc_url) if rpc_url else None
+    client = get_active_client()
 
-    client_version = None
-    if w3_instance:
-        try:
-            client_version = w3_instance.client_version
-        except Exception:
-            client_version = "Error fetching version"
+    # The version string is refreshed by the registry's health checks, not per render
+    client_version = client.client_version if client else None
 
     return dict(
-        w3=w3_instance,
+        w3=client.w3 if client else None,
         rpc_url=rpc_url,
         client_version=client_version,
         active_network=active_network,
@@ -90,194 +399,652 @@ def utility_processor():
         to_datetime=to_datetime
     )
 
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '0.0.0.0')
+
+def managed_fork(rpc_url):
+    """The AnvilFork serving `rpc_url` if it is one of ours, else None."""
+    parsed = urlparse(rpc_url or '')
+    if parsed.hostname not in LOCAL_HOSTS:
+        return None
+    return anvil_manager.fork_for_port(parsed.port)
+
+# Client versions of local development nodes, whose chains share ids with real ones and vanish on restart
+DEV_NODE_MARKERS = ('anvil', 'hardhat', 'ganache')
+
+def chain_identity(client):
+    """What tells this chain apart from others with the same chain id; None if the node could not say.
+
+    Real chains are told apart by their genesis hash. Development nodes (forks keep
+    the forked chain's genesis) by their instance id, which changes on every restart,
+    so their blocks are never served to another node or a later run.
+    """
+    if client.identity is not None:
+        return client.identity
+    version = (client.client_version or '').lower()
+    if any(marker in version for marker in DEV_NODE_MARKERS):
+        method = 'hardhat_metadata' if 'hardhat' in version else 'anvil_metadata'
+        metadata = rpc_request(client, method, [])
+        instance_id = metadata.get('instanceId') if isinstance(metadata, dict) else None
+        # Without an instance id, nothing cached under this scope outlives this process
+        client.identity = f"dev:{instance_id or uuid.uuid4().hex}"
+        return client.identity
+    genesis = rpc_request(client, 'eth_getBlockByNumber', ['0x0', False])
+    if not isinstance(genesis, dict) or not genesis.get('hash'):
+        return None
+    client.identity = genesis['hash'][2:18]
+    return client.identity
+
+def cache_scope(client):
+    """Chain cache scope: chain id and chain identity, namespaced per fork (and revert) for managed Anvil forks."""
+    fork = managed_fork(client.rpc_url)
+    if fork is not None:
+        return f"anvil:{fork.scope_id}:{client.chain_id()}"
+    identity = chain_identity(client)
+    if identity is None:
+        # Unverified chain: the chain cache skips these scopes, and a throwaway id keeps
+        # the in-memory caches keyed by scope from serving this chain's data later
+        return f"{UNVERIFIED_SCOPE}{client.chain_id()}:{uuid.uuid4().hex}"
+    return f"{client.chain_id()}:{identity}"
+
+def _fork_network_name(name):
+    return f"Anvil: {name}"
+
+def purge_fork_networks():
+    """Deletes the networks of pooled forks; they died with the process that ran them.
+
+    Runs when this process becomes the one managing Anvil forks, so it never removes
+    the networks of forks another process still serves.
+    """
+    with app.app_context():
+        Network.query.filter(Network.anvil_fork.isnot(None)).delete(synchronize_session=False)
+        db.session.commit()
+
+anvil_manager.register_claim_hook(purge_fork_networks)
+
+def forget_scopes(prefix):
+    """Drops everything cached for chain scopes starting with `prefix`."""
+    chain_cache.drop_scopes(prefix)
+    block_analytics.drop_scopes(prefix)
+    tx_sender.nonces.drop_scopes(prefix)
+    hash_kinds.drop_scopes(prefix)
+
+def _block_number_of(kind, raw):
+    number = raw.get('number') if kind.startswith('block') else raw.get('blockNumber')
+    return int(number, 16) if number is not None else None
+
+def fetch_chain_object(client, kind, method, params, key):
+    """Fetches a block/transaction/receipt through the chain cache.
+
+    Returns the formatted object (as w3.eth.* would) or None if the node has no such
+    object. Pending objects are never cached.
+    """
+    scope = cache_scope(client)
+    raw = chain_cache.get(scope, kind, key)
+    if raw is None:
+        raw = rpc_request(client, method, params)
+        if isinstance(raw, RpcError):
+            raise raw
+        if raw is None:
+            return None
+        number = _block_number_of(kind, raw)
+        if number is not None:
+            chain_cache.put(scope, kind, key, raw, chain_cache.is_final(number, client.head_number()))
+    return format_result(method, raw)
+
+def fetch_block(client, block_identifier, full_transactions=False):
+    kind = 'block_full' if full_transactions else 'block'
+    if isinstance(block_identifier, int):
+        return fetch_chain_object(client, kind, 'eth_getBlockByNumber',
+                                  [hex(block_identifier), full_transactions], str(block_identifier))
+    if block_identifier.startswith('0x') and len(block_identifier) == 66:
+        return fetch_chain_object(client, kind, 'eth_getBlockByHash',
+                                  [block_identifier, full_transactions], block_identifier.lower())
+    # Block tags ('latest', 'safe', ...) move with the chain, so they bypass the cache
+    raw = rpc_request(client, 'eth_getBlockByNumber', [block_identifier, full_transactions])
+    if isinstance(raw, RpcError):
+        raise raw
+    return format_result('eth_getBlockByNumber', raw)
+
+def fetch_chain_objects(client, kind, method, tx_hashes):
+    """Fetches many transactions or receipts through the chain cache, batching the misses.
+
+    Returns formatted objects in the order of `tx_hashes`; items the node could not
+    return are None.
+    """
+    scope = cache_scope(client)
+    keys = [normalize_hash(tx_hash) for tx_hash in tx_hashes]
+    raws = [chain_cache.get(scope, kind, key) for key in keys]
+    missing = [i for i, raw in enumerate(raws) if raw is None]
+    if missing:
+        results = batch_request(client, [(method, [keys[i]]) for i in missing])
+        head = client.head_number()
+        for i, raw in zip(missing, results):
+            if raw is None or isinstance(raw, RpcError):
+                continue
+            raws[i] = raw
+            number = _block_number_of(kind, raw)
+            if number is not None:
+                chain_cache.put(scope, kind, keys[i], raw, chain_cache.is_final(number, head))
+    return [format_result(method, raw) if raw is not None else None for raw in raws]
+
+def fetch_transactions(client, tx_hashes):
+    return fetch_chain_objects(client, 'tx', 'eth_getTransactionByHash', tx_hashes)
+
+def block_page_args():
+    """(page, per_page) from the query string, clamped to sane bounds."""
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = request.args.get('per_page', app.config['BLOCK_TXS_PER_PAGE'], type=int)
+    return page, min(max(per_page, 1), app.config['BLOCK_TXS_MAX_PER_PAGE'])
+
+def load_block_page(client, block_identifier, page, per_page):
+    """Fetches a block header with transaction hashes only, plus the hashes on one page.
+
+    Returns (block, page_hashes, page_count), or (None, [], 0) if the block is unknown.
+    The transactions themselves are left to fetch_transactions() so views can stream
+    the header before they arrive.
+    """
+    if isinstance(block_identifier, str) and block_identifier.isdigit():
+        block_identifier = int(block_identifier)
+    block = fetch_block(client, block_identifier)
+    if not block:
+        return None, [], 0
+    tx_hashes = ['0x' + bytes(tx_hash).hex() for tx_hash in block.transactions]
+    page_count = max((len(tx_hashes) + per_page - 1) // per_page, 1)
+    start = (page - 1) * per_page
+    return block, tx_hashes[start:start + per_page], page_count
+
+def normalize_hash(value):
+    value = value.lower()
+    return value if value.startswith('0x') else '0x' + value
+
+def _quantity(raw):
+    """Hex quantity from a batch result, or None if that item failed."""
+    if raw is None or isinstance(raw, RpcError):
+        return None
+    return int(raw, 16)
+
+def fetch_dashboard(client, count):
+    """Node status and the latest `count` blocks in two JSON-RPC batches.
+
+    The first batch also returns the head block, so only the older blocks need a
+    second round-trip. Failed items are dropped (blocks) or shown as None (status).
+    """
+    chain_id, gas_price, head = batch_request(client, [
+        ('eth_chainId', []),
+        ('eth_gasPrice', []),
+        ('eth_getBlockByNumber', ['latest', False]),
+    ])
+    if isinstance(head, RpcError):
+        raise head
+    if head is None:
+        raise RpcError("Node returned no latest block")
+    head_number = int(head['number'], 16)
+    client.set_head(head_number)
+
+    # Older dashboard blocks are usually still cached from the previous load
+    scope = cache_scope(client)
+    raw_blocks = {head_number: head}
+    missing = []
+    for number in range(head_number - 1, max(head_number - count, -1), -1):
+        raw = chain_cache.get(scope, 'block', str(number))
+        if raw is None:
+            missing.append(number)
+        else:
+            raw_blocks[number] = raw
+    fetched = batch_request(client, [('eth_getBlockByNumber', [hex(n), False]) for n in missing])
+    for number, raw in zip(missing, fetched):
+        if raw is not None and not isinstance(raw, RpcError):
+            raw_blocks[number] = raw
+            chain_cache.put(scope, 'block', str(number), raw, chain_cache.is_final(number, head_number))
+
+    latest_blocks = [
+        format_result('eth_getBlockByNumber', raw_blocks[number])
+        for number in sorted(raw_blocks, reverse=True)
+    ]
+
+    node_status = {
+        'client_version': client.client_version,
+        'chain_id': _quantity(chain_id),
+        'block_number': head_number,
+        'gas_price': _quantity(gas_price),
+    }
+    return node_status, latest_blocks[:count]
+
+def resolve_hash(client, value):
+    """'tx', 'block' or None for a 32-byte hash.
+
+    The transaction and block lookups are probed concurrently, and a resolved kind is
+    remembered per chain so repeated searches for the same hash cost nothing.
+    """
+    scope = cache_scope(client)
+    value = normalize_hash(value)
+    kind = hash_kinds.get(scope, value)
+    if kind is not None:
+        return kind
+
+    tx_future = rpc_executor.submit(fetch_chain_object, client, 'tx', 'eth_getTransactionByHash', [value], value)
+    block_future = rpc_executor.submit(fetch_block, client, value)
+    for candidate, future in (('tx', tx_future), ('block', block_future)):
+        try:
+            found = future.result(timeout=RPC_CALL_TIMEOUT)
+        except (RpcError, FutureTimeoutError) as e:
+            print(f"Could not look up {value} as a {candidate}: {e}")
+            continue
+        if found:
+            # Unknown hashes are not remembered: the transaction may simply not be mined yet
+            hash_kinds.put(scope, value, candidate)
+            return candidate
+    return None
+
+def search(client, query, limit=10):
+    """Search results for an address, block number, tx/block hash or contract name prefix.
+
+    Only block numbers and 32-byte hashes need the node (`client` may be None for the
+    rest); contract names and addresses come from the in-memory prefix index.
+    """
+    results = []
+    is_hex = query.startswith('0x') and all(c in '0123456789abcdefABCDEF' for c in query[2:])
+    if Web3.is_address(query):
+        address = Web3.to_checksum_address(query)
+        results.append({'kind': 'address', 'value': address, 'url': url_for('address_details', address=address)})
+    elif query.isdigit():
+        if client and int(query) <= client.head_number():
+            results.append({'kind': 'block', 'value': int(query),
+                            'url': url_for('block_details', block_identifier=query)})
+    elif is_hex and len(query) == 66:
+        kind = resolve_hash(client, query) if client else None
+        if kind == 'tx':
+            results.append({'kind': 'tx', 'value': query, 'url': url_for('transaction_details', tx_hash=query)})
+        elif kind == 'block':
+            results.append({'kind': 'block', 'value': query,
+                            'url': url_for('block_details', block_identifier=query)})
+
+    for contract_id, name, address in contract_search_index.search(query, limit):
+        results.append({'kind': 'contract', 'id': contract_id, 'value': name, 'address': address,
+                        'url': url_for('contract_interaction_page', contract_id=contract_id)})
+    return results[:limit]
+
+@app.route('/api/search', methods=['GET'])
+def search_api():
+    query = request.args.get('q', '').strip()
+    limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+    client = get_active_client()
+    try:
+        results = search(client, query, limit) if query else []
+    except Exception as e:
+        return jsonify({'error': str(e) or type(e).__name__}), 502
+    return jsonify({'query': query, 'results': results})
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     # The search form is the only one processed here
     if request.method == 'POST' and 'search_query' in request.form:
         query = request.form['search_query'].strip()
         
-        active_network = get_active_network()
-        w3_instance = make_w3(active_network.rpc_url) if active_network else make_w3(RPC_URL)
-        if not w3_instance:
+        client = get_active_client()
+        if not client:
             return redirect(url_for('index'))
 
-        if Web3.is_address(query):
-            return redirect(url_for('address_details', address=query))
-        elif query.isdigit():
-            return redirect(url_for('block_details', block_identifier=query))
-        elif len(query) == 66 and query.startswith('0x'):
-            try:
-                # The only way to know if it's a block or transaction hash is by trying
-                w3_instance.eth.get_transaction(query)
-                return redirect(url_for('transaction_details', tx_hash=query))
-            except Exception:
-                return redirect(url_for('block_details', block_identifier=query))
-        
+        try:
+            results = search(client, query, limit=1)
+        except Exception as e:
+            return render_template('error.html', message=f"Search failed: {str(e) or type(e).__name__}")
+        if results:
+            return redirect(results[0]['url'])
         return render_template('error.html', message="Invalid or unrecognized search query.")
 
     latest_blocks = []
-    active_network = get_active_network()
-    w3_instance = make_w3(active_network.rpc_url) if active_network else make_w3(RPC_URL)
-    if w3_instance:
+    node_status = None
+    client = get_active_client()
+    if client:
         try:
-            latest_block_number = w3_instance.eth.block_number
-            for i in range(10): # Show the last 10 blocks
-                if latest_block_number - i < 0: break
-                block = w3_instance.eth.get_block(latest_block_number - i)
-                latest_blocks.append(block)
+            node_status, latest_blocks = fetch_dashboard(client, app.config['LATEST_BLOCKS_COUNT'])
         except Exception as e:
             # If the node disconnects while the app is running
             return render_template('error.html', message=f"Could not fetch blocks from node: {e}")
 
-    return render_template('index.html', latest_blocks=latest_blocks)
+    return render_template('index.html', latest_blocks=latest_blocks, node_status=node_status)
 
 # The 'block', 'tx', and 'address' routes don't need major changes,
 # as they get 'w3' from the injected global context.
 
+@app.route('/api/stream/heads')
+def stream_heads():
+    """Server-Sent Events feed of new block summaries for the active network."""
+    client = get_active_client()
+    if not client:
+        return jsonify({'error': 'Not connected to a node'}), 503
+    active_network = get_active_network()
+    key = (active_network.id if active_network else None, client.rpc_url)
+    subscription = head_streamer.subscribe(key, client)
+
+    def events():
+        try:
+            yield 'retry: 3000\n\n'
+            idle = 0
+            while not subscription.closed and not shutting_down.is_set():
+                try:
+                    summary = subscription.queue.get(timeout=STREAM_POLL_SECONDS)
+                except queue.Empty:
+                    idle += STREAM_POLL_SECONDS
+                    if idle >= STREAM_KEEPALIVE_SECONDS:
+                        idle = 0
+                        yield ': keep-alive\n\n'
+                    continue
+                idle = 0
+                yield f"event: head\ndata: {json.dumps(summary)}\n\n"
+        finally:
+            head_streamer.unsubscribe(key, subscription)
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/block/<block_identifier>')
 def block_details(block_identifier):
-    active_network = get_active_network()
-    w3 = make_w3(active_network.rpc_url) if active_network else make_w3(RPC_URL)
-    if not w3: return redirect(url_for('index'))
+    client = get_active_client()
+    if not client: return redirect(url_for('index'))
+    page, per_page = block_page_args()
     try:
-        if block_identifier.isdigit(): block_identifier = int(block_identifier)
-        block = w3.eth.get_block(block_identifier, full_transactions=True)
+        block, page_hashes, page_count = load_block_page(client, block_identifier, page, per_page)
         if not block: return render_template('error.html', message=f"Block '{block_identifier}' not found.")
-        return render_template('block.html', block=block)
     except Exception as e:
         return render_template('error.html', message=str(e))
 
+    def page_transactions():
+        # Runs while the template streams, after the header has been sent
+        try:
+            transactions = fetch_transactions(client, page_hashes)
+        except Exception as e:
+            print(f"Could not fetch transactions of block {block.number}: {e}")
+            transactions = [None] * len(page_hashes)
+        yield from zip(page_hashes, transactions)
+
+    return Response(stream_template('block.html', block=block, tx_count=len(block.transactions),
+                                    transactions=page_transactions(), page=page, per_page=per_page,
+                                    page_count=page_count))
+
+@app.route('/api/block/<block_identifier>', methods=['GET'])
+def block_details_api(block_identifier):
+    client = get_active_client()
+    if not client:
+        return jsonify({'error': 'Not connected to a node'}), 503
+    page, per_page = block_page_args()
+    try:
+        block, page_hashes, page_count = load_block_page(client, block_identifier, page, per_page)
+        if not block:
+            return jsonify({'error': f"Block '{block_identifier}' not found"}), 404
+        transactions = fetch_transactions(client, page_hashes)
+    except Exception as e:
+        return jsonify({'error': str(e) or type(e).__name__}), 500
+    header = {key: value for key, value in block.items() if key != 'transactions'}
+    return app.response_class(Web3.to_json({
+        'block': header,
+        'tx_count': len(block.transactions),
+        'page': page,
+        'per_page': per_page,
+        'page_count': page_count,
+        'transactions': [tx if tx is not None else {'hash': tx_hash, 'error': 'unavailable'}
+                         for tx_hash, tx in zip(page_hashes, transactions)],
+    }), mimetype='application/json')
+
+def replay_revert_data(client, tx):
+    """Re-plays a failed transaction with a raw eth_call and returns its revert data.
+
+    Some nodes return the revert data as the call result, others in the error's
+    `data` field (occasionally nested one level deeper). Returns a 0x-hex string or
+    None, and raises RpcError if the node could not be reached.
+    """
+    call = {
+        'from': tx['from'], 'value': hex(tx.value), 'data': '0x' + bytes(tx.input).hex(),
+        'gas': hex(tx.gas), 'gasPrice': hex(tx.gasPrice), 'nonce': hex(tx.nonce),
+    }
+    if tx.to:
+        call['to'] = tx.to
+    revert_data = rpc_request(client, 'eth_call', [call, hex(tx.blockNumber)])
+    if isinstance(revert_data, RpcError):
+        if revert_data.code is None and revert_data.data is None:
+            # Transport failure rather than an answer from the node
+            raise revert_data
+        revert_data = revert_data.data
+        if isinstance(revert_data, dict):
+            revert_data = revert_data.get('data')
+    if isinstance(revert_data, str) and revert_data.startswith('0x') and len(revert_data) > 2:
+        return revert_data
+    return None
+
+def fetch_revert_data(client, tx):
+    """Revert data of a failed transaction, replayed at most once per chain (or Anvil fork).
+
+    Historical eth_calls are the most expensive requests we make, so the outcome
+    (including "no revert data") is stored in the chain cache under the transaction
+    hash. Only the raw data is stored: decoding is cheap and picks up ABIs saved later.
+    """
+    scope = cache_scope(client)
+    key = '0x' + bytes(tx.hash).hex()
+    cached = chain_cache.get(scope, 'revert', key)
+    if cached is not None:
+        return cached['data']
+    revert_replays.inc()
+    revert_data = replay_revert_data(client, tx)
+    chain_cache.put(scope, 'revert', key, {'data': revert_data},
+                    chain_cache.is_final(tx.blockNumber, client.head_number()))
+    return revert_data
+
+def find_failed_transactions(client, from_block, to_block):
+    """Hashes of the failed transactions in [from_block, to_block], oldest first.
+
+    Uses one eth_getBlockReceipts per block, batched; blocks the node cannot serve
+    that way fall back to the header plus a batch of per-transaction receipts.
+    """
+    failed = []
+    numbers = list(range(from_block, to_block + 1))
+    chunk_size = app.config['REVERT_SCAN_CHUNK_SIZE']
+    for start in range(0, len(numbers), chunk_size):
+        chunk = numbers[start:start + chunk_size]
+        results = batch_request(client, [('eth_getBlockReceipts', [hex(n)]) for n in chunk])
+        for number, receipts in zip(chunk, results):
+            if isinstance(receipts, RpcError):
+                block = fetch_block(client, number)
+                if not block:
+                    continue
+                receipts = fetch_chain_objects(client, 'receipt', 'eth_getTransactionReceipt',
+                                               ['0x' + bytes(tx_hash).hex() for tx_hash in block.transactions])
+                failed += ['0x' + bytes(receipt.transactionHash).hex() for receipt in receipts
+                           if receipt and receipt.status == 0]
+                continue
+            failed += [receipt['transactionHash'] for receipt in receipts or []
+                       if receipt and receipt.get('status') == '0x0']
+    return failed
+
+def decode_revert(w3, hex_str):
+    revert_decodes.inc()
+    error_selector = hex_str[:10]
+    decoded_error = {
+        'error_signature': error_selector,
+        'raw_error_data': hex_str
+    }
+    # Several saved contracts may share a selector; take the first that decodes
+    for match in selector_index.lookup('error', error_selector):
+        item = match['fragment']
+        try:
+            param_types = [canonical_type(inp) for inp in item['inputs']]
+            param_values = w3.codec.decode(param_types, bytes.fromhex(hex_str[10:]))
+        except Exception as decode_e:
+            print(f"Could not fully decode revert reason for {hex_str}: {decode_e}")
+            continue
+        decoded_error.update({
+            'contract_name': match['contract_name'],
+            'error_name': item['name'],
+            'params': {item['inputs'][i]['name']: param_values[i] for i in range(len(param_values))}
+        })
+        break
+    return decoded_error
+
+def decode_tx_input(w3, tx):
+    """Returns (contract_name, decoded_input) for calls to a saved contract."""
+    if not tx.to:
+        return None, None
+    checksum_to_address = Web3.to_checksum_address(tx.to)
+    known_contract = db.session.query(ContractABI.id, ContractABI.name).filter(
+        ContractABI.address_lower == tx.to.lower()).first()
+    if not known_contract:
+        return None, None
+    decoded_input = None
+    try:
+        contract_instance = get_contract_factory(w3, known_contract.id)(address=checksum_to_address)
+        if tx.input and tx.input != '0x':
+            func_obj, func_params = contract_instance.decode_function_input(tx.input)
+            decoded_input = {
+                'function': func_obj.fn_name,
+                'params': dict(func_params)
+            }
+    except Exception as e:
+        print(f"Error decoding transaction input for {checksum_to_address}: {e}")
+    return known_contract.name, decoded_input
+
+def decode_receipt_logs(receipt):
+    # Resolve every emitting contract in one query, then dispatch each log on topic0
+    saved = find_contracts_by_address(log['address'] for log in receipt['logs'])
+    contracts_by_address = {key: (contract_id, name) for key, (contract_id, name, _) in saved.items()}
+    return decode_logs(receipt['logs'], contracts_by_address)
+
+def load_transaction(client, tx_hash):
+    """Fetches and decodes everything the transaction views show, or None if unknown.
+
+    Once the transaction is known, the receipt and block header are fetched
+    concurrently; for failed transactions the revert replay then runs while the
+    saved ABIs decode the input and logs. Each RPC waits at most RPC_CALL_TIMEOUT.
+    Pending transactions have no receipt or block yet: only the input is decoded.
+    """
+    w3 = client.w3
+    tx_key = normalize_hash(tx_hash)
+    tx = fetch_chain_object(client, 'tx', 'eth_getTransactionByHash', [tx_key], tx_key)
+    if not tx:
+        return None
+    if tx.blockNumber is None:
+        contract_name, decoded_input = decode_tx_input(w3, tx)
+        return {
+            'tx': tx,
+            'pending': True,
+            'receipt': None,
+            'block': None,
+            'tx_fee': None,
+            'contract_name': contract_name,
+            'decoded_input': decoded_input,
+            'processed_logs': [],
+            'decoded_error': None,
+        }
+
+    receipt_future = rpc_executor.submit(
+        fetch_chain_object, client, 'receipt', 'eth_getTransactionReceipt', [tx_key], tx_key)
+    block_future = rpc_executor.submit(fetch_block, client, tx.blockNumber)
+    receipt = receipt_future.result(timeout=RPC_CALL_TIMEOUT)
+    replay_future = rpc_executor.submit(fetch_revert_data, client, tx) if receipt.status == 0 else None
+
+    contract_name, decoded_input = decode_tx_input(w3, tx)
+    processed_logs = decode_receipt_logs(receipt)
+
+    decoded_error = None
+    if replay_future:
+        try:
+            hex_str = replay_future.result(timeout=RPC_CALL_TIMEOUT)
+        except FutureTimeoutError:
+            print(f"Timed out replaying {tx_key} for its revert reason")
+            hex_str = None
+        except RpcError as e:
+            print(f"Could not replay {tx_key} for its revert reason: {e}")
+            hex_str = None
+        if hex_str:
+            decoded_error = decode_revert(w3, hex_str)
+
+    # Use effectiveGasPrice for EIP-1559 transactions, otherwise use gasPrice
+    gas_price = receipt.get('effectiveGasPrice', tx.gasPrice)
+
+    return {
+        'tx': tx,
+        'pending': False,
+        'receipt': receipt,
+        'block': block_future.result(timeout=RPC_CALL_TIMEOUT),
+        'tx_fee': receipt.gasUsed * gas_price,
+        'contract_name': contract_name,
+        'decoded_input': decoded_input,
+        'processed_logs': processed_logs,
+        'decoded_error': decoded_error,
+    }
+
 @app.route('/tx/<tx_hash>')
 def transaction_details(tx_hash):
-    active_network = get_active_network()
-    w3 = make_w3(active_network.rpc_url) if active_network else make_w3(RPC_URL)
-    if not w3: return redirect(url_for('index'))
+    client = get_active_client()
+    if not client: return redirect(url_for('index'))
     try:
-        tx = w3.eth.get_transaction(tx_hash)
-        if not tx:
+        details = load_transaction(client, tx_hash)
+        if not details:
             return render_template('error.html', message=f"Transaction '{tx_hash}' not found.")
-        
-        receipt = w3.eth.get_transaction_receipt(tx_hash)
-        block = w3.eth.get_block(tx.blockNumber)
-        
-        # Use effectiveGasPrice for EIP-1559 transactions, otherwise use gasPrice
-        gas_price = receipt.get('effectiveGasPrice', tx.gasPrice)
-        tx_fee = receipt.gasUsed * gas_price
-
-        decoded_input = None
-        processed_logs = []
-        contract_name = None
-        decoded_error = None
-
-        # 1. If transaction failed, try to decode the revert reason
-        if receipt.status == 0:
-            revert_data = None
-            try:
-                # Re-play the transaction. Some nodes return the revert data, others raise an exception.
-                tx_for_call = {
-                    'to': tx.to, 'from': tx['from'], 'value': tx.value, 'data': tx.input,
-                    'gas': tx.gas, 'gasPrice': tx.gasPrice, 'nonce': tx.nonce,
-                }
-                revert_data = w3.eth.call(tx_for_call, tx.blockNumber)
-            except Exception as e:
-                # The error data might be in the exception arguments
-                if e.args and isinstance(e.args[0], (tuple, list)) and e.args[0]:
-                    revert_data = e.args[0][0]
-                elif e.args and isinstance(e.args[0], str) and e.args[0].startswith('0x'):
-                    revert_data = e.args[0]
+        return render_template('transaction.html', **details)
+    except Exception as e:
+        return render_template('error.html', message=str(e) or type(e).__name__)
 
-            hex_str = None
-            if isinstance(revert_data, bytes):
-                hex_str = revert_data.hex()
-            elif isinstance(revert_data, str) and revert_data.startswith('0x'):
-                hex_str = revert_data
-
-            if hex_str:
-                error_selector = hex_str[:10]
-                decoded_error = {
-                    'error_signature': error_selector,
-                    'raw_error_data': hex_str
-                }
-                try:
-                    all_contracts = ContractABI.query.all()
-                    for known_contract in all_contracts:
-                        abi = json.loads(known_contract.abi)
-                        for item in abi:
-                            if item.get('type') == 'error':
-                                error_signature_text = f"{item['name']}({','.join([inp['type'] for inp in item['inputs']])})"
-                                abi_error_selector = '0x' + w3.keccak(text=error_signature_text).hex()[:8]
-                                if abi_error_selector == error_selector:
-                                    param_types = [inp['type'] for inp in item['inputs']]
-                                    param_values = w3.codec.decode(param_types, bytes.fromhex(hex_str[10:]))
-                                    decoded_error.update({
-                                        'contract_name': known_contract.name,
-                                        'error_name': item['name'],
-                                        'params': {item['inputs'][i]['name']: param_values[i] for i in range(len(param_values))}
-                                    })
-                                    break # Error found
-                        if decoded_error.get('error_name'):
-                            break # Contract found
-                except Exception as decode_e:
-                    print(f"Could not fully decode revert reason for {hex_str}: {decode_e}")
-
-
-        # 2. Attempt to decode the transaction input data
-        if tx.to:
-            checksum_to_address = Web3.to_checksum_address(tx.to)
-            known_contract = ContractABI.query.filter(ContractABI.address.ilike(checksum_to_address)).first()
-            if known_contract:
-                contract_name = known_contract.name
-                try:
-                    abi = json.loads(known_contract.abi)
-                    contract_instance = w3.eth.contract(address=checksum_to_address, abi=abi)
-                    if tx.input and tx.input != '0x':
-                        func_obj, func_params = contract_instance.decode_function_input(tx.input)
-                        decoded_input = {
-                            'function': func_obj.fn_name,
-                            'params': dict(func_params)
-                        }
-                except Exception as e:
-                    print(f"Error decoding transaction input for {checksum_to_address}: {e}")
-
-        # 2. Process all logs from the receipt, decoding where possible
-        for log in receipt['logs']:
-            processed_log = {'raw': log, 'decoded': None}
-            checksum_log_address = Web3.to_checksum_address(log['address'])
-            log_contract = ContractABI.query.filter(ContractABI.address.ilike(checksum_log_address)).first()
-            if log_contract:
-                try:
-                    log_abi = json.loads(log_contract.abi)
-                    log_contract_instance = w3.eth.contract(address=checksum_log_address, abi=log_abi)
-                    # Iterate through the contract's events and try to process the log
-                    for event in log_contract_instance.events:
-                        try:
-                            event_data = event().process_log(log)
-                            processed_log['decoded'] = {
-                                'name': event_data.event,
-                                'args': dict(event_data.args),
-                                'contract_name': log_contract.name
-                            }
-                            break  # Match found, stop trying other events
-                        except Exception:
-                            continue # Log did not match this event, try next
-                except Exception as e:
-                    print(f"Error processing log from {checksum_log_address}: {e}")
-            
-            processed_logs.append(processed_log)
-
-        return render_template(
-            'transaction.html',
-            tx=tx,
-            receipt=receipt,
-            block=block,
-            tx_fee=tx_fee,
-            contract_name=contract_name,
-            decoded_input=decoded_input,
-            processed_logs=processed_logs,
-            decoded_error=decoded_error
-        )
+@app.route('/api/tx/<tx_hash>', methods=['GET'])
+def transaction_details_api(tx_hash):
+    client = get_active_client()
+    if not client:
+        return jsonify({'error': 'Not connected to a node'}), 503
+    try:
+        details = load_transaction(client, tx_hash)
     except Exception as e:
-        return render_template('error.html', message=str(e))
+        return jsonify({'error': str(e) or type(e).__name__}), 500
+    if not details:
+        return jsonify({'error': f"Transaction '{tx_hash}' not found"}), 404
+    block = details.pop('block')
+    details['block'] = {'number': block.number, 'hash': block.hash, 'timestamp': block.timestamp} if block else None
+    return app.response_class(Web3.to_json(details), mimetype='application/json')
+
+@app.route('/api/reverts', methods=['POST'])
+def precompute_reverts():
+    """Replays every failed transaction in {"from", "to"} and caches the revert data.
+
+    Replays run `REVERT_SCAN_WORKERS` at a time; already cached ones cost nothing.
+    """
+    client = get_active_client()
+    if not client:
+        return jsonify({'error': 'Not connected to a node'}), 503
+    data = request.get_json() or {}
+    from_block, to_block = data.get('from'), data.get('to')
+    if not isinstance(from_block, int) or not isinstance(to_block, int) or not 0 <= from_block <= to_block:
+        return jsonify({'error': 'from and to must be block numbers with from <= to'}), 400
+    if to_block - from_block + 1 > app.config['REVERT_SCAN_MAX_BLOCKS']:
+        return jsonify({'error': f"Ranges are limited to {app.config['REVERT_SCAN_MAX_BLOCKS']} blocks"}), 400
+
+    try:
+        failed_hashes = find_failed_transactions(client, from_block, to_block)
+        transactions = fetch_transactions(client, failed_hashes)
+    except RpcError as e:
+        return jsonify({'error': str(e)}), 502
+
+    def replay(tx):
+        try:
+            return fetch_revert_data(client, tx), None
+        except RpcError as e:
+            return None, str(e)
+
+    with ThreadPoolExecutor(max_workers=app.config['REVERT_SCAN_WORKERS']) as pool:
+        outcomes = list(pool.map(replay, [tx for tx in transactions if tx is not None]))
+
+    results = []
+    for tx, (revert_data, error) in zip([tx for tx in transactions if tx is not None], outcomes):
+        entry = {'hash': '0x' + bytes(tx.hash).hex(), 'block': tx.blockNumber, 'revert_data': revert_data}
+        if error:
+            entry['error'] = error
+        elif revert_data:
+            decoded = decode_revert(client.w3, revert_data)
+            entry.update({key: decoded[key] for key in ('contract_name', 'error_name', 'params') if key in decoded})
+        results.append(entry)
+    return app.response_class(Web3.to_json({
+        'from': from_block,
+        'to': to_block,
+        'failed': len(failed_hashes),
+        'results': results,
+    }), mimetype='application/json')
 
 @app.route('/import')
 def import_contract_page():
@@ -287,7 +1054,7 @@ def import_contract_page():
 @app.route('/interact', methods=['GET'])
 def interact():
     """Serves the page that lists all saved contracts."""
-    contracts = ContractABI.query.all()
+    contracts = ContractABI.query.order_by(ContractABI.id).all()
     return render_template('interact.html', contracts=contracts)
 
 @app.route('/interact/<int:contract_id>')
@@ -296,16 +1063,48 @@ def contract_interaction_page(contract_id):
     contract = ContractABI.query.get_or_404(contract_id)
     # We need to pass the contract data and the parsed ABI to the template
     contract_data = {'id': contract.id, 'name': contract.name, 'address': contract.address}
-    abi = json.loads(contract.abi)
-
-    # Add signature to each event and error for display in the UI
+    # Copy the items: the cached ABI is shared and the signatures below are display-only
+    abi = [dict(item) for item in get_contract_abi(contract.id)]
+
+    # Add signature to each event and error for display in the UI, from the precomputed index
+    selectors = {
+        (row.kind, row.signature): row.selector
+        for row in AbiSignature.query.filter(AbiSignature.contract_id == contract.id,
+                                             AbiSignature.kind.in_(['event', 'error']))
+    }
     for item in abi:
         if item.get('type') in ['event', 'error']:
-            signature_text = f"{item['name']}({','.join([inp['type'] for inp in item.get('inputs', [])])})"
-            # Correctly take the first 4 bytes (8 hex characters) and add the '0x' prefix.
-            item['signature'] = '0x' + Web3.keccak(text=signature_text).hex()[:8]
+            selector = selectors.get((item['type'], signature_text(item)))
+            # Show the first 4 bytes (8 hex characters) with the '0x' prefix.
+            item['signature'] = selector[:10] if selector else None
     return render_template('contract_interaction.html', contract=contract_data, abi=abi)
 
+@app.route('/analytics', methods=['GET'])
+def analytics_page():
+    return render_template('analytics.html')
+
+@app.route('/api/analytics/blocks', methods=['GET'])
+def block_range_analytics():
+    """Gas, fee, transaction and block time statistics for ?from=&to= (default: the last 1000 blocks)."""
+    client = get_active_client()
+    if not client:
+        return jsonify({'error': 'Not connected to a node'}), 503
+    try:
+        head = client.head_number()
+        to_block = request.args.get('to', type=int)
+        to_block = head if to_block is None else min(to_block, head)
+        from_block = request.args.get('from', type=int)
+        if from_block is None:
+            from_block = max(to_block - 999, 0)
+        buckets = min(max(request.args.get('buckets', 100, type=int), 1), 1000)
+        stats = block_analytics.analyze(client, cache_scope(client), from_block, to_block,
+                                        chain_cache.is_final(to_block, head), buckets)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except (AnalyticsError, RpcError) as e:
+        return jsonify({'error': str(e)}), 502
+    return jsonify(stats)
+
 @app.route('/networks', methods=['GET'])
 def networks_page():
     return render_template('networks.html')
@@ -328,18 +1127,23 @@ def add_contract():
 
     try:
         # Validate that the ABI is valid JSON
-        json.loads(abi_json)
-    except json.JSONDecodeError:
+        rows = list(abi_selectors(json.loads(abi_json)))
+    except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
         return jsonify({'error': 'Invalid ABI format'}), 400
 
     if ContractABI.query.filter_by(name=name).first():
         return jsonify({'error': 'A contract with this name already exists'}), 409
-    if ContractABI.query.filter_by(address=checksum_address).first():
+    if ContractABI.query.filter_by(address_lower=checksum_address.lower()).first():
         return jsonify({'error': 'This contract address is already saved'}), 409
 
-    new_contract = ContractABI(name=name, address=checksum_address, abi=abi_json)
+    new_contract = ContractABI(name=name, address=checksum_address, address_lower=checksum_address.lower(), abi=abi_json)
     db.session.add(new_contract)
+    db.session.flush()
+    index_contract_abi(new_contract, rows)
     db.session.commit()
+    selector_index.add(new_contract.id, new_contract.name, rows)
+    abi_cache.invalidate(new_contract.id)
+    contract_search_index.add(new_contract.id, new_contract.name, new_contract.address)
 
     return jsonify({'id': new_contract.id, 'name': new_contract.name}), 201
 
@@ -348,6 +1152,20 @@ def get_contracts():
     contracts = ContractABI.query.all()
     return jsonify([{'id': c.id, 'name': c.name, 'address': c.address} for c in contracts])
 
+@app.route('/api/contracts/lookup', methods=['POST'])
+def lookup_contracts():
+    """Resolves a list of addresses to saved contracts in one query."""
+    data = request.get_json() or {}
+    addresses = data.get('addresses')
+    if not isinstance(addresses, list) or not all(isinstance(a, str) for a in addresses):
+        return jsonify({'error': 'addresses must be a list of strings'}), 400
+    found = find_contracts_by_address(addresses)
+    return jsonify({
+        address: ({'id': found[address.lower()][0], 'name': found[address.lower()][1],
+                   'address': found[address.lower()][2]} if address.lower() in found else None)
+        for address in addresses
+    })
+
 @app.route('/api/contracts/<int:contract_id>', methods=['GET', 'DELETE'])
 def manage_contract(contract_id):
     contract = ContractABI.query.get_or_404(contract_id)
@@ -357,59 +1175,170 @@ def manage_contract(contract_id):
             'id': contract.id, 
             'name': contract.name, 
             'address': contract.address,
-            'abi': json.loads(contract.abi)
+            'abi': get_contract_abi(contract.id)
         })
 
     if request.method == 'DELETE':
+        AbiSignature.query.filter_by(contract_id=contract.id).delete()
         db.session.delete(contract)
         db.session.commit()
+        selector_index.remove(contract_id)
+        abi_cache.invalidate(contract_id)
+        contract_search_index.remove(contract_id)
         return jsonify({'message': 'Contract deleted successfully'}), 200
 
+class _ImportBatch:
+    """Pending inserts/updates of one chunk of /api/contracts/import, written in one transaction."""
+
+    def __init__(self):
+        self.inserts = []  # (values, rows, result)
+        self.updates = []  # (contract_id, values, rows, result)
+
+    def __len__(self):
+        return len(self.inserts) + len(self.updates)
+
+    def write(self):
+        if not len(self):
+            return
+        contracts = ContractABI.__table__
+        if self.inserts:
+            db.session.execute(contracts.insert(), [values for values, _, _ in self.inserts])
+            names = [values['name'] for values, _, _ in self.inserts]
+            ids = dict(db.session.query(ContractABI.name, ContractABI.id).filter(ContractABI.name.in_(names)))
+            for values, _, result in self.inserts:
+                result['id'] = ids[values['name']]
+        for contract_id, values, _, _ in self.updates:
+            db.session.execute(contracts.update().where(contracts.c.id == contract_id).values(**values))
+        if self.updates:
+            db.session.query(AbiSignature).filter(
+                AbiSignature.contract_id.in_([u[0] for u in self.updates])).delete(synchronize_session=False)
+
+        indexed = [(result['id'], values, rows) for values, rows, result in self.inserts]
+        indexed += [(contract_id, values, rows) for contract_id, values, rows, _ in self.updates]
+        signature_rows = [
+            {'contract_id': contract_id, 'kind': kind, 'selector': selector,
+             'signature': signature, 'fragment': json.dumps(fragment)}
+            for contract_id, _, rows in indexed
+            for kind, selector, signature, fragment in rows
+        ]
+        if signature_rows:
+            db.session.execute(AbiSignature.__table__.insert(), signature_rows)
+        db.session.commit()
+
+        for contract_id, _, _, _ in self.updates:
+            selector_index.remove(contract_id)
+        for contract_id, values, rows in indexed:
+            selector_index.add(contract_id, values['name'], rows)
+            abi_cache.invalidate(contract_id)
+            contract_search_index.add(contract_id, values['name'], values['address'])
+        self.inserts, self.updates = [], []
+
+
 @app.route('/api/contracts/import', methods=['POST'])
 def import_contracts_bulk():
-    contracts_data = request.get_json()
-    if not isinstance(contracts_data, list):
-        return jsonify({'error': 'Request body must be a JSON array of contracts'}), 400
-
-    added_count = 0
+    """Imports a JSON array of {name, address, abi} entries.
+
+    The body is parsed incrementally and written in chunks of IMPORT_CHUNK_SIZE, each
+    in its own transaction. Duplicates are checked against one preloaded set of saved
+    names/addresses plus the entries seen so far. With ?mode=upsert, entries matching
+    a saved contract (by address, then name) replace its name, address and ABI.
+    """
+    upsert = request.args.get('mode') == 'upsert'
+    chunk_size = app.config['IMPORT_CHUNK_SIZE']
+
+    existing_by_address, existing_by_name = {}, {}
+    for contract_id, name, address_lower in db.session.query(ContractABI.id, ContractABI.name, ContractABI.address_lower):
+        existing_by_address[address_lower] = contract_id
+        existing_by_name[name] = contract_id
+    seen_names, seen_addresses = set(), set()
+
+    batch = _ImportBatch()
+    results = []
     errors = []
+    added_count = updated_count = 0
 
-    for contract_data in contracts_data:
-        name = contract_data.get('name')
-        address = contract_data.get('address')
-        abi_data = contract_data.get('abi')
-
-        if not all([name, address, abi_data]):
-            errors.append({'error': 'Missing name, address, or ABI for an entry', 'data': name or 'N/A'})
-            continue
+    def fail(result, message, data):
+        result.update(status='error', error=message)
+        errors.append({'error': message, 'data': data})
 
-        if not Web3.is_address(address):
-            errors.append({'error': f'Invalid Ethereum address for {name}', 'data': address})
-            continue
-        
-        checksum_address = Web3.to_checksum_address(address)
+    try:
+        for index, contract_data in enumerate(iter_json_array(request.stream)):
+            result = {'index': index}
+            results.append(result)
+            if not isinstance(contract_data, dict):
+                fail(result, 'Entry must be a JSON object', 'N/A')
+                continue
 
-        try:
-            abi_json = json.dumps(abi_data) if isinstance(abi_data, (dict, list)) else abi_data
-            json.loads(abi_json) # Validate
-        except (json.JSONDecodeError, TypeError):
-            errors.append({'error': f'Invalid ABI format for {name}', 'data': abi_data})
-            continue
+            name = contract_data.get('name')
+            address = contract_data.get('address')
+            abi_data = contract_data.get('abi')
+            result['name'] = name
 
-        if ContractABI.query.filter((ContractABI.name == name) | (ContractABI.address == checksum_address)).first():
-            errors.append({'error': f'Contract with name {name} or address {address} already exists', 'data': name})
-            continue
+            if not all([name, address, abi_data]):
+                fail(result, 'Missing name, address, or ABI for an entry', name or 'N/A')
+                continue
 
-        new_contract = ContractABI(name=name, address=checksum_address, abi=abi_json)
-        db.session.add(new_contract)
-        added_count += 1
+            if not Web3.is_address(address):
+                fail(result, f'Invalid Ethereum address for {name}', address)
+                continue
 
-    if added_count > 0:
-        db.session.commit()
+            checksum_address = Web3.to_checksum_address(address)
 
+            try:
+                # Serialize or parse exactly once: lists need text for storage, text needs parsing for selectors
+                if isinstance(abi_data, (dict, list)):
+                    abi, abi_json = abi_data, json.dumps(abi_data)
+                else:
+                    abi, abi_json = json.loads(abi_data), abi_data
+                rows = list(abi_selectors(abi))
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError):
+                fail(result, f'Invalid ABI format for {name}', name)
+                continue
+
+            address_lower = checksum_address.lower()
+            if name in seen_names or address_lower in seen_addresses:
+                fail(result, f'Duplicate of an earlier entry in this import: {name}', name)
+                continue
+            seen_names.add(name)
+            seen_addresses.add(address_lower)
+
+            address_id = existing_by_address.get(address_lower)
+            name_id = existing_by_name.get(name)
+            values = {'name': name, 'address': checksum_address, 'address_lower': address_lower, 'abi': abi_json}
+
+            if address_id is None and name_id is None:
+                result['status'] = 'added'
+                batch.inserts.append((values, rows, result))
+                added_count += 1
+            elif not upsert:
+                fail(result, f'Contract with name {name} or address {address} already exists', name)
+                continue
+            elif address_id is not None and name_id is not None and address_id != name_id:
+                fail(result, f'Name {name} and address {address} belong to different saved contracts', name)
+                continue
+            else:
+                contract_id = address_id if address_id is not None else name_id
+                result.update(status='updated', id=contract_id)
+                batch.updates.append((contract_id, values, rows, result))
+                updated_count += 1
+
+            if len(batch) >= chunk_size:
+                batch.write()
+    except JSONStreamError as e:
+        # Chunks already written stay imported; report how far we got
+        batch.write()
+        message = f'Invalid JSON after entry {len(results)}: {e}' if results else 'Request body must be a JSON array of contracts'
+        return jsonify({'error': message, 'results': results}), 400
+
+    batch.write()
+
+    message = f'Processed {len(results)} entries. Added {added_count} new contracts.'
+    if upsert:
+        message += f' Updated {updated_count} existing contracts.'
     response = {
-        'message': f'Processed {len(contracts_data)} entries. Added {added_count} new contracts.',
-        'errors': errors
+        'message': message,
+        'errors': errors,
+        'results': results
     }
     status_code = 207 if errors else 201
     return jsonify(response), status_code
@@ -418,28 +1347,70 @@ def import_contracts_bulk():
 @app.route('/api/contracts/all', methods=['DELETE'])
 def clear_all_contracts():
     try:
+        db.session.query(AbiSignature).delete()
         num_deleted = db.session.query(ContractABI).delete()
         db.session.commit()
+        selector_index.clear()
+        abi_cache.clear()
+        contract_search_index.clear()
         return jsonify({'message': f'Successfully deleted {num_deleted} contracts.'}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'An error occurred: {str(e)}'}), 500
 
 
+class ArgumentError(ValueError):
+    pass
+
+def coerce_args(func_abi, args):
+    """Converts form values (strings) to the Python types of the function's inputs."""
+    if 'inputs' not in func_abi or len(args) != len(func_abi['inputs']):
+        return args
+    processed_args = []
+    for i, arg_input in enumerate(func_abi['inputs']):
+        arg_type = arg_input.get('type')
+        arg_value = args[i]
+
+        try:
+            if arg_type.startswith(('uint', 'int')):
+                if arg_value:
+                    processed_args.append(int(arg_value))
+                else:
+                    processed_args.append(0)
+            elif arg_type == 'bool':
+                processed_args.append(arg_value if isinstance(arg_value, bool) else arg_value.lower() in ['true', '1'])
+            elif arg_type == 'address' and arg_value:
+                processed_args.append(Web3.to_checksum_address(arg_value))
+            else:
+                processed_args.append(arg_value)
+        except (ValueError, TypeError, AttributeError) as e:
+            raise ArgumentError(f'Invalid format for argument {i+1} (type {arg_type}): {str(e)}')
+    return processed_args
+
 @app.route('/api/interact', methods=['POST'])
 def handle_interaction():
-    active_network = get_active_network()
-    w3 = make_w3(active_network.rpc_url) if active_network else make_w3(RPC_URL)
+    w3 = get_w3()
     if not w3:
         return jsonify({'error': 'Not connected to a node'}), 503
 
     data = request.get_json()
+    contract_id = data.get('contract_id')
     contract_address = data.get('address')
     abi = data.get('abi')
     private_key = data.get('private_key')
     function_name = data.get('function')
     args = data.get('args', [])
 
+    # Saved contracts are referenced by id so clients don't re-upload the ABI on every call
+    saved_contract = None
+    if contract_id is not None:
+        saved_contract = db.session.query(ContractABI.id, ContractABI.address).filter(
+            ContractABI.id == contract_id).first()
+        if not saved_contract:
+            return jsonify({'error': f'Contract {contract_id} not found'}), 404
+        contract_address = contract_address or saved_contract.address
+        abi = get_contract_abi(saved_contract.id)
+
     if not all([contract_address, abi, function_name]):
         return jsonify({'error': 'Missing required fields'}), 400
 
@@ -448,36 +1419,23 @@ def handle_interaction():
 
     try:
         checksum_address = Web3.to_checksum_address(contract_address)
-        contract = w3.eth.contract(address=checksum_address, abi=abi)
+        if saved_contract:
+            contract = get_contract_factory(w3, saved_contract.id)(address=checksum_address)
+        else:
+            contract = w3.eth.contract(address=checksum_address, abi=abi)
         func = getattr(contract.functions, function_name)
         
-        func_abi = next((item for item in abi if item.get('type') == 'function' and item.get('name') == function_name), None)
-
-        if func_abi is None:
+        if not any(item.get('type') == 'function' and item.get('name') == function_name for item in abi):
             return jsonify({'error': f'Function {function_name} not found in ABI'}), 404
+        # Overloads share a name; the argument count picks the one being called
+        func_abi = find_function(abi, function_name, len(args))
+        if func_abi is None:
+            return jsonify({'error': f'Function {function_name} with {len(args)} arguments not found in ABI'}), 400
 
-        processed_args = []
-        if 'inputs' in func_abi and len(args) == len(func_abi['inputs']):
-            for i, arg_input in enumerate(func_abi['inputs']):
-                arg_type = arg_input.get('type')
-                arg_value = args[i]
-
-                try:
-                    if arg_type.startswith(('uint', 'int')):
-                        if arg_value:
-                            processed_args.append(int(arg_value))
-                        else:
-                            processed_args.append(0)
-                    elif arg_type == 'bool':
-                        processed_args.append(arg_value.lower() in ['true', '1'])
-                    elif arg_type == 'address' and arg_value:
-                        processed_args.append(Web3.to_checksum_address(arg_value))
-                    else:
-                        processed_args.append(arg_value)
-                except (ValueError, TypeError) as e:
-                    return jsonify({'error': f'Invalid format for argument {i+1} (type {arg_type}): {str(e)}'}), 400
-        else:
-            processed_args = args
+        try:
+            processed_args = coerce_args(func_abi, args)
+        except ArgumentError as e:
+            return jsonify({'error': str(e)}), 400
 
         is_transaction = func_abi.get('stateMutability') not in ['view', 'pure']
 
@@ -486,22 +1444,13 @@ def handle_interaction():
                 return jsonify({'error': 'Private key is required for transactions'}), 400
             
             try:
-                account = w3.eth.account.from_key(private_key)
-                nonce = w3.eth.get_transaction_count(account.address)
-
-                tx_params = {
-                    'from': account.address,
-                    'nonce': nonce,
-                    'gas': 2000000,
-                    'gasPrice': w3.eth.gas_price
-                }
-
-                transaction = func(*processed_args).build_transaction(tx_params)
-                signed_tx = w3.eth.account.sign_transaction(transaction, private_key)
-
-                # Send the raw transaction using the correct attribute
-                tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-                result = tx_hash.hex()
+                client = get_active_client()
+                tx = {'to': checksum_address, 'data': encode_call(w3.codec, func_abi, processed_args), 'value': 0}
+                # Nonce, fees and gas come from the shared sender so concurrent calls don't collide
+                results, _ = tx_sender.send(client, cache_scope(client), private_key, [tx])
+                if 'error' in results[0]:
+                    raise TxError(results[0]['error'])
+                result = results[0]['hash']
 
             except Exception as e:
                 return jsonify({'error': f'Transaction failed: {str(e)}'}), 500
@@ -516,26 +1465,323 @@ def handle_interaction():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def encode_call(codec, fragment, args):
+    """0x-prefixed calldata for calling function `fragment` with already coerced `args`."""
+    selector = next(abi_selectors([fragment]))[1]
+    return selector + codec.encode([canonical_type(p) for p in fragment.get('inputs', [])], args).hex()
+
+def find_function(abi, name, arg_count):
+    return next((item for item in abi if item.get('type') == 'function' and item.get('name') == name
+                 and len(item.get('inputs', [])) == arg_count), None)
+
+def _read_functions(abi):
+    """Zero-argument view/pure functions of an ABI: the ones a state snapshot can read."""
+    return [
+        item for item in abi
+        if item.get('type') == 'function' and item.get('stateMutability') in ('view', 'pure')
+        and not item.get('inputs')
+    ]
+
+@app.route('/api/interact/read', methods=['POST'])
+def bulk_read():
+    """Reads many view functions of saved contracts in one aggregated call.
+
+    Body: {"contract_ids": [...]} reads every zero-argument view/pure function of those
+    contracts; {"calls": [{"contract_id", "function", "args"}]} reads chosen ones. Both
+    may be combined. Calls go through Multicall3 when the chain has it (or plain
+    eth_calls in one JSON-RPC batch) and are all evaluated at the same block.
+    """
+    client = get_active_client()
+    if not client:
+        return jsonify({'error': 'Not connected to a node'}), 503
+    data = request.get_json() or {}
+    contract_ids = data.get('contract_ids') or []
+    requested = data.get('calls') or []
+    if not isinstance(contract_ids, list) or not isinstance(requested, list):
+        return jsonify({'error': 'contract_ids and calls must be lists'}), 400
+    if not all(isinstance(i, int) for i in contract_ids) or \
+            not all(isinstance(c, dict) and isinstance(c.get('contract_id'), int) for c in requested):
+        return jsonify({'error': 'contract_ids must be integers and every call needs an integer contract_id'}), 400
+
+    ids = set(contract_ids) | {call['contract_id'] for call in requested}
+    contracts = {
+        row.id: row for row in db.session.query(ContractABI.id, ContractABI.name, ContractABI.address)
+        .filter(ContractABI.id.in_(ids))
+    }
+    missing = [i for i in ids if i not in contracts]
+    if missing:
+        return jsonify({'error': f'Contracts not found: {missing}'}), 404
+
+    # (contract, function fragment, args) for every read, in response order
+    reads = []
+    for contract_id in contract_ids:
+        for fragment in _read_functions(get_contract_abi(contract_id)):
+            reads.append((contracts[contract_id], fragment, []))
+    for call in requested:
+        contract = contracts[call['contract_id']]
+        args = call.get('args') or []
+        fragment = find_function(get_contract_abi(contract.id), call.get('function'), len(args))
+        if fragment is None:
+            return jsonify({'error': f"Function {call.get('function')} with {len(args)} arguments "
+                                     f"not found in {contract.name}"}), 404
+        try:
+            reads.append((contract, fragment, coerce_args(fragment, args)))
+        except ArgumentError as e:
+            return jsonify({'error': f"{contract.name}.{fragment['name']}: {e}"}), 400
+
+    codec = client.w3.codec
+    calls = []
+    try:
+        for contract, fragment, args in reads:
+            calls.append((contract.address, bytes.fromhex(encode_call(codec, fragment, args)[2:])))
+    except Exception as e:
+        return jsonify({'error': f'Could not encode arguments: {e}'}), 400
+
+    try:
+        # Pin every read to one block so the snapshot is consistent with or without Multicall3
+        block_number = client.head_number()
+        outcomes = read_many(client, calls, hex(block_number), data.get('multicall', True))
+    except Exception as e:
+        return jsonify({'error': str(e) or type(e).__name__}), 502
+
+    results = []
+    for (contract, fragment, args), outcome in zip(reads, outcomes):
+        entry = {'contract_id': contract.id, 'contract_name': contract.name,
+                 'function': fragment['name'], 'args': args, 'success': outcome.success}
+        if outcome.success:
+            output_types = [canonical_type(p) for p in fragment.get('outputs', [])]
+            try:
+                values = codec.decode(output_types, outcome.data)
+                entry['result'] = values[0] if len(values) == 1 else list(values)
+            except Exception as e:
+                entry.update({'success': False, 'error': f'Could not decode result: {e}'})
+        else:
+            entry['error'] = outcome.error
+            if outcome.data:
+                revert_hex = '0x' + outcome.data.hex()
+                entry['revert_data'] = revert_hex
+                error_name = decode_revert(client.w3, revert_hex).get('error_name')
+                if error_name:
+                    entry['decoded_error'] = error_name
+        results.append(entry)
+
+    return app.response_class(Web3.to_json({
+        'block': block_number,
+        'multicall': bool(client.supports_multicall) and data.get('multicall', True),
+        'results': results,
+    }), mimetype='application/json')
+
+@app.route('/api/interact/batch', methods=['POST'])
+def batch_interaction():
+    """Signs a list of state-changing calls locally and submits them pipelined from one key.
+
+    Body: {"private_key", "calls": [{"contract_id", "function", "args", "value"}],
+    "wait": bool, "timeout": seconds}. Nonces are assigned consecutively by the
+    shared nonce manager; with "wait" all receipts are awaited concurrently, for at
+    most INTERACT_BATCH_MAX_WAIT seconds.
+    """
+    client = get_active_client()
+    if not client:
+        return jsonify({'error': 'Not connected to a node'}), 503
+    data = request.get_json() or {}
+    private_key = data.get('private_key')
+    calls = data.get('calls')
+    if not private_key:
+        return jsonify({'error': 'Private key is required for transactions'}), 400
+    if not isinstance(calls, list) or not calls:
+        return jsonify({'error': 'calls must be a non-empty list'}), 400
+    if len(calls) > app.config['INTERACT_BATCH_MAX_CALLS']:
+        return jsonify({'error': f"At most {app.config['INTERACT_BATCH_MAX_CALLS']} calls per batch"}), 400
+    if not all(isinstance(c, dict) and isinstance(c.get('contract_id'), int) for c in calls):
+        return jsonify({'error': 'Every call needs an integer contract_id'}), 400
+    try:
+        timeout = float(data.get('timeout', 60))
+    except (TypeError, ValueError):
+        timeout = None
+    if timeout is None or not math.isfinite(timeout) or timeout < 0:
+        return jsonify({'error': 'timeout must be a non-negative number of seconds'}), 400
+    timeout = min(timeout, app.config['INTERACT_BATCH_MAX_WAIT'])
+
+    ids = {call['contract_id'] for call in calls}
+    contracts = {
+        row.id: row for row in db.session.query(ContractABI.id, ContractABI.name, ContractABI.address)
+        .filter(ContractABI.id.in_(ids))
+    }
+    missing = [i for i in ids if i not in contracts]
+    if missing:
+        return jsonify({'error': f'Contracts not found: {missing}'}), 404
+
+    txs = []
+    for i, call in enumerate(calls):
+        contract = contracts[call['contract_id']]
+        args = call.get('args') or []
+        fragment = find_function(get_contract_abi(contract.id), call.get('function'), len(args))
+        if fragment is None:
+            return jsonify({'error': f"Call {i}: function {call.get('function')} with {len(args)} arguments "
+                                     f"not found in {contract.name}"}), 404
+        try:
+            txs.append({'to': contract.address, 'value': int(call.get('value') or 0),
+                        'data': encode_call(client.w3.codec, fragment, coerce_args(fragment, args))})
+        except ArgumentError as e:
+            return jsonify({'error': f"Call {i}: {e}"}), 400
+        except Exception as e:
+            return jsonify({'error': f"Call {i}: could not encode arguments: {e}"}), 400
+
+    try:
+        results, stats = tx_sender.send(client, cache_scope(client), private_key, txs,
+                                        wait=bool(data.get('wait')), timeout=timeout)
+    except (TxError, RpcError) as e:
+        return jsonify({'error': str(e)}), 502
+    except ValueError as e:
+        # Raised by eth_account for malformed keys
+        return jsonify({'error': f'Invalid private key: {e}'}), 400
+    return jsonify({'results': results, 'stats': stats})
+
+BLOCK_TAGS = ('latest', 'pending', 'safe', 'finalized', 'earliest')
+
+def _account_chunk(client, addresses, block):
+    results = batch_request(client, [
+        call for address in addresses for call in (
+            ('eth_getBalance', [address, block]),
+            ('eth_getTransactionCount', [address, block]),
+            ('eth_getCode', [address, block]),
+        )
+    ])
+    accounts = []
+    for i, address in enumerate(addresses):
+        balance, nonce, code = results[3 * i:3 * i + 3]
+        error = next((r for r in (balance, nonce, code) if isinstance(r, RpcError)), None)
+        if error is not None:
+            accounts.append({'address': address, 'error': str(error)})
+            continue
+        accounts.append({
+            'address': address,
+            # Decimal string: wei balances overflow JavaScript numbers
+            'balance': str(int(balance, 16)),
+            'nonce': int(nonce, 16),
+            'code_size': (len(code) - 2) // 2 if code else 0,
+        })
+    return accounts
+
+def fetch_account_states(client, addresses, block='latest'):
+    """Yields balance, nonce and code size of `addresses` at `block`, one list per chunk, in order.
+
+    Each chunk of ADDRESS_BATCH_SIZE addresses is one JSON-RPC batch (three calls per
+    address), with at most ADDRESS_BATCH_WORKERS batches in flight. Failures are
+    reported per address instead of failing the whole request.
+    """
+    chunk_size = app.config['ADDRESS_BATCH_SIZE']
+    workers = app.config['ADDRESS_BATCH_WORKERS']
+    chunks = [addresses[i:i + chunk_size] for i in range(0, len(addresses), chunk_size)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # Submit a bounded window ahead so streaming large lists doesn't buffer every result
+        futures = [pool.submit(_account_chunk, client, chunk, block) for chunk in chunks[:workers]]
+        for i in range(len(chunks)):
+            if i + workers < len(chunks):
+                futures.append(pool.submit(_account_chunk, client, chunks[i + workers], block))
+            yield futures[i].result()
+            futures[i] = None
+
+@app.route('/api/addresses', methods=['POST'])
+def address_states():
+    """Balance, nonce and code size for many addresses.
+
+    Body: {"addresses": [...], "block": number or tag, "format": "json" | "ndjson"}.
+    "latest" is pinned to the current head so every chunk reads the same block.
+    NDJSON streams one account per line as chunks complete.
+    """
+    client = get_active_client()
+    if not client:
+        return jsonify({'error': 'Not connected to a node'}), 503
+    data = request.get_json() or {}
+    addresses = data.get('addresses')
+    if not isinstance(addresses, list) or not addresses:
+        return jsonify({'error': 'addresses must be a non-empty list'}), 400
+    if len(addresses) > app.config['ADDRESS_MAX_COUNT']:
+        return jsonify({'error': f"At most {app.config['ADDRESS_MAX_COUNT']} addresses per request"}), 400
+    invalid = [a for a in addresses if not isinstance(a, str) or not Web3.is_address(a)]
+    if invalid:
+        return jsonify({'error': f'Invalid addresses: {invalid[:10]}'}), 400
+
+    block = data.get('block', 'latest')
+    try:
+        if block == 'latest':
+            block = client.head_number()
+        if isinstance(block, int) and not isinstance(block, bool) and block >= 0:
+            block_param = hex(block)
+        elif block in BLOCK_TAGS:
+            block_param = block
+        else:
+            return jsonify({'error': f'block must be a number or one of {", ".join(BLOCK_TAGS)}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e) or type(e).__name__}), 502
+
+    addresses = [Web3.to_checksum_address(a) for a in addresses]
+    if data.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson':
+        def lines():
+            for accounts in fetch_account_states(client, addresses, block_param):
+                yield ''.join(json.dumps(account, separators=(',', ':')) + '\n' for account in accounts)
+        return Response(lines(), mimetype='application/x-ndjson', headers={'X-Block': str(block)})
+
+    accounts = [account for chunk in fetch_account_states(client, addresses, block_param) for account in chunk]
+    return jsonify({'block': block, 'accounts': accounts})
+
+def history_cursor(value):
+    """Parses an address history cursor '<block>:<transaction index>'; None if malformed."""
+    parts = value.split(':')
+    if len(parts) != 2 or not all(part.isdigit() for part in parts):
+        return None
+    return int(parts[0]), int(parts[1])
+
 @app.route('/address/<address>')
 def address_details(address):
-    active_network = get_active_network()
-    w3 = make_w3(active_network.rpc_url) if active_network else make_w3(RPC_URL)
-    if not w3: return redirect(url_for('index'))
+    client = get_active_client()
+    if not client: return redirect(url_for('index'))
     try:
-        balance = w3.eth.get_balance(address)
-        nonce = w3.eth.get_transaction_count(address)
-        return render_template('address.html', address=address, balance_eth=Web3.from_wei(balance, 'ether'), nonce=nonce)
+        if not Web3.is_address(address):
+            return render_template('error.html', message=f"'{address}' is not a valid address.")
+        # Balance, nonce and code in one JSON-RPC batch
+        account = next(fetch_account_states(client, [Web3.to_checksum_address(address)]))[0]
+        if 'error' in account:
+            return render_template('error.html', message=account['error'])
+
+        # Transaction history is only available for chains the optional indexer follows
+        history, next_cursor = None, None
+        scope = cache_scope(client)
+        if chain_indexer.covers(scope):
+            per_page = min(max(request.args.get('per_page', 25, type=int), 1), 100)
+            before = None
+            if request.args.get('before'):
+                before = history_cursor(request.args['before'])
+                if before is None:
+                    return render_template('error.html', message=f"Invalid 'before' cursor '{request.args['before']}', "
+                                                                 f"expected <block>:<transaction index>.")
+            history = chain_indexer.history(scope, address, limit=per_page, before=before)
+            if len(history) == per_page:
+                next_cursor = f"{history[-1][0]}:{history[-1][1]}"
+
+        return render_template('address.html', address=address,
+                               balance_eth=Web3.from_wei(int(account['balance']), 'ether'), nonce=account['nonce'],
+                               code_size=account['code_size'], history=history, next_cursor=next_cursor)
     except Exception as e:
         return render_template('error.html', message=str(e))
 
 with app.app_context():
+    event.listen(db.engine, 'connect', _configure_sqlite)
+    event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
     db.create_all()
+    migrate_contract_addresses()
+    migrate_network_endpoints()
+    load_selector_index()
+    load_search_index()
     # Seed default network from env if no networks exist
     if Network.query.count() == 0:
         if RPC_URL:
             try:
                 default_name = os.getenv('GETH_NETWORK_NAME', 'Default')
-                db.session.add(Network(name=default_name, rpc_url=RPC_URL, is_default=True))
+                db.session.add(Network(name=default_name, rpc_url=RPC_URL, is_default=True,
+                                       backup_rpc_urls=json.dumps(BACKUP_RPC_URLS) if BACKUP_RPC_URLS else None))
                 db.session.commit()
             except Exception as e:
                 db.session.rollback()
@@ -543,26 +1789,131 @@ with app.app_context():
         else:
             print("Warning: No networks configured and GETH_RPC_URL not set.")
 
+    # Opt-in address indexer following the default network
+    if os.getenv('INDEXER_ENABLED', '').lower() in ('1', 'true', 'yes'):
+        default_net = Network.query.filter_by(is_default=True).first()
+        indexer_client = client_registry.get(default_net.id, default_net.rpc_urls, default_net.name) if default_net else None
+        if indexer_client:
+            start_block = os.getenv('INDEXER_START_BLOCK')
+            chain_indexer.start(indexer_client, cache_scope(indexer_client),
+                                int(start_block) if start_block else None)
+        else:
+            print("Warning: INDEXER_ENABLED is set but the default network is unreachable.")
+
 @app.route('/anvil', methods=['GET'])
 def anvil_page():
     return render_template('anvil.html')
 
 @app.route('/api/anvil/logs', methods=['GET'])
 def anvil_logs():
-    return jsonify({'logs': anvil_manager.get_logs()})
+    """Log lines after the `since` cursor; with `wait`, long-polls up to that many seconds."""
+    fork = anvil_manager.get_fork(request.args.get('fork', DEFAULT_FORK))
+    if fork is None:
+        return jsonify({'error': 'Unknown fork'}), 404
+    since = request.args.get('since', 0, type=int)
+    wait = min(request.args.get('wait', 0, type=float), 30)
+    if wait > 0:
+        lines, cursor, truncated = fork.wait_for_logs(since, wait)
+    else:
+        lines, cursor, truncated = fork.get_logs(since)
+    return jsonify({'logs': lines, 'cursor': cursor, 'truncated': truncated})
+
+@app.route('/api/anvil/logs/stream', methods=['GET'])
+def anvil_logs_stream():
+    """Server-Sent Events feed of Anvil log lines, resumable via Last-Event-ID."""
+    fork = anvil_manager.get_fork(request.args.get('fork', DEFAULT_FORK))
+    if fork is None:
+        return jsonify({'error': 'Unknown fork'}), 404
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', 0, type=int)
+
+    def events():
+        cursor = since
+        idle = 0
+        yield 'retry: 2000\n\n'
+        while not shutting_down.is_set():
+            lines, new_cursor, truncated = fork.wait_for_logs(cursor, STREAM_POLL_SECONDS)
+            if not lines:
+                idle += STREAM_POLL_SECONDS
+                if idle >= STREAM_KEEPALIVE_SECONDS:
+                    idle = 0
+                    yield ': keep-alive\n\n'
+                continue
+            idle = 0
+            cursor = new_cursor
+            payload = json.dumps({'lines': lines, 'truncated': truncated})
+            yield f"id: {cursor}\nevent: logs\ndata: {payload}\n\n"
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# --- Address Indexer API ---
+
+@app.route('/api/indexer/status', methods=['GET'])
+def indexer_status():
+    return jsonify(chain_indexer.get_status())
+
+@app.route('/api/indexer/start', methods=['POST'])
+def start_indexer():
+    data = request.get_json() or {}
+    try:
+        start_block = int(data['start_block']) if data.get('start_block') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'start_block must be a block number'}), 400
+    if start_block is not None and start_block < 0:
+        return jsonify({'error': 'start_block must be a non-negative block number'}), 400
+    client = get_active_client()
+    if not client:
+        return jsonify({'error': 'Not connected to a node'}), 503
+    chain_indexer.start(client, cache_scope(client), start_block)
+    return jsonify({'message': 'Indexer started', 'scope': chain_indexer.scope})
+
+@app.route('/api/indexer/stop', methods=['POST'])
+def stop_indexer():
+    chain_indexer.stop()
+    return jsonify({'message': 'Indexer stopped'})
+
+@app.route('/api/indexer/backfill', methods=['POST'])
+def backfill_indexer():
+    data = request.get_json() or {}
+    try:
+        from_block = int(data['from'])
+        to_block = int(data['to'])
+        workers = int(data.get('workers', 4))
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'from and to block numbers are required'}), 400
+    if from_block > to_block or workers < 1:
+        return jsonify({'error': 'Invalid block range or worker count'}), 400
+    if chain_indexer.backfill_stats.get('running'):
+        return jsonify({'error': 'A backfill is already running'}), 409
+    client = get_active_client()
+    if not client:
+        return jsonify({'error': 'Not connected to a node'}), 503
+    threading.Thread(
+        target=chain_indexer.backfill,
+        args=(client, cache_scope(client), from_block, to_block, workers),
+        daemon=True,
+    ).start()
+    return jsonify({'message': f'Backfilling blocks {from_block}-{to_block}'}), 202
 
 # --- Network Management API ---
 @app.route('/api/networks', methods=['GET'])
 def list_networks():
     nets = Network.query.order_by(Network.created_at.asc()).all()
-    return jsonify([
-        {
-            'id': n.id,
-            'name': n.name,
-            'rpc_url': n.rpc_url,
-            'is_default': n.is_default
-        } for n in nets
-    ])
+    return jsonify([n.to_dict() for n in nets])
+
+def backup_urls_arg(data, rpc_url, default=None):
+    """The "backup_rpc_urls" of a network request as a JSON column value. Raises ValueError."""
+    urls = data.get('backup_rpc_urls', default)
+    if urls is None:
+        return None
+    if isinstance(urls, str):
+        urls = urls.replace(',', '\n').splitlines()
+    if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+        raise ValueError('backup_rpc_urls must be a list of URLs')
+    urls = [url for url in dict.fromkeys(url.strip() for url in urls) if url and url != rpc_url]
+    return json.dumps(urls) if urls else None
 
 @app.route('/api/networks', methods=['POST'])
 def create_network():
@@ -572,15 +1923,19 @@ def create_network():
     is_default = bool(data.get('is_default', False))
     if not name or not rpc_url:
         return jsonify({'error': 'name and rpc_url are required'}), 400
+    try:
+        backup_rpc_urls = backup_urls_arg(data, rpc_url)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     if Network.query.filter((Network.name == name) | (Network.rpc_url == rpc_url)).first():
         return jsonify({'error': 'Network with same name or rpc_url already exists'}), 409
     try:
         if is_default:
             Network.query.update({Network.is_default: False})
-        net = Network(name=name, rpc_url=rpc_url, is_default=is_default)
+        net = Network(name=name, rpc_url=rpc_url, backup_rpc_urls=backup_rpc_urls, is_default=is_default)
         db.session.add(net)
         db.session.commit()
-        return jsonify({'id': net.id, 'name': net.name, 'rpc_url': net.rpc_url, 'is_default': net.is_default}), 201
+        return jsonify(net.to_dict()), 201
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -588,7 +1943,18 @@ def create_network():
 @app.route('/api/networks/<int:net_id>', methods=['GET'])
 def get_network(net_id):
     net = Network.query.get_or_404(net_id)
-    return jsonify({'id': net.id, 'name': net.name, 'rpc_url': net.rpc_url, 'is_default': net.is_default})
+    return jsonify(net.to_dict())
+
+@app.route('/api/networks/<int:net_id>/endpoints', methods=['GET'])
+def network_endpoints(net_id):
+    """Routing state of each endpoint: smoothed and p95 latency, breaker state and counters."""
+    net = Network.query.get_or_404(net_id)
+    client = client_registry.peek(net.id, net.rpc_urls)
+    if client is None:
+        return jsonify({'network_id': net.id, 'healthy': None,
+                        'endpoints': [{'url': url, 'breaker': 'unknown'} for url in net.rpc_urls]})
+    return jsonify({'network_id': net.id, 'healthy': client.healthy, 'hedging': client.hedge,
+                    'endpoints': client.endpoint_status()})
 
 @app.route('/api/networks/<int:net_id>', methods=['PUT'])
 def update_network(net_id):
@@ -597,17 +1963,23 @@ def update_network(net_id):
     name = data.get('name', net.name)
     rpc_url = data.get('rpc_url', net.rpc_url)
     is_default = data.get('is_default', net.is_default)
+    try:
+        backup_rpc_urls = backup_urls_arg(data, rpc_url, net.backups)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     conflict = Network.query.filter(((Network.name == name) | (Network.rpc_url == rpc_url)) & (Network.id != net_id)).first()
     if conflict:
         return jsonify({'error': 'Another network with same name or rpc_url exists'}), 409
     try:
         net.name = name
         net.rpc_url = rpc_url
+        net.backup_rpc_urls = backup_rpc_urls
         net.is_default = bool(is_default)
         if net.is_default:
             Network.query.filter(Network.id != net.id).update({Network.is_default: False})
         db.session.commit()
-        return jsonify({'id': net.id, 'name': net.name, 'rpc_url': net.rpc_url, 'is_default': net.is_default})
+        client_registry.drop(net_id)
+        return jsonify(net.to_dict())
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -619,6 +1991,7 @@ def delete_network(net_id):
         was_default = net.is_default
         db.session.delete(net)
         db.session.commit()
+        client_registry.drop(net_id)
         if was_default:
             fallback = Network.query.first()
             if fallback:
@@ -644,16 +2017,41 @@ def activate_network(net_id):
 def anvil_status():
     return jsonify(anvil_manager.get_status())
 
+def fork_block_arg(data):
+    """The optional "fork_block_number" of a fork request as an int (None for latest). Raises ValueError."""
+    value = data.get('fork_block_number')
+    if value in (None, '', 'latest'):
+        return None
+    try:
+        block = int(value, 0) if isinstance(value, str) else value
+    except ValueError:
+        block = None
+    if not isinstance(block, int) or isinstance(block, bool) or block < 0:
+        raise ValueError('fork_block_number must be a non-negative block number')
+    return block
+
 @app.route('/api/anvil/start', methods=['POST'])
 def start_anvil():
+    """(Re)starts the default fork; responds once Anvil serves RPC, not when the process spawns."""
     data = request.get_json() or {}
     fork_url = data.get('fork_url')
     chain_id = data.get('chain_id')
     
     if not fork_url:
         return jsonify({'error': 'fork_url is required'}), 400
-
-    success, message = anvil_manager.start_fork(fork_url, chain_id)
+    try:
+        fork_block_number = fork_block_arg(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not anvil_manager.enabled:
+        return jsonify({'error': 'Anvil forks are disabled on this server (ANVIL_ENABLED=0)'}), 409
+
+    previous_scope = f"anvil:{anvil_manager.default.scope_id}:"
+    started = time.time()
+    success, message = anvil_manager.start_fork(fork_url, chain_id, fork_block_number, bool(data.get('reset_state')))
+    # Whatever the previous fork cached no longer describes the local chain
+    forget_scopes(previous_scope)
     
     if success:
         # Automatically register or update the Local Anvil network
@@ -667,6 +2065,8 @@ def start_anvil():
                 anvil_net.name = f"Local Anvil Fork (Chain {chain_id})" if chain_id else "Local Anvil Fork"
             
             db.session.commit()
+            # The previous client (if any) may have been marked unhealthy while Anvil was down
+            client_registry.drop(anvil_net.id)
             
             # Optionally set as active session network
             session['network_id'] = anvil_net.id
@@ -675,7 +2075,9 @@ def start_anvil():
             return jsonify({
                 'message': 'Anvil started successfully',
                 'network_id': anvil_net.id,
-                'rpc_url': local_rpc
+                'rpc_url': local_rpc,
+                'startup': anvil_manager.default.startup,
+                'seconds': round(time.time() - started, 3),
             })
         except Exception as e:
             return jsonify({'message': 'Anvil started but DB update failed', 'error': str(e)}), 200
@@ -684,10 +2086,152 @@ def start_anvil():
 
 @app.route('/api/anvil/stop', methods=['POST'])
 def stop_anvil():
+    previous_scope = f"anvil:{anvil_manager.default.scope_id}:"
     if anvil_manager.stop():
+        forget_scopes(previous_scope)
         return jsonify({'message': 'Anvil stopped successfully'})
     return jsonify({'error': 'Anvil was not running or could not be stopped'}), 400
 
+# --- Anvil fork pool API ---
+
+@app.route('/api/anvil/forks', methods=['POST'])
+def create_fork():
+    """Starts a named fork on its own port (instantly, if a warm one matches) and registers it as a Network."""
+    data = request.get_json() or {}
+    name = (data.get('name') or '').strip()
+    fork_url = data.get('fork_url')
+    chain_id = data.get('chain_id')
+    if not name or not fork_url:
+        return jsonify({'error': 'name and fork_url are required'}), 400
+    if name == DEFAULT_FORK:
+        return jsonify({'error': f"'{DEFAULT_FORK}' is reserved for /api/anvil/start"}), 400
+    try:
+        fork_block_number = fork_block_arg(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    started = time.time()
+    try:
+        fork, warm = anvil_manager.acquire(name, fork_url, chain_id, fork_block_number=fork_block_number)
+    except (ForkExistsError, PoolFullError, AnvilLockedError, AnvilDisabledError) as e:
+        return jsonify({'error': str(e)}), 409
+    except AnvilError as e:
+        return jsonify({'error': str(e)}), 500
+
+    try:
+        # A row left by an earlier fork on the same port is reused; user networks never are
+        network = Network.query.filter_by(anvil_fork=name).first() or \
+            Network.query.filter(Network.anvil_fork.isnot(None), Network.rpc_url == fork.rpc_url).first()
+        if network is None:
+            network = Network(name=_fork_network_name(name), rpc_url=fork.rpc_url, is_default=False, anvil_fork=name)
+            db.session.add(network)
+        else:
+            network.name, network.rpc_url, network.anvil_fork = _fork_network_name(name), fork.rpc_url, name
+        db.session.commit()
+        client_registry.drop(network.id)
+    except Exception as e:
+        db.session.rollback()
+        anvil_manager.release(name)
+        return jsonify({'error': f'Could not register the fork as a network: {e}'}), 500
+
+    return jsonify({
+        'name': name,
+        'network_id': network.id,
+        'rpc_url': fork.rpc_url,
+        'warm': warm,
+        'startup': fork.startup,
+        'seconds': round(time.time() - started, 3),
+    }), 201
+
+@app.route('/api/anvil/forks/<name>', methods=['DELETE'])
+def delete_fork(name):
+    try:
+        fork = anvil_manager.get_fork(name)
+        previous_scope = f"anvil:{fork.scope_id}:" if fork else None
+        fork = anvil_manager.release(name)
+    except AnvilError as e:
+        return jsonify({'error': str(e)}), 400
+    if fork is None:
+        return jsonify({'error': 'Unknown fork'}), 404
+    forget_scopes(previous_scope)
+    network = Network.query.filter_by(anvil_fork=name).first()
+    if network is not None:
+        client_registry.drop(network.id)
+        if session.get('network_id') == network.id:
+            session.pop('network_id', None)
+        db.session.delete(network)
+        db.session.commit()
+    return jsonify({'message': f'Fork {name} stopped'})
+
+@app.route('/api/anvil/forks/<name>/snapshot', methods=['POST'])
+def snapshot_fork(name):
+    fork = anvil_manager.get_fork(name)
+    if fork is None or not fork.is_running():
+        return jsonify({'error': 'Unknown or stopped fork'}), 404
+    try:
+        return jsonify({'snapshot_id': fork.snapshot()})
+    except AnvilError as e:
+        return jsonify({'error': str(e)}), 502
+
+@app.route('/api/anvil/forks/<name>/revert', methods=['POST'])
+def revert_fork(name):
+    """evm_revert to {"snapshot_id"}; with "resnapshot" a fresh snapshot is taken right after.
+
+    Anvil forgets a snapshot once reverted to, so test loops that reset repeatedly
+    pass the returned snapshot_id to the next revert.
+    """
+    fork = anvil_manager.get_fork(name)
+    if fork is None or not fork.is_running():
+        return jsonify({'error': 'Unknown or stopped fork'}), 404
+    data = request.get_json() or {}
+    snapshot_id = data.get('snapshot_id')
+    if not snapshot_id:
+        return jsonify({'error': 'snapshot_id is required'}), 400
+
+    started = time.time()
+    previous_scope = f"anvil:{fork.scope_id}:"
+    try:
+        reverted = fork.revert(snapshot_id)
+        response = {'reverted': reverted}
+        if reverted:
+            forget_scopes(previous_scope)
+            if data.get('resnapshot'):
+                response['snapshot_id'] = fork.snapshot()
+    except AnvilError as e:
+        return jsonify({'error': str(e)}), 502
+    response['seconds'] = round(time.time() - started, 4)
+    return jsonify(response), 200 if reverted else 409
+
+@app.route('/api/anvil/pool', methods=['POST'])
+def configure_fork_pool():
+    """Keeps {"count"} warm idle forks of {"fork_url", "chain_id", "fork_block_number"} ready for instant handout."""
+    data = request.get_json() or {}
+    fork_url = data.get('fork_url')
+    count = data.get('count', 1)
+    if not fork_url or not isinstance(count, int) or count < 0:
+        return jsonify({'error': 'fork_url and a non-negative count are required'}), 400
+    try:
+        fork_block_number = fork_block_arg(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        anvil_manager.set_warm_pool(fork_url, data.get('chain_id'), count, fork_block_number)
+    except (AnvilLockedError, AnvilDisabledError) as e:
+        return jsonify({'error': str(e)}), 409
+    except AnvilError as e:
+        return jsonify({'error': str(e)}), 500
+    return jsonify(anvil_manager.get_status()['pool'])
+
+def shutdown_services():
+    """Ends open streams, stops the Anvil forks and background threads of this process; safe to call more than once."""
+    shutting_down.set()
+    anvil_manager.shutdown()
+    chain_indexer.stop()
+    client_registry.stop_health.set()
+    client_registry.clear()
+    rpc_executor.shutdown(wait=False, cancel_futures=True)
+
 if __name__ == '__main__':
+    # Development server with the debugger and reloader; serve.py runs the app in production
     # The host '0.0.0.0' makes it accessible from other devices on your network
     app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
@@ -0,0 +1,341 @@
+"""Deterministic JSON-RPC stand-in for benchmarks.
+
+Serves a synthetic chain: every block has the same number of transfer()
+transactions to a fixed set of token contracts, every receipt carries the same
+number of Transfer logs, and every `failed_every`-th transaction reverts with the
+custom error InsufficientBalance(address,uint256). The same data can be saved as
+contracts with contract_entries(), so pages decode against real ABIs.
+
+    python -m benchmarks.fake_node --port 18645 --latency-ms 20 --jitter-ms 5
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TRANSFER_SELECTOR = 'a9059cbb'
+BALANCE_OF_SELECTOR = '70a08231'
+TRANSFER_TOPIC = '0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef'
+INSUFFICIENT_BALANCE_SELECTOR = 'f6deaa04'
+CHAIN_ID = 31337
+
+
+def contract_address(index):
+    return '0x' + format(0xc0de0000 + index, '040x')
+
+
+def sender_address(index):
+    return '0x' + format(0xee000000 + index, '040x')
+
+
+def contract_abi(index):
+    """An ERC20-like ABI; every contract gets a few distinct functions so selector indexes have work to do."""
+    def fn(name, inputs, outputs, mutability):
+        return {'type': 'function', 'name': name, 'stateMutability': mutability,
+                'inputs': [{'name': n, 'type': t} for n, t in inputs],
+                'outputs': [{'name': '', 'type': t} for t in outputs]}
+    return [
+        fn('transfer', [('to', 'address'), ('amount', 'uint256')], ['bool'], 'nonpayable'),
+        fn('balanceOf', [('owner', 'address')], ['uint256'], 'view'),
+        fn('totalSupply', [], ['uint256'], 'view'),
+        fn(f'extra{index}', [('value', 'uint256')], [], 'nonpayable'),
+        {'type': 'event', 'name': 'Transfer', 'anonymous': False, 'inputs': [
+            {'name': 'from', 'type': 'address', 'indexed': True},
+            {'name': 'to', 'type': 'address', 'indexed': True},
+            {'name': 'value', 'type': 'uint256', 'indexed': False}]},
+        {'type': 'error', 'name': 'InsufficientBalance', 'inputs': [
+            {'name': 'account', 'type': 'address'}, {'name': 'needed', 'type': 'uint256'}]},
+    ]
+
+
+def contract_entries(count):
+    """{name, address, abi} dicts for /api/contracts/import."""
+    return [{'name': f'Token{index}', 'address': contract_address(index), 'abi': contract_abi(index)}
+            for index in range(count)]
+
+
+def _word(value):
+    return format(value, '064x')
+
+
+class SyntheticChain:
+    """Blocks 0..head; all objects are computed from (block number, tx index) on demand."""
+
+    def __init__(self, head=1000, txs_per_block=200, logs_per_receipt=100, failed_every=10, contracts=1000):
+        self.head = head
+        self.txs_per_block = txs_per_block
+        self.logs_per_receipt = logs_per_receipt
+        self.failed_every = failed_every
+        self.contracts = contracts
+
+    # Hashes encode their position so lookups need no tables
+    def tx_hash(self, number, index):
+        return '0xa1' + format(number, '030x') + format(index, '032x')
+
+    def block_hash(self, number):
+        return '0xb1' + format(number, '062x')
+
+    def parse_tx_hash(self, value):
+        if not isinstance(value, str) or not value.startswith('0xa1') or len(value) != 66:
+            return None
+        number, index = int(value[4:34], 16), int(value[34:], 16)
+        return (number, index) if number <= self.head and index < self.txs_per_block else None
+
+    def parse_block_hash(self, value):
+        if not isinstance(value, str) or not value.startswith('0xb1') or len(value) != 66:
+            return None
+        number = int(value[4:], 16)
+        return number if number <= self.head else None
+
+    def failed(self, index):
+        return bool(self.failed_every) and index % self.failed_every == self.failed_every - 1
+
+    def amount(self, number, index):
+        return number * 100_000 + index + 1
+
+    def transaction(self, number, index):
+        to = contract_address((number * self.txs_per_block + index) % self.contracts)
+        data = '0x' + TRANSFER_SELECTOR + _word(int(sender_address(index + 1), 16)) + _word(self.amount(number, index))
+        return {
+            'hash': self.tx_hash(number, index), 'blockNumber': hex(number), 'blockHash': self.block_hash(number),
+            'transactionIndex': hex(index), 'from': sender_address(index), 'to': to, 'value': '0x0',
+            'gas': hex(100_000), 'gasPrice': hex(10 ** 9), 'input': data, 'nonce': hex(number),
+            'type': '0x0', 'v': '0x1b', 'r': '0x' + _word(1), 's': '0x' + _word(2), 'chainId': hex(CHAIN_ID),
+        }
+
+    def block(self, number, full=False):
+        txs = [self.transaction(number, i) if full else self.tx_hash(number, i) for i in range(self.txs_per_block)]
+        zero = '0x' + _word(0)
+        return {
+            'number': hex(number), 'hash': self.block_hash(number),
+            'parentHash': self.block_hash(number - 1) if number else zero,
+            'timestamp': hex(1_700_000_000 + 12 * number), 'miner': sender_address(0),
+            'gasUsed': hex(21_000 * self.txs_per_block), 'gasLimit': hex(30_000_000),
+            'baseFeePerGas': hex(10 ** 9 + number), 'transactions': txs, 'nonce': '0x0000000000000000',
+            'sha3Uncles': zero, 'logsBloom': '0x' + '00' * 256, 'transactionsRoot': zero, 'stateRoot': zero,
+            'receiptsRoot': zero, 'difficulty': '0x0', 'totalDifficulty': '0x0', 'extraData': '0x',
+            'size': hex(500 * self.txs_per_block), 'uncles': [], 'mixHash': zero,
+        }
+
+    def receipt(self, number, index):
+        tx = self.transaction(number, index)
+        failed = self.failed(index)
+        logs = [] if failed else [{
+            'address': tx['to'], 'topics': [TRANSFER_TOPIC, '0x' + _word(int(tx['from'], 16)),
+                                            '0x' + _word(int(sender_address(index + 1), 16))],
+            'data': '0x' + _word(self.amount(number, index) + i), 'blockNumber': hex(number),
+            'blockHash': self.block_hash(number), 'transactionHash': tx['hash'], 'transactionIndex': hex(index),
+            'logIndex': hex(index * self.logs_per_receipt + i), 'removed': False,
+        } for i in range(self.logs_per_receipt)]
+        return {
+            'transactionHash': tx['hash'], 'transactionIndex': hex(index), 'blockNumber': hex(number),
+            'blockHash': self.block_hash(number), 'from': tx['from'], 'to': tx['to'], 'contractAddress': None,
+            'status': '0x0' if failed else '0x1', 'gasUsed': hex(50_000), 'cumulativeGasUsed': hex(50_000 * (index + 1)),
+            'effectiveGasPrice': hex(10 ** 9), 'logs': logs, 'logsBloom': '0x' + '00' * 256, 'type': '0x0',
+        }
+
+    def call(self, call):
+        """eth_call: replays of failed transfers revert with InsufficientBalance, views return a word."""
+        data = (call.get('data') or call.get('input') or '0x')[2:]
+        if data.startswith(TRANSFER_SELECTOR) and len(data) >= 136:
+            number, index = divmod(int(data[72:136], 16) - 1, 100_000)
+            if self.failed(index):
+                revert = '0x' + INSUFFICIENT_BALANCE_SELECTOR + _word(int(call.get('from', '0x0'), 16)) + \
+                    _word(self.amount(number, index))
+                raise RpcFault(3, 'execution reverted', revert)
+            return '0x' + _word(1)
+        if data.startswith(BALANCE_OF_SELECTOR):
+            return '0x' + _word(10 ** 18)
+        return '0x' + _word(42)
+
+    def block_number_arg(self, value):
+        if value in ('latest', 'pending', 'safe', 'finalized', None):
+            return self.head
+        if value == 'earliest':
+            return 0
+        return int(value, 16)
+
+    def handle(self, method, params):
+        if method == 'eth_chainId':
+            return hex(CHAIN_ID)
+        if method == 'net_version':
+            return str(CHAIN_ID)
+        if method == 'web3_clientVersion':
+            return 'fake-node/benchmark'
+        if method == 'eth_blockNumber':
+            return hex(self.head)
+        if method in ('eth_gasPrice', 'eth_maxPriorityFeePerGas'):
+            return hex(10 ** 9)
+        if method == 'eth_getBlockByNumber':
+            number = self.block_number_arg(params[0])
+            return self.block(number, bool(params[1])) if number <= self.head else None
+        if method == 'eth_getBlockByHash':
+            number = self.parse_block_hash(params[0])
+            return self.block(number, bool(params[1])) if number is not None else None
+        if method in ('eth_getTransactionByHash', 'eth_getTransactionReceipt'):
+            position = self.parse_tx_hash(params[0])
+            if position is None:
+                return None
+            return self.transaction(*position) if method == 'eth_getTransactionByHash' else self.receipt(*position)
+        if method == 'eth_getBlockReceipts':
+            number = self.block_number_arg(params[0])
+            return [self.receipt(number, i) for i in range(self.txs_per_block)] if number <= self.head else None
+        if method == 'eth_call':
+            return self.call(params[0])
+        if method == 'eth_getBalance':
+            return hex(10 ** 18)
+        if method == 'eth_getTransactionCount':
+            return hex(5)
+        if method == 'eth_getCode':
+            address = int(params[0], 16)
+            # Token contracts have code; Multicall3 does not exist here, so reads fall back to batches
+            return '0x6080604052' if 0xc0de0000 <= address < 0xc0de0000 + self.contracts else '0x'
+        if method == 'eth_estimateGas':
+            return hex(60_000)
+        if method == 'eth_sendRawTransaction':
+            return '0x' + _word(int(time.time() * 1e6))
+        if method == 'eth_feeHistory':
+            count = min(int(params[0], 16) if isinstance(params[0], str) else params[0], self.head + 1)
+            return {'oldestBlock': hex(self.head - count + 1), 'baseFeePerGas': [hex(10 ** 9)] * (count + 1),
+                    'gasUsedRatio': [0.5] * count, 'reward': [[hex(10 ** 9)] * len(params[2] or [])] * count}
+        raise RpcFault(-32601, f'Method {method} not supported')
+
+
+class RpcFault(Exception):
+    def __init__(self, code, message, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+class LatencyProfile:
+    """Per HTTP request: `latency_ms` plus uniform jitter, plus `per_call_ms` for each call in a batch.
+
+    `method_ms` overrides the base latency for requests containing a given method
+    (the slowest one wins), e.g. historical eth_calls. Jitter comes from a seeded RNG.
+    """
+
+    def __init__(self, latency_ms=20, jitter_ms=0, per_call_ms=0.5, method_ms=None, seed=1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.per_call_ms = per_call_ms
+        self.method_ms = method_ms or {}
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def delay(self, methods):
+        base = max([self.method_ms.get(method, self.latency_ms) for method in methods] or [self.latency_ms])
+        with self.lock:
+            jitter = self.random.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+        return (base + jitter + self.per_call_ms * max(len(methods) - 1, 0)) / 1000
+
+
+class FakeNode:
+    """The HTTP server; GET /stats reports how many calls and HTTP requests it served."""
+
+    def __init__(self, chain, profile, port=0):
+        self.chain = chain
+        self.profile = profile
+        self.calls = 0
+        self.requests = 0
+        self.methods = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+
+    def _answer(self, call):
+        response = {'jsonrpc': '2.0', 'id': call.get('id')}
+        try:
+            response['result'] = self.chain.handle(call.get('method'), call.get('params') or [])
+        except RpcFault as e:
+            response['error'] = {'code': e.code, 'message': str(e), **({'data': e.data} if e.data else {})}
+        except Exception as e:
+            response['error'] = {'code': -32602, 'message': f'Invalid params: {e}'}
+        return response
+
+    def _handler(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; with Nagle on, each response would stall ~40 ms
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body):
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                with node.lock:
+                    self._send({'calls': node.calls, 'requests': node.requests, 'methods': dict(node.methods)})
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                calls = body if isinstance(body, list) else [body]
+                methods = [call.get('method') for call in calls]
+                with node.lock:
+                    node.requests += 1
+                    node.calls += len(calls)
+                    for method in methods:
+                        node.methods[method] = node.methods.get(method, 0) + 1
+                time.sleep(node.profile.delay(methods))
+                answers = [node._answer(call) for call in calls]
+                self._send(answers if isinstance(body, list) else answers[0])
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def add_chain_arguments(parser):
+    parser.add_argument('--head', type=int, default=1000, help='Latest block number')
+    parser.add_argument('--txs-per-block', type=int, default=200)
+    parser.add_argument('--logs-per-receipt', type=int, default=100)
+    parser.add_argument('--failed-every', type=int, default=10, help='Every Nth transaction reverts (0: none)')
+    parser.add_argument('--contracts', type=int, default=2000, help='Token contracts transactions go to')
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--jitter-ms', type=float, default=5)
+    parser.add_argument('--per-call-ms', type=float, default=0.5, help='Extra latency per call in a batch')
+    parser.add_argument('--method-ms', action='append', default=[], metavar='METHOD=MS',
+                        help='Base latency of requests containing METHOD, e.g. eth_call=80')
+    parser.add_argument('--seed', type=int, default=1)
+
+
+def node_from_args(args, port=0):
+    chain = SyntheticChain(args.head, args.txs_per_block, args.logs_per_receipt, args.failed_every, args.contracts)
+    method_ms = {method: float(ms) for method, ms in (item.split('=', 1) for item in args.method_ms)}
+    profile = LatencyProfile(args.latency_ms, args.jitter_ms, args.per_call_ms, method_ms, args.seed)
+    return FakeNode(chain, profile, port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=18645)
+    add_chain_arguments(parser)
+    args = parser.parse_args()
+    node = node_from_args(args, args.port)
+    print(f"Fake node listening on http://127.0.0.1:{node.port}", flush=True)
+    try:
+        node.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""Benchmarks the explorer's pages and APIs against the fake JSON-RPC node.
+
+Starts benchmarks.fake_node in a subprocess, points a throwaway instance folder
+at it, imports thousands of synthetic ABIs through /api/contracts/import, then
+drives the routes with Flask's test client. Each route runs cold (targets never
+requested before) and warm (the same targets again). Results go to a JSON file;
+--compare prints the change against an earlier one.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --output after.json --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import requests
+
+from benchmarks.fake_node import add_chain_arguments, contract_address, contract_entries
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def git_revision():
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+        dirty = bool(subprocess.check_output(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                             stderr=subprocess.DEVNULL).strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+class Node:
+    """The fake node subprocess and its call counter."""
+
+    def __init__(self, args):
+        self.url = f"http://127.0.0.1:{args.node_port}"
+        command = [sys.executable, '-m', 'benchmarks.fake_node', '--port', str(args.node_port),
+                   '--head', str(args.head), '--txs-per-block', str(args.txs_per_block),
+                   '--logs-per-receipt', str(args.logs_per_receipt), '--failed-every', str(args.failed_every),
+                   '--contracts', str(args.contracts), '--latency-ms', str(args.latency_ms),
+                   '--jitter-ms', str(args.jitter_ms), '--per-call-ms', str(args.per_call_ms), '--seed', str(args.seed)]
+        for item in args.method_ms:
+            command += ['--method-ms', item]
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL)
+        self.session = requests.Session()
+        deadline = time.time() + 10
+        while True:
+            try:
+                self.calls()
+                return
+            except requests.RequestException:
+                if time.time() > deadline or self.process.poll() is not None:
+                    self.stop()
+                    raise RuntimeError('The fake node did not start')
+                time.sleep(0.05)
+
+    def calls(self):
+        return self.session.get(self.url, timeout=5).json()['calls']
+
+    def stop(self):
+        self.process.terminate()
+        self.process.wait(timeout=5)
+
+
+def run_scenario(client, node, name, requests_to_send):
+    """Sends (method, path, json body) requests one by one; returns the scenario's result row."""
+    latencies, rpc_calls, errors = [], [], 0
+    for method, path, body in requests_to_send:
+        calls_before = node.calls()
+        started = time.perf_counter()
+        response = client.open(path, method=method, json=body)
+        response.get_data()  # Streamed pages finish rendering only when consumed
+        latencies.append(time.perf_counter() - started)
+        rpc_calls.append(node.calls() - calls_before)
+        if response.status_code >= 400:
+            errors += 1
+    latencies.sort()
+    return {
+        'name': name,
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p90_ms': round(percentile(latencies, 0.90) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2),
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+        'rpc_calls_per_request': round(sum(rpc_calls) / len(rpc_calls), 2),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def scenarios(args, contract_ids):
+    """(name, [(method, path, body)]) per route; targets are distinct so the first pass is cold."""
+    n = args.iterations
+    # Old enough to be final, so warm passes can be served from the chain cache. Transaction
+    # pages use other blocks than block pages, which would already have cached their transactions.
+    blocks = [args.head - 100 - i for i in range(n)]
+    tx_blocks = [args.head - 100 - n - i for i in range(n)]
+    ok_index = 0
+    failed_index = args.failed_every - 1 if args.failed_every else 0
+
+    def tx_hash(number, index):
+        return '0xa1' + format(number, '030x') + format(index, '032x')
+
+    yield 'index', [('GET', '/', None)] * n
+    yield 'block', [('GET', f'/block/{number}', None) for number in blocks]
+    yield 'tx', [('GET', f'/tx/{tx_hash(number, ok_index)}', None) for number in tx_blocks]
+    if args.failed_every:
+        yield 'tx_failed', [('GET', f'/tx/{tx_hash(number, failed_index)}', None) for number in tx_blocks]
+    yield 'address', [('GET', f'/address/{contract_address(i)}', None) for i in range(n)]
+    yield 'interact_read', [
+        ('POST', '/api/interact', {'contract_id': contract_ids[i % len(contract_ids)], 'function': 'balanceOf',
+                                   'args': [contract_address(i)]})
+        for i in range(n)
+    ]
+
+
+def compare(results, baseline_path, threshold):
+    """Prints the change of every scenario against `baseline_path`; returns the names that regressed."""
+    with open(baseline_path) as f:
+        baseline = {row['name']: row for row in json.load(f)['scenarios']}
+    regressed = []
+    print(f"\n{'scenario':<22}{'p50 ms':>26}{'p90 ms':>26}{'rpc/req':>22}")
+    for row in results['scenarios']:
+        before = baseline.get(row['name'])
+        if before is None:
+            print(f"{row['name']:<22}{'(new)':>18}")
+            continue
+        cells = []
+        for key in ('p50_ms', 'p90_ms', 'rpc_calls_per_request'):
+            old, new = before[key], row[key]
+            change = (new - old) / old if old else 0.0
+            cells.append(f"{old:g}->{new:g} ({change:+.0%})")
+        print(f"{row['name']:<22}{cells[0]:>26}{cells[1]:>26}{cells[2]:>22}")
+        if before['p50_ms'] and (row['p50_ms'] - before['p50_ms']) / before['p50_ms'] > threshold:
+            regressed.append(row['name'])
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=30, help='Requests per scenario and pass')
+    parser.add_argument('--abis', type=int, default=2000, help='Synthetic contracts imported into contracts.db')
+    parser.add_argument('--node-port', type=int, default=18645)
+    parser.add_argument('--output', default='bench-results.json')
+    parser.add_argument('--compare', metavar='BASELINE', help='Earlier results file to compare against')
+    parser.add_argument('--fail-threshold', type=float, default=0.2,
+                        help='With --compare, exit 1 if any p50 got slower by more than this fraction')
+    add_chain_arguments(parser)
+    args = parser.parse_args()
+    args.contracts = max(args.contracts, args.abis)
+
+    node = Node(args)
+    instance = tempfile.mkdtemp(prefix='explorer-bench-')
+    os.environ.update({
+        'INSTANCE_PATH': instance,
+        'GETH_RPC_URL': node.url,
+        'GETH_BACKUP_RPC_URLS': '',
+        'RPC_HEALTH_INTERVAL': '3600',  # Keep background probes out of the call counts
+        'INDEXER_ENABLED': '',
+    })
+    try:
+        import app as explorer  # Reads the environment at import time
+
+        client = explorer.app.test_client()
+        rows = []
+
+        entries = json.dumps(contract_entries(args.abis))
+        started = time.perf_counter()
+        response = client.post('/api/contracts/import', data=entries, content_type='application/json')
+        elapsed = time.perf_counter() - started
+        rows.append({'name': 'contracts_import', 'requests': 1, 'errors': int(response.status_code >= 400),
+                     'p50_ms': round(elapsed * 1000, 2), 'p90_ms': round(elapsed * 1000, 2),
+                     'p99_ms': round(elapsed * 1000, 2), 'max_ms': round(elapsed * 1000, 2),
+                     'mean_ms': round(elapsed * 1000, 2), 'rpc_calls_per_request': 0,
+                     'peak_rss_mb': peak_rss_mb(), 'abis': args.abis})
+        with explorer.app.app_context():
+            contract_ids = [row.id for row in explorer.db.session.query(explorer.ContractABI.id).limit(args.iterations)]
+
+        for name, batch in scenarios(args, contract_ids):
+            for phase in ('cold', 'warm'):
+                row = run_scenario(client, node, f'{name}:{phase}', batch)
+                rows.append(row)
+                print(f"{row['name']:<22} p50 {row['p50_ms']:>8} ms  p99 {row['p99_ms']:>8} ms  "
+                      f"rpc/req {row['rpc_calls_per_request']:>6}  errors {row['errors']}", flush=True)
+    finally:
+        node.stop()
+
+    commit, dirty = git_revision()
+    results = {
+        'meta': {
+            'commit': commit, 'dirty': dirty,
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'args': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        },
+        'scenarios': rows,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nWrote {args.output}")
+
+    if args.compare:
+        regressed = compare(results, args.compare, args.fail_threshold)
+        if regressed:
+            print(f"\nSlower by more than {args.fail_threshold:.0%} at p50: {', '.join(regressed)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,219 @@
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from rpc_batch import RpcError, batch_request
+
+# Nodes cap eth_feeHistory at 1024 blocks per call
+FEE_HISTORY_MAX_BLOCKS = 1024
+PERCENTILES = (10, 50, 90, 99)
+# Upper bounds (seconds) of the block time histogram buckets; the last bucket is open-ended
+BLOCK_TIME_BUCKETS = (1, 2, 4, 8, 12, 15, 30, 60)
+
+
+class AnalyticsError(Exception):
+    pass
+
+
+class BlockColumns:
+    """Per-block values of a range as compact typed arrays, one slot per block."""
+
+    def __init__(self, from_block, count):
+        self.from_block = from_block
+        self.timestamp = array('Q', bytes(8 * count))
+        self.gas_used = array('Q', bytes(8 * count))
+        self.gas_limit = array('Q', bytes(8 * count))
+        self.tx_count = array('L', bytes(array('L').itemsize * count))
+        self.base_fee = array('Q', bytes(8 * count))
+        self.priority_fee = array('Q', bytes(8 * count))
+        self.has_base_fee = True
+        self.has_priority_fee = True
+
+    def __len__(self):
+        return len(self.timestamp)
+
+
+def _percentiles(values):
+    """Nearest-rank percentiles of `values` (any iterable of numbers), or None if empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    result = {f"p{p}": ordered[max((p * len(ordered) + 99) // 100 - 1, 0)] for p in PERCENTILES}
+    result.update({'min': ordered[0], 'max': ordered[-1], 'mean': sum(ordered) / len(ordered)})
+    return result
+
+
+def _histogram(values):
+    counts = [0] * (len(BLOCK_TIME_BUCKETS) + 1)
+    for value in values:
+        for i, bound in enumerate(BLOCK_TIME_BUCKETS):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f"<={bound}s" for bound in BLOCK_TIME_BUCKETS] + [f">{BLOCK_TIME_BUCKETS[-1]}s"]
+    return [{'bucket': label, 'blocks': count} for label, count in zip(labels, counts)]
+
+
+class BlockAnalytics:
+    """Gas and fee statistics over block ranges, cached per range.
+
+    Headers and eth_feeHistory are fetched in JSON-RPC batches of `chunk_size`
+    with `workers` batches in flight. Raw results are unpacked straight into typed
+    arrays (8 bytes per value) rather than kept as formatted block objects, so a
+    100k-block range stays a few MB while it is aggregated.
+    """
+
+    def __init__(self, chunk_size=250, workers=4, max_range=100_000, cache_entries=64, recent_ttl=5):
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.max_range = max_range
+        self.cache_entries = cache_entries
+        self.recent_ttl = recent_ttl
+        self.cache = OrderedDict()  # (scope, from, to, buckets) -> (stats, expires_at or None)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # --- Cache ---
+
+    def _cached(self, key):
+        with self.lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stats, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self.cache[key]
+                self.misses += 1
+                return None
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return stats
+
+    def _store(self, key, stats, final):
+        with self.lock:
+            self.cache[key] = (stats, None if final else time.time() + self.recent_ttl)
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_entries:
+                self.cache.popitem(last=False)
+
+    def drop_scopes(self, prefix):
+        with self.lock:
+            for key in [k for k in self.cache if k[0].startswith(prefix)]:
+                del self.cache[key]
+
+    # --- Fetching ---
+
+    def _fill_headers(self, client, columns, numbers):
+        results = batch_request(client, [('eth_getBlockByNumber', [hex(n), False]) for n in numbers])
+        for number, raw in zip(numbers, results):
+            if isinstance(raw, RpcError):
+                raise AnalyticsError(f"Could not fetch block {number}: {raw}")
+            if raw is None:
+                raise AnalyticsError(f"Block {number} not found")
+            i = number - columns.from_block
+            columns.timestamp[i] = int(raw['timestamp'], 16)
+            columns.gas_used[i] = int(raw['gasUsed'], 16)
+            columns.gas_limit[i] = int(raw['gasLimit'], 16)
+            columns.tx_count[i] = len(raw['transactions'])
+            if raw.get('baseFeePerGas') is None:
+                columns.has_base_fee = False
+            else:
+                columns.base_fee[i] = int(raw['baseFeePerGas'], 16)
+
+    def _fill_priority_fees(self, client, columns, spans):
+        # One batch of feeHistory calls, each covering up to FEE_HISTORY_MAX_BLOCKS blocks
+        results = batch_request(client, [
+            ('eth_feeHistory', [hex(count), hex(newest), [50]]) for newest, count in spans
+        ])
+        for (newest, count), raw in zip(spans, results):
+            if raw is None or isinstance(raw, RpcError) or not raw.get('reward'):
+                # Pre-London chains and some nodes have no fee history; that column is optional
+                columns.has_priority_fee = False
+                return
+            oldest = int(raw['oldestBlock'], 16)
+            for offset, rewards in enumerate(raw['reward']):
+                i = oldest + offset - columns.from_block
+                if 0 <= i < len(columns) and rewards:
+                    columns.priority_fee[i] = int(rewards[0], 16)
+
+    def collect(self, client, from_block, to_block):
+        """Fetches the columns for [from_block, to_block]. Raises AnalyticsError."""
+        columns = BlockColumns(from_block, to_block - from_block + 1)
+        header_chunks = [
+            list(range(start, min(start + self.chunk_size, to_block + 1)))
+            for start in range(from_block, to_block + 1, self.chunk_size)
+        ]
+        fee_spans = [
+            (min(start + FEE_HISTORY_MAX_BLOCKS - 1, to_block), min(FEE_HISTORY_MAX_BLOCKS, to_block - start + 1))
+            for start in range(from_block, to_block + 1, FEE_HISTORY_MAX_BLOCKS)
+        ]
+        fee_chunks = [fee_spans[i:i + 8] for i in range(0, len(fee_spans), 8)]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._fill_headers, client, columns, numbers) for numbers in header_chunks]
+            futures += [pool.submit(self._fill_priority_fees, client, columns, spans) for spans in fee_chunks]
+            for future in futures:
+                future.result()
+        return columns
+
+    # --- Aggregation ---
+
+    def summarize(self, columns, buckets=100):
+        count = len(columns)
+        gas_ratio = array('d', (used / limit if limit else 0.0 for used, limit in zip(columns.gas_used, columns.gas_limit)))
+        block_times = array('q', (b - a for a, b in zip(columns.timestamp, columns.timestamp[1:])))
+
+        stats = {
+            'from': columns.from_block,
+            'to': columns.from_block + count - 1,
+            'blocks': count,
+            'transactions': {'total': sum(columns.tx_count), **_percentiles(columns.tx_count)},
+            'gas_used': {'total': sum(columns.gas_used), **_percentiles(columns.gas_used)},
+            'gas_used_ratio': _percentiles(gas_ratio),
+            'base_fee': _percentiles(columns.base_fee) if columns.has_base_fee else None,
+            'priority_fee': _percentiles(columns.priority_fee) if columns.has_priority_fee else None,
+            'block_time': _percentiles(block_times),
+            'block_time_histogram': _histogram(block_times) if block_times else None,
+        }
+
+        # Downsampled series for charting: one averaged point per bucket of blocks
+        series = []
+        size = max((count + buckets - 1) // buckets, 1)
+        for start in range(0, count, size):
+            end = min(start + size, count)
+            span = end - start
+            series.append({
+                'from': columns.from_block + start,
+                'to': columns.from_block + end - 1,
+                'tx_count': sum(columns.tx_count[start:end]) / span,
+                'gas_used_ratio': sum(gas_ratio[start:end]) / span,
+                'base_fee': sum(columns.base_fee[start:end]) / span if columns.has_base_fee else None,
+            })
+        stats['series'] = series
+        return stats
+
+    def analyze(self, client, scope, from_block, to_block, final, buckets=100):
+        """Statistics for [from_block, to_block], from the cache when possible.
+
+        `final` says whether the whole range is below the reorg window; such results
+        are cached until evicted, others for `recent_ttl` seconds.
+        """
+        if from_block < 0 or to_block < from_block:
+            raise ValueError('Invalid block range')
+        if to_block - from_block + 1 > self.max_range:
+            raise ValueError(f'Ranges are limited to {self.max_range} blocks')
+        key = (scope, from_block, to_block, buckets)
+        stats = self._cached(key)
+        if stats is not None:
+            return stats
+        started = time.time()
+        stats = self.summarize(self.collect(client, from_block, to_block), buckets)
+        stats['seconds'] = round(time.time() - started, 3)
+        self._store(key, stats, final)
+        return stats
@@ -0,0 +1,123 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Prefix of scopes for chains whose identity could not be verified; nothing is cached under them
+UNVERIFIED_SCOPE = 'unverified:'
+
+
+class ChainCache:
+    """Two-tier cache for raw JSON-RPC blocks, transactions and receipts.
+
+    Entries are keyed by (scope, kind, key) where scope identifies the chain (and
+    the fork, for local Anvil nodes). Objects buried below the finality depth are
+    kept in a byte-bounded in-memory LRU and persisted to SQLite; objects still in
+    the reorg window only live in memory for `recent_ttl` seconds. Scopes starting
+    with UNVERIFIED_SCOPE are used once and never read back, so they are not cached.
+    """
+
+    def __init__(self, db_path, max_bytes=64 * 1024 * 1024, finality_depth=64, recent_ttl=5, busy_timeout=5):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.max_bytes = max_bytes
+        self.finality_depth = finality_depth
+        self.recent_ttl = recent_ttl
+        self.entries = OrderedDict()  # (scope, kind, key) -> (raw, size, expires_at or None)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.db_lock = threading.Lock()
+        self.conn = None
+        self.lookups = {}  # (kind, 'memory' | 'disk' | 'miss') -> count
+
+    def _db(self):
+        if self.conn is None:
+            # Other server processes may hold the write lock briefly; wait instead of failing
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.busy_timeout)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS chain_objects ('
+                ' scope TEXT NOT NULL, kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,'
+                ' PRIMARY KEY (scope, kind, key)) WITHOUT ROWID'
+            )
+            self.conn.commit()
+        return self.conn
+
+    def is_final(self, block_number, head_number):
+        return block_number is not None and head_number is not None and \
+            block_number <= head_number - self.finality_depth
+
+    def get(self, scope, kind, key):
+        """Returns the cached raw object, or None on a miss."""
+        if scope.startswith(UNVERIFIED_SCOPE):
+            with self.lock:
+                self._count(kind, 'miss')
+            return None
+        entry_key = (scope, kind, key)
+        with self.lock:
+            entry = self.entries.get(entry_key)
+            if entry is not None:
+                raw, _, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self.entries.move_to_end(entry_key)
+                    self._count(kind, 'memory')
+                    return raw
+                self._evict(entry_key)
+
+        with self.db_lock:
+            row = self._db().execute(
+                'SELECT value FROM chain_objects WHERE scope = ? AND kind = ? AND key = ?', entry_key
+            ).fetchone()
+        with self.lock:
+            self._count(kind, 'disk' if row is not None else 'miss')
+        if row is None:
+            return None
+        raw = json.loads(row[0])
+        self._remember(entry_key, raw, len(row[0]), None)
+        return raw
+
+    def put(self, scope, kind, key, raw, final):
+        """Stores a raw object; only `final` objects are persisted and kept indefinitely."""
+        if raw is None or scope.startswith(UNVERIFIED_SCOPE):
+            return
+        text = json.dumps(raw, separators=(',', ':'))
+        entry_key = (scope, kind, key)
+        if final:
+            self._remember(entry_key, raw, len(text), None)
+            with self.db_lock:
+                conn = self._db()
+                conn.execute('INSERT OR REPLACE INTO chain_objects VALUES (?, ?, ?, ?)', (*entry_key, text))
+                conn.commit()
+        else:
+            self._remember(entry_key, raw, len(text), time.time() + self.recent_ttl)
+
+    def drop_scopes(self, prefix):
+        """Invalidates every scope starting with `prefix` in both tiers (e.g. a restarted fork)."""
+        with self.lock:
+            for entry_key in [k for k in self.entries if k[0].startswith(prefix)]:
+                self._evict(entry_key)
+        with self.db_lock:
+            conn = self._db()
+            conn.execute('DELETE FROM chain_objects WHERE substr(scope, 1, ?) = ?', (len(prefix), prefix))
+            conn.commit()
+
+    def _remember(self, entry_key, raw, size, expires_at):
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if entry_key in self.entries:
+                self._evict(entry_key)
+            self.entries[entry_key] = (raw, size, expires_at)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                self._evict(next(iter(self.entries)))
+
+    def _count(self, kind, outcome):
+        # Caller must hold self.lock
+        self.lookups[(kind, outcome)] = self.lookups.get((kind, outcome), 0) + 1
+
+    def _evict(self, entry_key):
+        # Caller must hold self.lock
+        _, size, _ = self.entries.pop(entry_key)
+        self.total_bytes -= size
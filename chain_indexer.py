@@ -0,0 +1,272 @@
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rpc_batch import RpcError, batch_request, request as rpc_request
+
+DIRECTION_OUT = 0
+DIRECTION_IN = 1
+
+
+class IndexerError(Exception):
+    pass
+
+
+class ChainIndexer:
+    """Opt-in follower that records which transactions touch which addresses.
+
+    Blocks are fetched with full transactions in JSON-RPC batches of `batch_size`
+    and written one chunk per SQLite transaction, so the index can resume from its
+    last committed block after a restart. Rows are scoped like the chain cache (chain
+    id, or per fork for Anvil) so several networks can share one index file.
+    """
+
+    def __init__(self, db_path, batch_size=50, poll_interval=4, reorg_depth=128, busy_timeout=5):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.reorg_depth = reorg_depth
+        self.lock = threading.Lock()
+        self.conn = None
+        self.client = None
+        self.scope = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.stats = {}
+        self.backfill_stats = {}
+
+    # --- Storage ---
+
+    def _db(self):
+        # Caller must hold self.lock
+        if self.conn is None:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.busy_timeout)
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.executescript(
+                # The primary keys double as covering indexes for history and reorg lookups
+                'CREATE TABLE IF NOT EXISTS address_txs ('
+                ' scope TEXT NOT NULL, address BLOB NOT NULL, block INTEGER NOT NULL,'
+                ' tx_index INTEGER NOT NULL, direction INTEGER NOT NULL,'
+                ' PRIMARY KEY (scope, address, block, tx_index, direction)) WITHOUT ROWID;'
+                'CREATE TABLE IF NOT EXISTS indexed_txs ('
+                ' scope TEXT NOT NULL, block INTEGER NOT NULL, tx_index INTEGER NOT NULL, hash BLOB NOT NULL,'
+                ' PRIMARY KEY (scope, block, tx_index)) WITHOUT ROWID;'
+                'CREATE TABLE IF NOT EXISTS indexed_blocks ('
+                ' scope TEXT NOT NULL, number INTEGER NOT NULL, hash BLOB NOT NULL,'
+                ' PRIMARY KEY (scope, number)) WITHOUT ROWID;'
+            )
+            self.conn.commit()
+        return self.conn
+
+    def _store_blocks(self, scope, raw_blocks):
+        address_rows, tx_rows, block_rows = [], [], []
+        for raw in raw_blocks:
+            number = int(raw['number'], 16)
+            block_rows.append((scope, number, bytes.fromhex(raw['hash'][2:])))
+            for tx in raw['transactions']:
+                tx_index = int(tx['transactionIndex'], 16)
+                tx_rows.append((scope, number, tx_index, bytes.fromhex(tx['hash'][2:])))
+                address_rows.append((scope, bytes.fromhex(tx['from'][2:]), number, tx_index, DIRECTION_OUT))
+                if tx.get('to'):
+                    address_rows.append((scope, bytes.fromhex(tx['to'][2:]), number, tx_index, DIRECTION_IN))
+        with self.lock:
+            conn = self._db()
+            with conn:
+                conn.executemany('INSERT OR REPLACE INTO indexed_blocks VALUES (?, ?, ?)', block_rows)
+                conn.executemany('INSERT OR REPLACE INTO indexed_txs VALUES (?, ?, ?, ?)', tx_rows)
+                conn.executemany('INSERT OR IGNORE INTO address_txs VALUES (?, ?, ?, ?, ?)', address_rows)
+
+    def _rollback_to(self, scope, ancestor):
+        with self.lock:
+            conn = self._db()
+            with conn:
+                for table, column in (('address_txs', 'block'), ('indexed_txs', 'block'), ('indexed_blocks', 'number')):
+                    conn.execute(f'DELETE FROM {table} WHERE scope = ? AND {column} > ?', (scope, ancestor))
+
+    def _last_indexed(self, scope):
+        with self.lock:
+            row = self._db().execute(
+                'SELECT number, hash FROM indexed_blocks WHERE scope = ? ORDER BY number DESC LIMIT 1', (scope,)
+            ).fetchone()
+        return row
+
+    def _stored_hashes(self, scope, low, high):
+        with self.lock:
+            rows = self._db().execute(
+                'SELECT number, hash FROM indexed_blocks WHERE scope = ? AND number BETWEEN ? AND ?',
+                (scope, low, high),
+            ).fetchall()
+        return dict(rows)
+
+    def history(self, scope, address, limit=25, before=None):
+        """Newest-first (block, tx_index, direction, tx_hash) rows for an address.
+
+        `before` is a (block, tx_index) keyset cursor from the previous page. `address`
+        is hex, with or without the 0x prefix.
+        """
+        address = bytes.fromhex(address.lower().removeprefix('0x'))
+        query = (
+            'SELECT a.block, a.tx_index, a.direction, t.hash FROM address_txs a'
+            ' JOIN indexed_txs t ON t.scope = a.scope AND t.block = a.block AND t.tx_index = a.tx_index'
+            ' WHERE a.scope = ? AND a.address = ?'
+        )
+        params = [scope, address]
+        if before is not None:
+            query += ' AND (a.block < ? OR (a.block = ? AND a.tx_index < ?))'
+            params += [before[0], before[0], before[1]]
+        query += ' ORDER BY a.block DESC, a.tx_index DESC, a.direction LIMIT ?'
+        params.append(limit)
+        with self.lock:
+            rows = self._db().execute(query, params).fetchall()
+        return [(block, tx_index, direction, '0x' + tx_hash.hex()) for block, tx_index, direction, tx_hash in rows]
+
+    def covers(self, scope):
+        return self._last_indexed(scope) is not None
+
+    # --- Fetching ---
+
+    def _fetch_blocks(self, client, numbers):
+        results = batch_request(client, [('eth_getBlockByNumber', [hex(n), True]) for n in numbers])
+        blocks = []
+        for number, raw in zip(numbers, results):
+            if isinstance(raw, RpcError):
+                raise IndexerError(f"Could not fetch block {number}: {raw}")
+            if raw is None:
+                break  # Past the head
+            blocks.append(raw)
+        return blocks
+
+    def _find_common_ancestor(self, client, scope, tip):
+        """Walks back from `tip` until the stored hash matches the canonical chain."""
+        low = max(tip - self.reorg_depth, 0)
+        stored = self._stored_hashes(scope, low, tip)
+        numbers = list(range(tip, low - 1, -1))
+        results = batch_request(client, [('eth_getBlockByNumber', [hex(n), False]) for n in numbers])
+        for number, raw in zip(numbers, results):
+            if isinstance(raw, RpcError) or raw is None:
+                continue
+            if stored.get(number) == bytes.fromhex(raw['hash'][2:]):
+                return number
+        return low - 1
+
+    # --- Following ---
+
+    def start(self, client, scope, start_block=None):
+        """Follows the head of `client`'s chain in a daemon thread."""
+        self.stop()
+        self.client = client
+        self.scope = scope
+        self.stop_event.clear()
+        self.stats = {'scope': scope, 'rpc_url': client.rpc_url, 'indexed_block': None,
+                      'head': None, 'blocks_per_sec': 0.0, 'error': None}
+        self.thread = threading.Thread(target=self._follow, args=(client, scope, start_block), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread and self.thread.is_alive():
+            self.stop_event.set()
+            self.thread.join(timeout=10)
+        self.thread = None
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def _follow(self, client, scope, start_block):
+        last = self._last_indexed(scope)
+        if last is not None:
+            next_block = last[0] + 1
+        elif start_block is not None:
+            next_block = start_block
+        else:
+            next_block = None  # Start at the current head
+
+        while not self.stop_event.is_set():
+            try:
+                head = rpc_request(client, 'eth_blockNumber', [])
+                if isinstance(head, RpcError):
+                    raise IndexerError(f"Could not read head: {head}")
+                head = int(head, 16)
+                self.stats['head'] = head
+                if next_block is None:
+                    next_block = head
+                if next_block > head:
+                    self.stop_event.wait(self.poll_interval)
+                    continue
+
+                started = time.time()
+                numbers = list(range(next_block, min(next_block + self.batch_size, head + 1)))
+                blocks = self._fetch_blocks(client, numbers)
+                blocks = self._check_continuity(client, scope, blocks)
+                if blocks is None:
+                    # Reorg: rolled back, resume from the common ancestor
+                    last = self._last_indexed(scope)
+                    next_block = last[0] + 1 if last else next_block - self.reorg_depth
+                    continue
+                if blocks:
+                    self._store_blocks(scope, blocks)
+                    next_block = int(blocks[-1]['number'], 16) + 1
+                    self.stats['indexed_block'] = next_block - 1
+                    self.stats['blocks_per_sec'] = round(len(blocks) / max(time.time() - started, 1e-6), 1)
+                self.stats['error'] = None
+            except Exception as e:
+                self.stats['error'] = str(e)
+                self.stop_event.wait(self.poll_interval)
+
+    def _check_continuity(self, client, scope, blocks):
+        """Returns the blocks that extend the stored chain, or None after a reorg rollback."""
+        if not blocks:
+            return blocks
+        first = int(blocks[0]['number'], 16)
+        stored_parent = self._stored_hashes(scope, first - 1, first - 1).get(first - 1)
+        if stored_parent is not None and stored_parent != bytes.fromhex(blocks[0]['parentHash'][2:]):
+            ancestor = self._find_common_ancestor(client, scope, first - 1)
+            print(f"Indexer reorg detected at block {first}; rolling back to {ancestor}")
+            self._rollback_to(scope, ancestor)
+            return None
+        # A reorg during the batch itself: keep only the consistent prefix
+        for i in range(1, len(blocks)):
+            if blocks[i]['parentHash'] != blocks[i - 1]['hash']:
+                return blocks[:i]
+        return blocks
+
+    # --- Backfill ---
+
+    def backfill(self, client, scope, from_block, to_block, workers=4):
+        """Indexes [from_block, to_block] with `workers` chunks in flight. Blocking."""
+        chunks = [
+            list(range(start, min(start + self.batch_size, to_block + 1)))
+            for start in range(from_block, to_block + 1, self.batch_size)
+        ]
+        started = time.time()
+        stats_lock = threading.Lock()
+        self.backfill_stats = {'from': from_block, 'to': to_block, 'blocks': 0,
+                               'blocks_per_sec': 0.0, 'running': True, 'error': None}
+
+        def run(numbers):
+            blocks = self._fetch_blocks(client, numbers)
+            self._store_blocks(scope, blocks)
+            with stats_lock:
+                self.backfill_stats['blocks'] += len(blocks)
+                self.backfill_stats['blocks_per_sec'] = round(
+                    self.backfill_stats['blocks'] / max(time.time() - started, 1e-6), 1)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                for future in [pool.submit(run, numbers) for numbers in chunks]:
+                    future.result()
+        except Exception as e:
+            self.backfill_stats['error'] = str(e)
+        finally:
+            self.backfill_stats['running'] = False
+            self.backfill_stats['seconds'] = round(time.time() - started, 3)
+        return self.backfill_stats
+
+    def get_status(self):
+        return {
+            'running': self.is_running(),
+            'follow': dict(self.stats),
+            'backfill': dict(self.backfill_stats),
+        }
@@ -0,0 +1,108 @@
+import queue
+import threading
+import time
+
+from rpc_batch import RpcError, batch_request, request as rpc_request
+
+
+class Subscription:
+    """One connected viewer: a bounded queue of block summaries."""
+
+    def __init__(self, maxsize):
+        self.queue = queue.Queue(maxsize=maxsize)
+        # Set when the viewer falls behind; its stream ends and the browser reconnects
+        self.closed = False
+
+
+class HeadFeed:
+    def __init__(self, client):
+        self.client = client
+        self.subscribers = set()
+        self.last_head = None
+        self.thread = None
+
+
+class HeadStreamer:
+    """Fans new block summaries out to every viewer of a network from a single poller.
+
+    Each network gets at most one polling thread no matter how many viewers are
+    connected, so node load stays constant. Viewers whose queue fills up are
+    disconnected instead of slowing the others down.
+    """
+
+    def __init__(self, poll_interval=2, queue_size=32, max_backlog=10):
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.max_backlog = max_backlog
+        self.feeds = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, key, client):
+        subscription = Subscription(self.queue_size)
+        with self.lock:
+            feed = self.feeds.get(key)
+            if feed is None:
+                feed = self.feeds[key] = HeadFeed(client)
+            feed.subscribers.add(subscription)
+            if feed.thread is None or not feed.thread.is_alive():
+                feed.thread = threading.Thread(target=self._poll, args=(key, feed), daemon=True)
+                feed.thread.start()
+        return subscription
+
+    def unsubscribe(self, key, subscription):
+        with self.lock:
+            feed = self.feeds.get(key)
+            if feed:
+                feed.subscribers.discard(subscription)
+
+    def _poll(self, key, feed):
+        while True:
+            with self.lock:
+                if not feed.subscribers:
+                    # Last viewer left: retire the poller
+                    if self.feeds.get(key) is feed:
+                        del self.feeds[key]
+                    return
+            try:
+                self._check_head(feed)
+            except Exception as e:
+                print(f"Head poller for {feed.client.rpc_url} failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def _check_head(self, feed):
+        head = rpc_request(feed.client, 'eth_blockNumber', [])
+        if isinstance(head, RpcError):
+            return
+        head = int(head, 16)
+        if feed.last_head is None:
+            feed.last_head = head
+            return
+        if head <= feed.last_head:
+            return
+
+        numbers = list(range(max(feed.last_head + 1, head - self.max_backlog + 1), head + 1))
+        results = batch_request(feed.client, [('eth_getBlockByNumber', [hex(n), False]) for n in numbers])
+        for raw in results:
+            if raw is None or isinstance(raw, RpcError):
+                continue
+            self._publish(feed, {
+                'number': int(raw['number'], 16),
+                'hash': raw['hash'],
+                'timestamp': int(raw['timestamp'], 16),
+                'tx_count': len(raw['transactions']),
+                'miner': raw.get('miner'),
+                'gas_used': int(raw['gasUsed'], 16),
+            })
+        feed.last_head = head
+        feed.client.set_head(head)
+
+    def _publish(self, feed, summary):
+        with self.lock:
+            subscribers = list(feed.subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(summary)
+            except queue.Full:
+                subscription.closed = True
+                with self.lock:
+                    feed.subscribers.discard(subscription)
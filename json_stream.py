@@ -0,0 +1,81 @@
+import codecs
+import json
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+class JSONStreamError(ValueError):
+    pass
+
+
+def iter_json_array(stream, chunk_size=64 * 1024):
+    """Yields the elements of a top-level JSON array read incrementally from `stream`.
+
+    Only the element being parsed (plus one read chunk) is held in memory, so very
+    large request bodies can be processed item by item. Raises JSONStreamError if the
+    body is not a well-formed array.
+    """
+    reader = codecs.getincrementaldecoder('utf-8')()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def fill():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            eof = True
+            buffer = buffer[pos:] + reader.decode(b'', final=True)
+        else:
+            buffer = buffer[pos:] + reader.decode(chunk)
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill()
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != '[':
+        raise JSONStreamError('Request body must be a JSON array')
+    pos += 1
+
+    expect_item = True
+    first = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise JSONStreamError('Unexpected end of JSON array')
+        if buffer[pos] == ']' and (first or not expect_item):
+            return
+        if not expect_item:
+            if buffer[pos] != ',':
+                raise JSONStreamError(f'Expected "," or "]" in JSON array, got {buffer[pos]!r}')
+            pos += 1
+            expect_item = True
+            continue
+
+        # raw_decode fails on a truncated element: read more and retry
+        while True:
+            try:
+                item, end = _decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise JSONStreamError(f'Invalid JSON array element: {e}') from None
+                fill()
+                skip_whitespace()
+                continue
+            if end == len(buffer) and not eof:
+                # A number at the end of the buffer may continue in the next chunk
+                fill()
+                continue
+            break
+        pos = end
+        yield item
+        expect_item = False
+        first = False
@@ -0,0 +1,89 @@
+from functools import lru_cache
+
+from eth_abi import decode as abi_decode
+from web3 import Web3
+
+from abi_index import canonical_type, selector_index
+
+
+def _is_hashed_topic(abi_type):
+    """Indexed dynamic values (strings, bytes, arrays, tuples) are stored as their keccak hash."""
+    return abi_type in ('string', 'bytes') or abi_type.startswith('(') or abi_type.endswith(']')
+
+
+class EventDecoder:
+    """Prebuilt decoder for one event fragment: splits topics and data once per log."""
+
+    def __init__(self, name, inputs):
+        self.name = name
+        self.inputs = inputs  # tuple of (name, type, indexed)
+        self.indexed = [(n, t) for n, t, indexed in inputs if indexed]
+        self.data_names = [n for n, _, indexed in inputs if not indexed]
+        self.data_types = [t for _, t, indexed in inputs if not indexed]
+
+    def matches(self, topics):
+        return len(topics) == len(self.indexed) + 1
+
+    def decode(self, topics, data):
+        values = {}
+        for (arg_name, arg_type), topic in zip(self.indexed, topics[1:]):
+            if _is_hashed_topic(arg_type):
+                values[arg_name] = '0x' + topic.hex()
+            else:
+                values[arg_name] = _normalize(arg_type, abi_decode([arg_type], topic)[0])
+        for arg_name, arg_type, value in zip(self.data_names, self.data_types,
+                                             abi_decode(self.data_types, data)):
+            values[arg_name] = _normalize(arg_type, value)
+        # Keep ABI argument order, as web3's process_log does
+        return {arg_name: values[arg_name] for arg_name, _, _ in self.inputs}
+
+
+def _normalize(abi_type, value):
+    if abi_type == 'address':
+        return Web3.to_checksum_address(value)
+    return value
+
+
+@lru_cache(maxsize=4096)
+def _build_decoder(name, inputs):
+    return EventDecoder(name, inputs)
+
+
+def decoder_for(fragment):
+    inputs = tuple(
+        (inp.get('name') or f'arg{i}', canonical_type(inp), bool(inp.get('indexed')))
+        for i, inp in enumerate(fragment.get('inputs', []))
+    )
+    return _build_decoder(fragment['name'], inputs)
+
+
+def decode_logs(logs, contracts_by_address, index=selector_index):
+    """Decodes receipt logs by dispatching on topic0.
+
+    `contracts_by_address` maps lowercase addresses to (contract id, name) for the
+    saved contracts among the log emitters, resolved by the caller in one query.
+    Logs from unknown contracts still decode when any saved ABI defines the event.
+    """
+    processed = []
+    for log in logs:
+        processed_log = {'raw': log, 'decoded': None}
+        topics = [bytes(t) for t in log['topics']]
+        if topics:
+            own_id, own_name = contracts_by_address.get(log['address'].lower(), (None, None))
+            for match in index.lookup('event', '0x' + topics[0].hex(), contract_id=own_id):
+                decoder = decoder_for(match['fragment'])
+                if not decoder.matches(topics):
+                    continue
+                try:
+                    args = decoder.decode(topics, bytes(log['data']))
+                except Exception:
+                    continue
+                processed_log['decoded'] = {
+                    'name': decoder.name,
+                    'args': args,
+                    'contract_name': own_name,
+                    'abi_source': match['contract_name'],
+                }
+                break
+        processed.append(processed_log)
+    return processed
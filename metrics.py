@@ -0,0 +1,195 @@
+import bisect
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Seconds; wide enough for sub-millisecond cache hits and multi-second RPC stalls
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.values = {}  # label values -> count
+        self.lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self.lock:
+            values = list(self.values.items())
+        lines += [f'{self.name}{_labels(self.label_names, key)} {_number(value)}' for key, value in values]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series = {}  # label values -> [bucket counts..., sum, count]
+        self.lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = [(key, list(values)) for key, values in self.series.items()]
+        for key, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_labels(self.label_names, key, [("le", _number(bound))])} {cumulative}')
+            lines.append(f'{self.name}_bucket{_labels(self.label_names, key, [("le", "+Inf")])} {values[-1]}')
+            lines.append(f'{self.name}_sum{_labels(self.label_names, key)} {_number(values[-2])}')
+            lines.append(f'{self.name}_count{_labels(self.label_names, key)} {values[-1]}')
+        return lines
+
+
+class MetricsRegistry:
+    """Counters and histograms kept in memory and rendered in the Prometheus text format.
+
+    Recording is a dict update under a per-metric lock. State owned by other
+    components (cache sizes, Anvil processes) is read only at scrape time through
+    collectors: callables returning (name, type, help, [(labels dict, value)]) tuples.
+    """
+
+    def __init__(self):
+        self.metrics = []
+        self.collectors = []
+
+    def counter(self, name, help, labels=()):
+        metric = Counter(name, help, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, help, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        self.collectors.append(collector)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines += metric.render()
+        for collector in self.collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                print(f"Metrics collector {collector.__name__} failed: {e}")
+                continue
+            for name, kind, help, samples in families:
+                lines += [f'# HELP {name} {help}', f'# TYPE {name} {kind}']
+                lines += [f'{name}{_labels(labels.keys(), labels.values())} {_number(value)}' for labels, value in samples]
+        return '\n'.join(lines) + '\n'
+
+
+# Global instance
+metrics = MetricsRegistry()
+
+rpc_calls = metrics.counter('rpc_calls_total', 'JSON-RPC calls sent, batched calls counted one by one', ('network', 'method'))
+rpc_duration = metrics.histogram('rpc_request_duration_seconds',
+                                 'JSON-RPC HTTP round trips; batches are labelled method="batch"', ('network', 'method'))
+rpc_failures = metrics.counter('rpc_failures_total', 'JSON-RPC requests no endpoint answered', ('network',))
+
+
+class RequestTimings:
+    """Time spent per category ('rpc', 'db', 'render') while serving one request."""
+
+    def __init__(self):
+        self.seconds = {}
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def add(self, category, seconds, count=1):
+        with self.lock:
+            self.seconds[category] = self.seconds.get(category, 0.0) + seconds
+            self.counts[category] = self.counts.get(category, 0) + count
+
+    def server_timing(self, total):
+        parts = [f'{category};dur={seconds * 1000:.1f};desc="{self.counts[category]}"'
+                 for category, seconds in self.seconds.items()]
+        parts.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(parts)
+
+
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+
+def start_request_timings():
+    """Starts attributing time to a fresh RequestTimings; returns (timings, token for end_request_timings)."""
+    timings = RequestTimings()
+    return timings, _request_timings.set(timings)
+
+
+def end_request_timings(token):
+    _request_timings.reset(token)
+
+
+def current_timings():
+    return _request_timings.get()
+
+
+def record_timing(category, seconds, count=1):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(category, seconds, count)
+
+
+class timed:
+    """Context manager adding the elapsed time of its block to the current request's `category`."""
+
+    def __init__(self, category):
+        self.category = category
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record_timing(self.category, time.perf_counter() - self.started)
+        return False
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose tasks run in the submitter's context, so their RPC time counts for its request."""
+
+    def submit(self, fn, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
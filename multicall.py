@@ -0,0 +1,91 @@
+from rpc_batch import RpcError, batch_request, request as rpc_request
+
+# Multicall3 is deployed at the same address on nearly every EVM chain
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+# aggregate3((address target, bool allowFailure, bytes callData)[])
+AGGREGATE3_SELECTOR = '0x82ad56cb'
+# Keeps each aggregate call well below typical eth_call gas caps
+MAX_CALLS_PER_AGGREGATE = 200
+
+
+class CallResult:
+    """Outcome of one read: `data` is the raw return data, or the revert data on failure."""
+
+    def __init__(self, success, data=b'', error=None):
+        self.success = success
+        self.data = data
+        self.error = error
+
+
+def multicall_available(client):
+    """Whether Multicall3 is deployed on the client's chain, checked once per client."""
+    if client.supports_multicall is None:
+        code = rpc_request(client, 'eth_getCode', [MULTICALL3_ADDRESS, 'latest'])
+        if isinstance(code, RpcError):
+            return False
+        client.supports_multicall = code not in (None, '0x', '0x0')
+    return client.supports_multicall
+
+
+def _hex_bytes(value):
+    return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+
+
+def _revert_data(error):
+    data = error.data
+    if isinstance(data, dict):
+        data = data.get('data')
+    return _hex_bytes(data) if isinstance(data, str) and data.startswith('0x') else b''
+
+
+def _batch_reads(client, calls, block):
+    results = batch_request(client, [
+        ('eth_call', [{'to': target, 'data': '0x' + data.hex()}, block]) for target, data in calls
+    ])
+    return [
+        CallResult(False, _revert_data(raw), str(raw)) if isinstance(raw, RpcError)
+        else CallResult(True, _hex_bytes(raw or '0x'))
+        for raw in results
+    ]
+
+
+def read_many(client, calls, block='latest', use_multicall=True):
+    """Executes read-only `calls` (a list of (checksum address, calldata bytes)) at `block`.
+
+    With Multicall3 the calls are packed into aggregate3 calls of up to
+    MAX_CALLS_PER_AGGREGATE, all sent in one JSON-RPC batch; otherwise every call is
+    its own eth_call in one batch. Returns one CallResult per call, in order. A
+    failing call never fails the others.
+    """
+    if not calls:
+        return []
+    codec = client.w3.codec
+    if not (use_multicall and multicall_available(client)):
+        return _batch_reads(client, calls, block)
+
+    chunks = [calls[i:i + MAX_CALLS_PER_AGGREGATE] for i in range(0, len(calls), MAX_CALLS_PER_AGGREGATE)]
+    payloads = [
+        AGGREGATE3_SELECTOR + codec.encode(['(address,bool,bytes)[]'], [[(t, True, d) for t, d in chunk]]).hex()
+        for chunk in chunks
+    ]
+    responses = batch_request(client, [
+        ('eth_call', [{'to': MULTICALL3_ADDRESS, 'data': payload}, block]) for payload in payloads
+    ])
+
+    results = []
+    for chunk, raw in zip(chunks, responses):
+        try:
+            if isinstance(raw, RpcError):
+                raise raw
+            (decoded,) = codec.decode(['(bool,bytes)[]'], _hex_bytes(raw))
+            if len(decoded) != len(chunk):
+                raise ValueError('Multicall3 returned the wrong number of results')
+        except Exception:
+            # The aggregate itself failed (gas cap, odd deployment): read this chunk one by one
+            results += _batch_reads(client, chunk, block)
+            continue
+        results += [
+            CallResult(True, bytes(data)) if success else CallResult(False, bytes(data), 'execution reverted')
+            for success, data in decoded
+        ]
+    return results
@@ -0,0 +1,96 @@
+import itertools
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from web3._utils.method_formatters import PYTHONIC_RESULT_FORMATTERS
+from web3.datastructures import AttributeDict
+
+
+class RpcError(Exception):
+    """A JSON-RPC error (or transport failure) for a single call in a batch."""
+
+    def __init__(self, message, code=None, data=None):
+        super().__init__(message)
+        self.code = code
+        self.data = data
+
+
+_request_ids = itertools.count(1)
+_id_lock = threading.Lock()
+
+
+def _next_id():
+    with _id_lock:
+        return next(_request_ids)
+
+
+def _unwrap(response):
+    if not isinstance(response, dict):
+        return RpcError(f"Malformed JSON-RPC response: {response!r}")
+    if response.get('error'):
+        error = response['error']
+        return RpcError(error.get('message', 'Unknown error'), error.get('code'), error.get('data'))
+    return response.get('result')
+
+
+def request(client, method, params):
+    """Sends one raw JSON-RPC call through the client's endpoint routing.
+
+    Returns the raw result, or an RpcError instance instead of raising it.
+    """
+    payload = {'jsonrpc': '2.0', 'id': _next_id(), 'method': method, 'params': params}
+    try:
+        resp = client.post(json.dumps(payload).encode(), (method,))
+        resp.raise_for_status()
+        return _unwrap(resp.json())
+    except Exception as e:
+        return RpcError(str(e))
+
+
+def batch_request(client, calls, max_workers=8):
+    """Sends `calls` (a list of (method, params)) as a single JSON-RPC batch.
+
+    Returns one entry per call, in order: the raw result, or an RpcError. Providers
+    that reject batches are remembered on the client and served with concurrent
+    single requests instead. A batch lost to a timeout, an HTTP error or a garbled
+    body is retried as single requests once, without giving up on batches.
+    """
+    if not calls:
+        return []
+
+    if client.supports_batch is not False:
+        ids = [_next_id() for _ in calls]
+        payload = [
+            {'jsonrpc': '2.0', 'id': req_id, 'method': method, 'params': params}
+            for req_id, (method, params) in zip(ids, calls)
+        ]
+        try:
+            # 4xx bodies are read too: some providers refuse batches with HTTP 400 and an error object
+            resp = client.post(json.dumps(payload).encode(), [method for method, _ in calls])
+            body = resp.json()
+        except Exception:
+            body = None
+
+        if isinstance(body, list):
+            client.supports_batch = True
+            by_id = {item.get('id'): item for item in body if isinstance(item, dict)}
+            return [
+                _unwrap(by_id[req_id]) if req_id in by_id else RpcError('Missing response in batch')
+                for req_id in ids
+            ]
+        if isinstance(body, dict) and body.get('error'):
+            # A single error object in answer to a well-formed batch: the provider does not do batches
+            client.supports_batch = False
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as pool:
+        return list(pool.map(lambda call: request(client, *call), calls))
+
+
+def format_result(method, raw):
+    """Applies web3's own result formatters so batched results match w3.eth.* output."""
+    if raw is None or isinstance(raw, RpcError):
+        return raw
+    formatter = PYTHONIC_RESULT_FORMATTERS.get(method)
+    result = formatter(raw) if formatter else raw
+    return AttributeDict.recursive(result) if isinstance(result, dict) else result
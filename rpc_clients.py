@@ -0,0 +1,538 @@
+import os
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from web3 import Web3
+
+from metrics import record_timing, rpc_calls, rpc_duration, rpc_failures
+
+# Methods that change node state: never hedged, and only retried elsewhere if the request never left
+NON_IDEMPOTENT_PREFIXES = ('eth_send', 'personal_', 'evm_', 'anvil_', 'hardhat_', 'miner_', 'debug_setHead')
+JSON_HEADERS = {'Content-Type': 'application/json'}
+# Latency samples a method needs on an endpoint before its p95 decides when to hedge
+MIN_HEDGE_SAMPLES = 5
+# Hedges that unused budget can add up to, so a quiet spell can't fund a burst
+MAX_HEDGE_TOKENS = 10
+
+
+def is_idempotent(methods):
+    return not any(method.startswith(NON_IDEMPOTENT_PREFIXES) for method in methods)
+
+
+class Endpoint:
+    """One RPC URL of a network: its recent latencies and a circuit breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and the endpoint
+    gets no traffic for `open_seconds`. Then it is tried again (half-open): one success
+    closes the breaker, one more failure reopens it.
+    """
+
+    def __init__(self, url, failure_threshold=3, open_seconds=30, window=200):
+        self.url = url
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.window = window
+        # Recent latencies per method ('batch' for batches): eth_getLogs and eth_blockNumber don't mix
+        self.latencies = {}
+        self.ewma = None  # Smoothed latency in seconds, what routing ranks by
+        self.consecutive_failures = 0
+        self.open_until = 0
+        self.requests = 0
+        self.failures = 0
+        self.hedges = 0  # Requests this endpoint was too slow for, so another one was asked too
+        self.lock = threading.Lock()
+
+    def available(self, now=None):
+        return (now or time.time()) >= self.open_until
+
+    def record_success(self, seconds, method=None):
+        """Records an answer; `method` None (health probes) counts for ranking but not for hedging."""
+        with self.lock:
+            self.requests += 1
+            if method is not None:
+                self.latencies.setdefault(method, deque(maxlen=self.window)).append(seconds)
+            self.ewma = seconds if self.ewma is None else 0.8 * self.ewma + 0.2 * seconds
+            self.consecutive_failures = 0
+            self.open_until = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.requests += 1
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.open_until = time.time() + self.open_seconds
+
+    def p95(self, method=None):
+        """p95 latency of `method`, None until it has MIN_HEDGE_SAMPLES; of all methods if None."""
+        with self.lock:
+            if method is None:
+                latencies = sorted(seconds for window in self.latencies.values() for seconds in window)
+            else:
+                latencies = sorted(self.latencies.get(method, ()))
+                if len(latencies) < MIN_HEDGE_SAMPLES:
+                    return None
+        return latencies[int(len(latencies) * 0.95)] if latencies else None
+
+    def score(self):
+        # Unmeasured endpoints rank last until the health probe has timed them
+        return self.ewma if self.ewma is not None else float('inf')
+
+    def status(self):
+        p95 = self.p95()
+        return {
+            'url': self.url,
+            'available': self.available(),
+            'breaker': 'open' if not self.available() else
+                       'half-open' if self.consecutive_failures >= self.failure_threshold else 'closed',
+            'latency_ms': round(self.ewma * 1000, 1) if self.ewma is not None else None,
+            'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+            'requests': self.requests,
+            'failures': self.failures,
+            'hedges': self.hedges,
+        }
+
+
+# The _Race whose primary request the current thread is sending, if any
+_primary = threading.local()
+
+
+class _AbortableConnectionMixin:
+    """Lets a winning hedge cut short the primary's wait for its response, see _Race.abort()."""
+
+    def getresponse(self, *args, **kwargs):
+        race = getattr(_primary, 'race', None)
+        if race is None:
+            return super().getresponse(*args, **kwargs)
+        race.watch(self)
+        try:
+            return super().getresponse(*args, **kwargs)
+        finally:
+            race.watch(None)
+
+
+class _AbortableHTTPConnection(_AbortableConnectionMixin, HTTPConnection):
+    pass
+
+
+class _AbortableHTTPSConnection(_AbortableConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _AbortableHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _AbortableHTTPConnection
+
+
+class _AbortableHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _AbortableHTTPSConnection
+
+
+class HedgingAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections can be aborted by a hedge that answered first."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _AbortableHTTPConnectionPool, 'https': _AbortableHTTPSConnectionPool,
+        }
+
+
+class _Race:
+    """One hedged request: the primary runs on the caller's thread, the backups on the client's pool.
+
+    Whoever claims the backups first tries them in turn: the hedge task once the
+    primary outlasts the hedge delay, or the caller itself if the primary failed
+    before that. A backup answer settles the race and aborts the primary.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.primary_state = None  # 'ok' or 'failed' once the primary is over
+        self.claimed = False
+        self.settled = False
+        self.result = None
+        self.error = None
+        self.aborted = False
+        self.connection = None  # The primary's connection while it waits for a response
+
+    def watch(self, connection):
+        with self.cond:
+            if connection is not None and self.aborted:
+                raise ConnectionAbortedError('Answered by another endpoint')
+            self.connection = connection
+
+    def abort(self):
+        with self.cond:
+            self.aborted = True
+            connection = self.connection
+        sock = getattr(connection, 'sock', None)
+        if sock is not None:
+            try:
+                # socket.socket's own shutdown: SSLSocket.shutdown would also drop its SSL object
+                socket.socket.shutdown(sock, socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def primary_done(self, ok):
+        with self.cond:
+            self.primary_state = 'ok' if ok else 'failed'
+            self.cond.notify_all()
+
+    def wait_primary(self, timeout):
+        with self.cond:
+            self.cond.wait_for(lambda: self.primary_state is not None, max(timeout, 0))
+            return self.primary_state
+
+    def claim(self):
+        with self.cond:
+            if self.claimed:
+                return False
+            self.claimed = True
+            return True
+
+    def settle(self, result, error):
+        with self.cond:
+            self.settled, self.result, self.error = True, result, error
+            self.cond.notify_all()
+
+    def wait_settled(self):
+        with self.cond:
+            self.cond.wait_for(lambda: self.settled)
+            return self.result, self.error
+
+
+class RoutedHTTPProvider(Web3.HTTPProvider):
+    """HTTPProvider that sends every call through its RpcClient's endpoint routing."""
+
+    def __init__(self, client, **kwargs):
+        super().__init__(client.rpc_url, session=client.session, **kwargs)
+        self.client = client
+
+    def make_request(self, method, params):
+        request_data = self.encode_rpc_request(method, params)
+        resp = self.client.post(request_data, (method,))
+        resp.raise_for_status()
+        return self.decode_rpc_response(resp.content)
+
+
+class RpcClient:
+    """A long-lived Web3 instance for one network, with its own HTTP session.
+
+    A network may have several RPC URLs. Requests go to the fastest available
+    endpoint and fail over to the next one; with `hedge` set, an idempotent request
+    that outlasts the fastest endpoint's p95 latency for its method is also sent to
+    the runner-up and the first answer wins. The first attempt always runs on the
+    calling thread, so adding endpoints never queues requests behind each other.
+    Hedges are limited to `hedge_budget` per request on average: when a loaded node
+    slows down across the board, hedging everything would only double the load.
+    `rpc_url` is the primary (first) URL and identifies the network elsewhere.
+    """
+
+    def __init__(self, rpc_urls, pool_size, timeout, hedge=True, hedge_min_delay=0.05,
+                 failure_threshold=3, open_seconds=30, label=None, hedge_budget=0.1):
+        if isinstance(rpc_urls, str):
+            rpc_urls = [rpc_urls]
+        self.rpc_url = rpc_urls[0]
+        # The `network` label of this client's metrics
+        self.label = label or 'default'
+        self.endpoints = [Endpoint(url, failure_threshold, open_seconds) for url in rpc_urls]
+        self.timeout = timeout
+        self.hedge = hedge and len(self.endpoints) > 1
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_budget = hedge_budget
+        self.hedge_tokens = 1.0
+        self.hedge_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HedgingAdapter(pool_connections=pool_size, pool_maxsize=pool_size) if self.hedge else \
+            HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        # Hedges wait out the hedge delay here, next to the primary on the caller's thread;
+        # probes time every endpoint at once
+        self.pool = ThreadPoolExecutor(max_workers=max(pool_size, len(self.endpoints)), thread_name_prefix='rpc-hedge') \
+            if len(self.endpoints) > 1 else None
+        self.w3 = Web3(RoutedHTTPProvider(self, request_kwargs={'timeout': timeout}))
+        self.healthy = False
+        self.client_version = None
+        self.last_checked = 0
+        # None until the first batch tells us whether the provider accepts JSON-RPC batches
+        self.supports_batch = None
+        # None until multicall.multicall_available() looks for Multicall3 on this chain
+        self.supports_multicall = None
+        # None until app.cache_scope() tells this chain apart from others with the same chain id
+        self.identity = None
+        self._chain_id = None
+        self.head = None
+        self.head_checked = 0
+
+    # --- Routing ---
+
+    def ranked_endpoints(self):
+        """Available endpoints, fastest first; if every breaker is open, all of them, soonest to close first."""
+        now = time.time()
+        available = [endpoint for endpoint in self.endpoints if endpoint.available(now)]
+        if available:
+            return sorted(available, key=Endpoint.score)
+        return sorted(self.endpoints, key=lambda endpoint: endpoint.open_until)
+
+    def _post(self, endpoint, data, method=None, race=None):
+        """POSTs to one endpoint, feeding its latency and breaker. 4xx responses are returned, not failures.
+
+        `method` labels the latency sample (None for health probes). A primary aborted
+        because its `race` was won elsewhere counts neither way.
+        """
+        started = time.time()
+        try:
+            resp = self.session.post(endpoint.url, data=data, headers=JSON_HEADERS, timeout=self.timeout)
+            if resp.status_code == 429 or resp.status_code >= 500:
+                resp.raise_for_status()
+        except requests.RequestException:
+            if race is None or not race.aborted:
+                endpoint.record_failure()
+            raise
+        endpoint.record_success(time.time() - started, method)
+        return resp
+
+    def hedge_delay(self, endpoint, method):
+        p95 = endpoint.p95(method)
+        return min(max(p95 if p95 is not None else self.timeout / 4, self.hedge_min_delay), self.timeout)
+
+    def post(self, data, methods):
+        """Sends a JSON-RPC request body (bytes) carrying `methods`. Returns the requests.Response.
+
+        Raises the last transport error if no endpoint answered.
+        """
+        method = methods[0] if len(methods) == 1 else 'batch'
+        started = time.perf_counter()
+        try:
+            return self._route(data, methods, method)
+        except requests.RequestException:
+            rpc_failures.inc(self.label)
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            rpc_duration.observe(elapsed, self.label, method)
+            for method in methods:
+                rpc_calls.inc(self.label, method)
+            record_timing('rpc', elapsed, len(methods))
+
+    def _route(self, data, methods, method):
+        endpoints = self.ranked_endpoints()
+        idempotent = is_idempotent(methods)
+        if self.hedge and idempotent:
+            return self._hedged_post(endpoints, data, method)
+        last_error = None
+        for endpoint in endpoints:
+            try:
+                return self._post(endpoint, data, method)
+            except requests.RequestException as e:
+                last_error = e
+                # A read timeout may mean the node got it: don't send a transaction twice
+                if not idempotent and not isinstance(e, requests.ConnectionError):
+                    break
+        raise last_error
+
+    def _hedged_post(self, endpoints, data, method):
+        primary, rest = endpoints[0], endpoints[1:]
+        race = _Race()
+        with self.hedge_lock:
+            self.hedge_tokens = min(self.hedge_tokens + self.hedge_budget, MAX_HEDGE_TOKENS)
+        # The delay runs from now, so time the hedge task spends queued for a thread counts
+        deadline = time.monotonic() + self.hedge_delay(primary, method)
+        self.pool.submit(self._hedge, race, primary, rest, data, method, deadline)
+        _primary.race = race
+        try:
+            resp = self._post(primary, data, method, race)
+        except requests.RequestException as e:
+            primary_error = e
+        else:
+            race.primary_done(True)
+            return resp
+        finally:
+            _primary.race = None
+        race.primary_done(False)
+        if race.claim():
+            # No hedge under way: fail over on this thread rather than wait for a pool thread
+            race.settle(*self._post_in_turn(rest, data, method))
+        result, error = race.wait_settled()
+        if result is not None:
+            return result
+        raise error or primary_error
+
+    def _hedge(self, race, primary, endpoints, data, method, deadline):
+        """Runs on the pool: once the primary outlasts `deadline`, tries `endpoints` in turn."""
+        state = race.wait_primary(deadline - time.monotonic())
+        if state == 'ok':
+            return
+        if state is None:
+            # Still running: hedge if the budget allows; a failure later is failed over by the caller
+            with self.hedge_lock:
+                if self.hedge_tokens < 1:
+                    return
+                self.hedge_tokens -= 1
+        if not race.claim():
+            return
+        if state is None:
+            primary.hedges += 1
+        result, error = self._post_in_turn(endpoints, data, method)
+        race.settle(result, error)
+        if result is not None:
+            race.abort()
+
+    def _post_in_turn(self, endpoints, data, method):
+        """(response, None) from the first of `endpoints` that answers, else (None, last error)."""
+        last_error = None
+        for endpoint in endpoints:
+            try:
+                return self._post(endpoint, data, method), None
+            except requests.RequestException as e:
+                last_error = e
+        return None, last_error
+
+    def endpoint_status(self):
+        return [endpoint.status() for endpoint in self.endpoints]
+
+    def check_health(self):
+        """Probes every endpoint with web3_clientVersion, which doubles as the cached client version.
+
+        This is what times endpoints that get no traffic and closes breakers of ones
+        that recovered. The client is healthy as soon as any endpoint answers.
+        """
+        data = b'{"jsonrpc":"2.0","id":1,"method":"web3_clientVersion","params":[]}'
+
+        def probe(endpoint):
+            try:
+                body = self._post(endpoint, data).json()
+            except Exception:
+                return None
+            if not isinstance(body, dict) or 'result' not in body:
+                endpoint.record_failure()
+                return None
+            return body['result']
+
+        if self.pool:
+            # The first answer decides; slower probes keep running and still record their latency
+            futures = as_completed([self.pool.submit(probe, endpoint) for endpoint in self.endpoints])
+            version = next((future.result() for future in futures if future.result() is not None), None)
+        else:
+            version = probe(self.endpoints[0])
+        self.healthy = version is not None
+        if self.healthy:
+            self.client_version = version
+        self.last_checked = time.time()
+        return self.healthy
+
+    def chain_id(self):
+        """eth_chainId, fetched once per client."""
+        if self._chain_id is None:
+            self._chain_id = self.w3.eth.chain_id
+        return self._chain_id
+
+    def head_number(self, max_age=2):
+        """Latest block number, refreshed at most every `max_age` seconds."""
+        if self.head is None or time.time() - self.head_checked > max_age:
+            self.set_head(self.w3.eth.block_number)
+        return self.head
+
+    def set_head(self, number):
+        self.head = number
+        self.head_checked = time.time()
+
+    def close(self):
+        if self.pool:
+            self.pool.shutdown(wait=False)
+        self.session.close()
+
+
+class ClientRegistry:
+    """Process-wide pool of RpcClients keyed by (network id, rpc urls).
+
+    Clients are created on first use and probed once; after that a daemon thread
+    re-checks their health every `health_interval` seconds so request handlers never
+    pay for an is_connected() round-trip.
+    """
+
+    def __init__(self, pool_size=10, timeout=10, health_interval=15, **client_options):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.client_options = client_options
+        self.health_interval = health_interval
+        self.clients = {}
+        self.lock = threading.Lock()
+        self.health_thread = None
+        self.stop_health = threading.Event()
+
+    def get(self, network_id, rpc_urls, label=None):
+        """Returns the RpcClient for this network (one URL or a list, primary first), or None if unreachable.
+
+        `label` names the network in metrics.
+        """
+        if isinstance(rpc_urls, str):
+            rpc_urls = [rpc_urls]
+        rpc_urls = tuple(url for url in (rpc_urls or ()) if url)
+        if not rpc_urls:
+            return None
+        key = (network_id, rpc_urls)
+        with self.lock:
+            client = self.clients.get(key)
+            created = client is None
+            if created:
+                client = RpcClient(list(rpc_urls), self.pool_size, self.timeout, label=label, **self.client_options)
+                self.clients[key] = client
+            self._ensure_health_thread()
+        if created:
+            client.check_health()
+        return client if client.healthy else None
+
+    def peek(self, network_id, rpc_urls):
+        """The existing client for this network, healthy or not, without creating one."""
+        with self.lock:
+            return self.clients.get((network_id, tuple(rpc_urls)))
+
+    def drop(self, network_id):
+        """Forgets every client registered for `network_id` (edited or deleted networks)."""
+        with self.lock:
+            stale = [key for key in self.clients if key[0] == network_id]
+            clients = [self.clients.pop(key) for key in stale]
+        for client in clients:
+            client.close()
+
+    def clear(self):
+        with self.lock:
+            clients = list(self.clients.values())
+            self.clients.clear()
+        for client in clients:
+            client.close()
+
+    def _ensure_health_thread(self):
+        if self.health_thread is None or not self.health_thread.is_alive():
+            self.stop_health.clear()
+            self.health_thread = threading.Thread(target=self._health_loop, daemon=True)
+            self.health_thread.start()
+
+    def _health_loop(self):
+        while not self.stop_health.wait(self.health_interval):
+            with self.lock:
+                clients = list(self.clients.values())
+            for client in clients:
+                client.check_health()
+
+
+# Global instance
+client_registry = ClientRegistry(
+    pool_size=int(os.getenv('RPC_POOL_SIZE', '10')),
+    timeout=float(os.getenv('RPC_TIMEOUT', '10')),
+    health_interval=float(os.getenv('RPC_HEALTH_INTERVAL', '15')),
+    hedge=os.getenv('RPC_HEDGE', '1') == '1',
+    hedge_min_delay=float(os.getenv('RPC_HEDGE_MIN_DELAY', '0.05')),
+    hedge_budget=float(os.getenv('RPC_HEDGE_BUDGET', '0.1')),
+    failure_threshold=int(os.getenv('RPC_BREAKER_FAILURES', '3')),
+    open_seconds=float(os.getenv('RPC_BREAKER_OPEN_SECONDS', '30')),
+)
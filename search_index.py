@@ -0,0 +1,95 @@
+import bisect
+import threading
+from collections import OrderedDict
+
+
+class ContractSearchIndex:
+    """In-memory prefix index over saved contract names and addresses.
+
+    Changes only mark the sorted keys stale; they are rebuilt on the next search,
+    so bulk imports don't pay for re-sorting after every contract.
+    """
+
+    def __init__(self):
+        self.contracts = {}  # contract_id -> (name, address)
+        self.keys = []  # sorted (lowercase name or address, contract_id)
+        self.stale = False
+        self.lock = threading.Lock()
+
+    def add(self, contract_id, name, address):
+        with self.lock:
+            self.contracts[contract_id] = (name, address)
+            self.stale = True
+
+    def remove(self, contract_id):
+        with self.lock:
+            if self.contracts.pop(contract_id, None) is not None:
+                self.stale = True
+
+    def clear(self):
+        with self.lock:
+            self.contracts.clear()
+            self.keys = []
+            self.stale = False
+
+    def search(self, prefix, limit=10):
+        """Contracts whose name or address starts with `prefix` (case-insensitive).
+
+        Returns up to `limit` (contract_id, name, address) tuples, name matches first.
+        """
+        prefix = prefix.lower()
+        if not prefix:
+            return []
+        with self.lock:
+            if self.stale:
+                self.keys = sorted(
+                    key
+                    for contract_id, (name, address) in self.contracts.items()
+                    for key in ((name.lower(), contract_id), (address.lower(), contract_id))
+                )
+                self.stale = False
+            keys, contracts = self.keys, self.contracts
+            matches = []
+            for key, contract_id in keys[bisect.bisect_left(keys, (prefix,)):]:
+                if not key.startswith(prefix) or len(matches) >= limit:
+                    break
+                if contract_id not in matches:
+                    matches.append(contract_id)
+            return [(contract_id, *contracts[contract_id]) for contract_id in matches]
+
+
+# Global instance
+contract_search_index = ContractSearchIndex()
+
+
+class HashKindCache:
+    """Bounded LRU remembering whether a 32-byte hash is a transaction or a block, per chain scope."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (scope, hash) -> 'tx' or 'block'
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, scope, value):
+        with self.lock:
+            kind = self.entries.get((scope, value))
+            if kind is not None:
+                self.entries.move_to_end((scope, value))
+                self.hits += 1
+            else:
+                self.misses += 1
+            return kind
+
+    def put(self, scope, value, kind):
+        with self.lock:
+            self.entries[(scope, value)] = kind
+            self.entries.move_to_end((scope, value))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def drop_scopes(self, prefix):
+        with self.lock:
+            for key in [k for k in self.entries if k[0].startswith(prefix)]:
+                del self.entries[key]
@@ -0,0 +1,192 @@
+"""Serves the explorer for real use, instead of app.py's single-threaded debug server.
+
+    python serve.py --threads 32
+    ANVIL_ENABLED=0 python serve.py --server gunicorn --workers 2 --threads 16
+
+Every request gets its own thread, so a page waiting on a slow node does not hold
+up the others. waitress or gunicorn are used when installed (--server auto picks
+waitress first); otherwise Werkzeug's server runs at most --threads requests at
+once. Live head and Anvil log streams keep their thread for as long as the page
+stays open.
+
+Prefer threads over --workers: each worker process has its own RPC clients and
+caches in memory. Anvil forks live in the process that started them, so more
+than one worker needs ANVIL_ENABLED=0, and INDEXER_ENABLED starts an indexer in
+every worker. SQLite runs in WAL mode with a busy timeout (SQLITE_BUSY_TIMEOUT),
+so workers and threads can write side by side.
+
+On SIGTERM or SIGINT the server stops taking requests, open streams end within a
+second, and the Anvil forks it started are stopped before the process exits.
+"""
+import argparse
+import atexit
+import os
+import signal
+import sys
+import threading
+
+_shutdown_lock = threading.Lock()
+_shut_down = False
+
+
+def shutdown():
+    """Runs app.shutdown_services() once, whichever of the signal handler, atexit or gunicorn gets here first."""
+    global _shut_down
+    with _shutdown_lock:
+        if _shut_down:
+            return
+        _shut_down = True
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.shutdown_services()
+
+
+def end_streams():
+    """Ends the open Server-Sent Event streams, which would otherwise hold their threads until the viewer leaves."""
+    app_module = sys.modules.get('app')
+    if app_module is not None:
+        app_module.shutting_down.set()
+
+
+def serve_waitress(app, args):
+    import waitress
+
+    def stop(signum, frame):
+        end_streams()
+        raise KeyboardInterrupt  # waitress closes its sockets and returns from serve() on this
+
+    signal.signal(signal.SIGTERM, stop)
+    waitress.serve(app, host=args.host, port=args.port, threads=args.threads,
+                   connection_limit=max(100, args.threads * 4), channel_timeout=120)
+
+
+def serve_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    def post_worker_init(worker):
+        # gunicorn waits up to graceful_timeout for open requests; end the streams first
+        handle_exit = signal.getsignal(signal.SIGTERM)
+
+        def stop(signum, frame):
+            end_streams()
+            handle_exit(signum, frame)
+
+        signal.signal(signal.SIGTERM, stop)
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{args.host}:{args.port}')
+            self.cfg.set('workers', args.workers)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', args.threads)
+            # Long enough for slow nodes and streamed pages; gunicorn restarts workers silent for longer
+            self.cfg.set('timeout', 120)
+            self.cfg.set('graceful_timeout', 30)
+            # Workers import the app themselves, so the RPC clients, database connections
+            # and background threads are created after the fork, never shared with the parent
+            self.cfg.set('preload_app', False)
+            self.cfg.set('post_worker_init', post_worker_init)
+            self.cfg.set('worker_exit', lambda server, worker: shutdown())
+
+        def load(self):
+            from app import app
+            return app
+
+    Application().run()
+
+
+def serve_werkzeug(app, args):
+    from werkzeug.serving import BaseWSGIServer
+
+    class PooledWSGIServer(BaseWSGIServer):
+        """Werkzeug's server with a daemon thread per connection, at most `threads` at once.
+
+        Further connections wait in the listen backlog. Daemon threads never keep the
+        process alive after serve_forever() returns.
+        """
+
+        multithread = True
+
+        def __init__(self, *server_args, threads, **kwargs):
+            super().__init__(*server_args, **kwargs)
+            self.slots = threading.BoundedSemaphore(threads)
+
+        def process_request(self, request, client_address):
+            self.slots.acquire()
+            threading.Thread(target=self._handle, args=(request, client_address), daemon=True).start()
+
+        def _handle(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                self.slots.release()
+
+    server = PooledWSGIServer(args.host, args.port, app, threads=args.threads)
+    print(f"Serving on http://{args.host}:{args.port} with {args.threads} threads")
+
+    def stop(signum, frame):
+        # Streams free their threads first, in case serve_forever() waits for one.
+        # server.shutdown() waits for serve_forever() to return, so it can't run in this handler.
+        end_streams()
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+def installed(module):
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--server', choices=('auto', 'waitress', 'gunicorn', 'werkzeug'),
+                        default=os.getenv('SERVER', 'auto'))
+    parser.add_argument('--host', default=os.getenv('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('PORT', '5001')))
+    parser.add_argument('--threads', type=int, default=int(os.getenv('SERVER_THREADS', '32')),
+                        help='Requests served at once per process')
+    parser.add_argument('--workers', type=int, default=int(os.getenv('SERVER_WORKERS', '1')),
+                        help='Processes, gunicorn only')
+    args = parser.parse_args()
+    if args.threads < 1 or args.workers < 1:
+        parser.error('--threads and --workers must be at least 1')
+
+    server = args.server
+    if server == 'auto':
+        server = next((name for name in ('waitress', 'gunicorn') if installed(name)), 'werkzeug')
+    if args.workers > 1 and server != 'gunicorn':
+        parser.error('--workers needs --server gunicorn')
+    if args.workers > 1:
+        from anvil_manager import anvil_manager
+        if anvil_manager.enabled:
+            # Each worker would see only its own forks, so requests would fail depending on who answers
+            parser.error('--workers above 1 needs ANVIL_ENABLED=0; Anvil forks run in a single process')
+
+    atexit.register(shutdown)
+    if server == 'gunicorn':
+        # gunicorn handles the signals itself and calls shutdown() from worker_exit
+        serve_gunicorn(args)
+        return
+
+    from app import app
+    if server == 'waitress':
+        serve_waitress(app, args)
+    else:
+        serve_werkzeug(app, args)
+    shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+document.addEventListener('DOMContentLoaded', () => {
+  const form = document.getElementById('analytics-form');
+  const fromInput = document.getElementById('range-from');
+  const toInput = document.getElementById('range-to');
+  const status = document.getElementById('analytics-status');
+  const statsBody = document.getElementById('analytics-stats');
+  const histogramBody = document.getElementById('analytics-histogram');
+  const seriesBody = document.getElementById('analytics-series');
+
+  const GWEI = 1e9;
+
+  function row(cells) {
+    const tr = document.createElement('tr');
+    cells.forEach(value => {
+      const td = document.createElement('td');
+      td.textContent = value;
+      tr.appendChild(td);
+    });
+    return tr;
+  }
+
+  function format(value, scale, digits) {
+    if (value === null || value === undefined) return '-';
+    return (value / scale).toLocaleString(undefined, { maximumFractionDigits: digits });
+  }
+
+  function statRow(label, stats, scale = 1, digits = 2) {
+    if (!stats) return row([label, 'Unavailable', '', '', '', '', '', '']);
+    return row([label, ...['mean', 'min', 'p10', 'p50', 'p90', 'p99', 'max'].map(k => format(stats[k], scale, digits))]);
+  }
+
+  function show(id) {
+    document.getElementById(id).style.display = '';
+  }
+
+  function render(data) {
+    status.textContent = `Blocks ${data.from} to ${data.to} (${data.blocks} blocks, ` +
+      `${data.transactions.total.toLocaleString()} transactions)` +
+      (data.seconds !== undefined ? `, computed in ${data.seconds}s` : '');
+
+    statsBody.innerHTML = '';
+    statsBody.appendChild(statRow('Transactions per block', data.transactions, 1, 1));
+    statsBody.appendChild(statRow('Gas used per block', data.gas_used, 1, 0));
+    statsBody.appendChild(statRow('Gas used ratio (%)', data.gas_used_ratio, 0.01, 1));
+    statsBody.appendChild(statRow('Base fee (Gwei)', data.base_fee, GWEI, 3));
+    statsBody.appendChild(statRow('Median priority fee (Gwei)', data.priority_fee, GWEI, 3));
+    statsBody.appendChild(statRow('Block time (s)', data.block_time, 1, 2));
+    show('analytics-summary');
+
+    histogramBody.innerHTML = '';
+    if (data.block_time_histogram) {
+      data.block_time_histogram.forEach(({ bucket, blocks }) => {
+        histogramBody.appendChild(row([bucket, blocks.toLocaleString()]));
+      });
+      show('analytics-histogram-card');
+    }
+
+    seriesBody.innerHTML = '';
+    data.series.forEach(point => {
+      seriesBody.appendChild(row([
+        point.from === point.to ? `${point.from}` : `${point.from} - ${point.to}`,
+        format(point.tx_count, 1, 1),
+        `${format(point.gas_used_ratio, 0.01, 1)}%`,
+        format(point.base_fee, GWEI, 3),
+      ]));
+    });
+    show('analytics-series-card');
+  }
+
+  async function analyze() {
+    const params = new URLSearchParams();
+    if (fromInput.value !== '') params.set('from', fromInput.value);
+    if (toInput.value !== '') params.set('to', toInput.value);
+    status.textContent = 'Fetching blocks...';
+    try {
+      const res = await fetch('/api/analytics/blocks?' + params.toString());
+      const data = await res.json();
+      if (!res.ok) throw new Error(data.error || 'Request failed');
+      render(data);
+    } catch (e) {
+      status.textContent = `Error: ${e.message}`;
+    }
+  }
+
+  form.addEventListener('submit', e => {
+    e.preventDefault();
+    analyze();
+  });
+
+  analyze();
+});
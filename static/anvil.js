@@ -12,7 +12,9 @@ document.addEventListener('DOMContentLoaded', () => {
   const networkSelect = document.getElementById('network-select');
   const saveNetworkCheckbox = document.getElementById('save-network');
   
-  let logPollInterval = null;
+  const MAX_TERMINAL_CHARS = 500000;
+  let logSource = null;
+  let logCursor = 0;
   let currentChainId = null;
   let currentForkUrl = null;
   let currentLocalPort = null;
@@ -52,9 +54,9 @@ document.addEventListener('DOMContentLoaded', () => {
       updateAnvilUI(status);
       
       if (status.running) {
-        startLogPolling();
+        startLogStream();
       } else {
-        stopLogPolling();
+        stopLogStream();
       }
     } catch (e) {
       console.error('Failed to check anvil status', e);
@@ -80,7 +82,9 @@ document.addEventListener('DOMContentLoaded', () => {
         <br><strong>PID:</strong> ${status.pid}
         <br><strong>Fork:</strong> ${config.fork_url}
         ${config.chain_id ? `<br><strong>Chain ID:</strong> ${config.chain_id}` : ''}
+        ${config.fork_block_number != null ? `<br><strong>Fork Block:</strong> ${config.fork_block_number}` : ''}
         <br><strong>Local RPC:</strong> http://127.0.0.1:${config.port}
+        ${status.startup && status.startup.ready_seconds != null ? `<br><strong>Ready in:</strong> ${status.startup.ready_seconds}s${status.startup.state_reused ? ' (cached state)' : ''}` : ''}
       `;
     } else {
       anvilStatusDisplay.style.display = 'none';
@@ -172,33 +176,42 @@ document.addEventListener('DOMContentLoaded', () => {
   btnSaveUpstream.addEventListener('click', saveUpstreamNetwork);
   btnSaveLocal.addEventListener('click', saveLocalNetwork);
 
-  async function fetchLogs() {
-    try {
-        const res = await fetch('/api/anvil/logs');
-        const data = await res.json();
-        if (data.logs && data.logs.length > 0) {
-            terminalOutput.textContent = data.logs.join('\n');
-            terminalOutput.scrollTop = terminalOutput.scrollHeight;
-        } else {
-             if (terminalOutput.textContent === 'Waiting for logs...') {
-                terminalOutput.textContent = '';
-             }
-        }
-    } catch (e) {
-        console.error('Error fetching logs:', e);
+  function appendLogs(lines, truncated) {
+    if (terminalOutput.textContent.trim() === 'Waiting for logs...') {
+      terminalOutput.textContent = '';
     }
+    const chunks = [];
+    if (truncated) chunks.push('[... older lines dropped from the log buffer ...]');
+    chunks.push(...lines);
+    const prefix = terminalOutput.textContent ? '\n' : '';
+    let text = terminalOutput.textContent + prefix + chunks.join('\n');
+    if (text.length > MAX_TERMINAL_CHARS) {
+      text = text.slice(text.length - MAX_TERMINAL_CHARS);
+    }
+    terminalOutput.textContent = text;
+    terminalOutput.scrollTop = terminalOutput.scrollHeight;
   }
 
-  function startLogPolling() {
-    if (logPollInterval) return;
-    fetchLogs(); // Immediate fetch
-    logPollInterval = setInterval(fetchLogs, 2000); // Poll every 2 seconds
+  // Lines are pushed by the server as Anvil writes them; the cursor lets a
+  // reconnecting stream resume without re-sending the whole buffer.
+  function startLogStream() {
+    if (logSource) return;
+    logSource = new EventSource(`/api/anvil/logs/stream?since=${logCursor}`);
+    logSource.addEventListener('logs', (e) => {
+      try {
+        const data = JSON.parse(e.data);
+        logCursor = parseInt(e.lastEventId, 10) || logCursor;
+        appendLogs(data.lines, data.truncated);
+      } catch (error) {
+        console.error('Error reading logs:', error);
+      }
+    });
   }
 
-  function stopLogPolling() {
-    if (logPollInterval) {
-        clearInterval(logPollInterval);
-        logPollInterval = null;
+  function stopLogStream() {
+    if (logSource) {
+        logSource.close();
+        logSource = null;
     }
   }
 
@@ -206,6 +219,8 @@ document.addEventListener('DOMContentLoaded', () => {
     e.preventDefault();
     const forkUrl = document.getElementById('fork-url').value.trim();
     const chainId = document.getElementById('chain-id').value.trim();
+    const forkBlockNumber = document.getElementById('fork-block-number').value.trim();
+    const resetState = document.getElementById('reset-state').checked;
     const shouldSave = saveNetworkCheckbox.checked;
     
     if (!forkUrl) {
@@ -237,7 +252,9 @@ document.addEventListener('DOMContentLoaded', () => {
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ 
           fork_url: forkUrl, 
-          chain_id: chainId ? parseInt(chainId) : null 
+          chain_id: chainId ? parseInt(chainId) : null,
+          fork_block_number: forkBlockNumber ? parseInt(forkBlockNumber) : null,
+          reset_state: resetState
         })
       });
       
@@ -0,0 +1,129 @@
+document.addEventListener('DOMContentLoaded', () => {
+  const form = document.getElementById('fork-pool-form');
+  const nameInput = document.getElementById('pool-fork-name');
+  const urlInput = document.getElementById('pool-fork-url');
+  const warmInput = document.getElementById('pool-warm-count');
+  const btnSetWarm = document.getElementById('btn-set-warm');
+  const list = document.getElementById('fork-pool-list');
+  const status = document.getElementById('fork-pool-status');
+
+  if (!form) return;
+
+  // Latest snapshot id per fork name; Anvil forgets a snapshot once reverted to
+  const snapshots = {};
+
+  async function postJSON(url, body) {
+    const res = await fetch(url, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(body || {})
+    });
+    const data = await res.json();
+    if (!res.ok) throw new Error(data.error || 'Request failed');
+    return data;
+  }
+
+  function button(label, onClick) {
+    const btn = document.createElement('button');
+    btn.textContent = label;
+    btn.addEventListener('click', async () => {
+      try {
+        await onClick();
+      } catch (e) {
+        status.textContent = `Error: ${e.message}`;
+      }
+    });
+    return btn;
+  }
+
+  function renderFork(fork) {
+    const row = document.createElement('div');
+    row.className = 'abi-item';
+
+    const title = document.createElement('div');
+    title.className = 'contract-name';
+    title.textContent = `${fork.name}${fork.running ? '' : ' (stopped)'}`;
+
+    const url = document.createElement('div');
+    url.className = 'contract-address';
+    url.textContent = fork.rpc_url + (snapshots[fork.name] ? ` (snapshot ${snapshots[fork.name]})` : '');
+
+    const actions = document.createElement('div');
+    actions.style.marginLeft = 'auto';
+    actions.style.display = 'flex';
+    actions.style.gap = '8px';
+
+    actions.appendChild(button('Snapshot', async () => {
+      const data = await postJSON(`/api/anvil/forks/${encodeURIComponent(fork.name)}/snapshot`);
+      snapshots[fork.name] = data.snapshot_id;
+      status.textContent = `Snapshot ${data.snapshot_id} taken of ${fork.name}.`;
+      await loadForks();
+    }));
+
+    const revertBtn = button('Revert', async () => {
+      const data = await postJSON(`/api/anvil/forks/${encodeURIComponent(fork.name)}/revert`,
+        { snapshot_id: snapshots[fork.name], resnapshot: true });
+      snapshots[fork.name] = data.snapshot_id;
+      status.textContent = `Reverted ${fork.name} in ${(data.seconds * 1000).toFixed(1)} ms.`;
+      await loadForks();
+    });
+    revertBtn.disabled = !snapshots[fork.name];
+    actions.appendChild(revertBtn);
+
+    actions.appendChild(button('Stop', async () => {
+      const res = await fetch(`/api/anvil/forks/${encodeURIComponent(fork.name)}`, { method: 'DELETE' });
+      const data = await res.json();
+      if (!res.ok) throw new Error(data.error || 'Stop failed');
+      delete snapshots[fork.name];
+      status.textContent = data.message;
+      await loadForks();
+    }));
+
+    row.appendChild(title);
+    row.appendChild(url);
+    row.appendChild(actions);
+    list.appendChild(row);
+  }
+
+  async function loadForks() {
+    try {
+      const res = await fetch('/api/anvil/status?t=' + new Date().getTime());
+      const data = await res.json();
+      list.innerHTML = '';
+      (data.forks || []).forEach(renderFork);
+      const idle = (data.pool && data.pool.idle) ? data.pool.idle.length : 0;
+      if (!data.forks || data.forks.length === 0) {
+        list.innerHTML = '<p>No named forks running.</p>';
+      }
+      list.insertAdjacentHTML('beforeend', `<p>${idle} warm idle fork(s) ready.</p>`);
+    } catch (e) {
+      list.innerHTML = '<p>Error loading forks.</p>';
+      console.error(e);
+    }
+  }
+
+  form.addEventListener('submit', async (e) => {
+    e.preventDefault();
+    status.textContent = 'Starting fork...';
+    try {
+      const data = await postJSON('/api/anvil/forks', { name: nameInput.value.trim(), fork_url: urlInput.value.trim() });
+      status.textContent = `Fork ${data.name} ready at ${data.rpc_url} in ${data.seconds}s${data.warm ? ' (warm)' : ''}.`;
+      nameInput.value = '';
+      await loadForks();
+    } catch (err) {
+      status.textContent = `Error: ${err.message}`;
+    }
+  });
+
+  btnSetWarm.addEventListener('click', async () => {
+    try {
+      await postJSON('/api/anvil/pool', { fork_url: urlInput.value.trim(), count: parseInt(warmInput.value, 10) || 0 });
+      status.textContent = 'Warm pool updated.';
+      setTimeout(loadForks, 2000);
+    } catch (e) {
+      status.textContent = `Error: ${e.message}`;
+    }
+  });
+
+  loadForks();
+});
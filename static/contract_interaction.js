@@ -8,6 +8,54 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     renderFunctions(abi);
+    setupSnapshot();
+
+    function setupSnapshot() {
+        const button = document.getElementById('read-all');
+        const status = document.getElementById('snapshot-status');
+        const table = document.getElementById('snapshot-table');
+        const body = document.getElementById('snapshot-results');
+        if (!button) return;
+
+        button.addEventListener('click', async () => {
+            status.textContent = 'Reading...';
+            try {
+                const response = await fetch('/api/interact/read', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ contract_ids: [contract.id] })
+                });
+                const data = await response.json();
+                if (!response.ok) {
+                    throw new Error(data.error || 'Read failed');
+                }
+
+                body.innerHTML = '';
+                data.results.forEach(item => {
+                    const row = document.createElement('tr');
+                    const name = document.createElement('td');
+                    name.textContent = item.function;
+                    const value = document.createElement('td');
+                    value.classList.add('breakable');
+                    if (item.success) {
+                        value.textContent = (typeof item.result === 'object') ? JSON.stringify(item.result) : String(item.result);
+                    } else {
+                        value.textContent = `Error: ${item.decoded_error || item.error}`;
+                    }
+                    row.appendChild(name);
+                    row.appendChild(value);
+                    body.appendChild(row);
+                });
+                table.style.display = data.results.length ? '' : 'none';
+                const via = data.multicall ? 'Multicall3' : 'a JSON-RPC batch';
+                status.textContent = data.results.length
+                    ? `${data.results.length} values at block ${data.block} via ${via}.`
+                    : 'This contract has no view functions without arguments.';
+            } catch (error) {
+                status.textContent = `Error: ${error.message}`;
+            }
+        });
+    }
 
     function renderFunctions(abi) {
         const functions = abi.filter(item => item.type === 'function');
@@ -70,8 +118,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
                 try {
                     const payload = {
-                        address: contract.address,
-                        abi: abi,
+                        contract_id: contract.id,
                         function: func.name,
                         args: args,
                         private_key: isTransaction ? privateKey : null
@@ -90,7 +137,7 @@ document.addEventListener('DOMContentLoaded', () => {
                     }
 
                     const res = data.result;
-                    const isTxHash = (typeof res === 'string') && /^[0-9a-fA-F]{64}$/.test(res);
+                    const isTxHash = (typeof res === 'string') && /^(0x)?[0-9a-fA-F]{64}$/.test(res);
                     if (isTxHash) {
                         resultDiv.innerHTML = `Result: <a target="_blank" href="/tx/${res}">${res}</a>`;
                     } else {
@@ -0,0 +1,61 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const blocksBody = document.getElementById('latest-blocks');
+    const latestBlockCell = document.getElementById('latest-block-number');
+
+    if (!blocksBody || typeof EventSource === 'undefined') {
+        return;
+    }
+
+    const maxRows = parseInt(blocksBody.dataset.maxRows, 10) || 10;
+
+    function link(href, text) {
+        const a = document.createElement('a');
+        a.href = href;
+        a.textContent = text;
+        return a;
+    }
+
+    function cell(content, className) {
+        const td = document.createElement('td');
+        if (className) td.className = className;
+        if (content instanceof Node) {
+            td.appendChild(content);
+        } else {
+            td.textContent = content;
+        }
+        return td;
+    }
+
+    function renderBlock(block) {
+        // Drop the "No blocks to show" placeholder row, if present
+        const placeholder = blocksBody.querySelector('td[colspan]');
+        if (placeholder) placeholder.parentElement.remove();
+
+        const row = document.createElement('tr');
+        const time = new Date(block.timestamp * 1000).toTimeString().slice(0, 8);
+        row.appendChild(cell(link(`/block/${block.number}`, block.number)));
+        row.appendChild(cell(time));
+        row.appendChild(cell(block.tx_count));
+        row.appendChild(cell(block.miner ? link(`/address/${block.miner}`, block.miner) : '', 'breakable'));
+        row.appendChild(cell(block.gas_used));
+        blocksBody.insertBefore(row, blocksBody.firstChild);
+
+        while (blocksBody.rows.length > maxRows) {
+            blocksBody.deleteRow(blocksBody.rows.length - 1);
+        }
+
+        if (latestBlockCell) {
+            latestBlockCell.replaceChildren(link(`/block/${block.number}`, block.number));
+        }
+    }
+
+    // The browser reconnects on its own if the server drops a slow stream
+    const source = new EventSource('/api/stream/heads');
+    source.addEventListener('head', (e) => {
+        try {
+            renderBlock(JSON.parse(e.data));
+        } catch (error) {
+            console.error('Bad head event', error);
+        }
+    });
+});
@@ -4,6 +4,28 @@ document.addEventListener('DOMContentLoaded', () => {
   const nameInput = document.getElementById('net-name');
   const rpcInput = document.getElementById('net-rpc');
   const defaultInput = document.getElementById('net-default');
+  const backupsInput = document.getElementById('net-backups');
+
+  function parseUrls(text) {
+    return text.split(/[\n,]/).map(u => u.trim()).filter(Boolean);
+  }
+
+  async function loadEndpointHealth(n, container) {
+    try {
+      const res = await fetch(`/api/networks/${n.id}/endpoints`);
+      const data = await res.json();
+      container.innerHTML = '';
+      (data.endpoints || []).forEach(ep => {
+        const line = document.createElement('div');
+        const latency = ep.latency_ms != null ? `${ep.latency_ms} ms (p95 ${ep.p95_ms} ms)` : 'not measured';
+        line.textContent = `${ep.url}: ${ep.breaker}, ${latency}`;
+        line.style.color = ep.breaker === 'open' ? '#d32f2f' : '';
+        container.appendChild(line);
+      });
+    } catch (e) {
+      console.error(e);
+    }
+  }
 
   async function loadNetworks() {
     list.innerHTML = '<p>Loading...</p>';
@@ -33,6 +55,13 @@ document.addEventListener('DOMContentLoaded', () => {
     const url = document.createElement('div');
     url.className = 'contract-address';
     url.textContent = n.rpc_url;
+    if (n.backup_rpc_urls && n.backup_rpc_urls.length) {
+      url.textContent += ` (+${n.backup_rpc_urls.length} backup${n.backup_rpc_urls.length > 1 ? 's' : ''})`;
+      const health = document.createElement('small');
+      health.style.display = 'block';
+      url.appendChild(health);
+      loadEndpointHealth(n, health);
+    }
 
     const actions = document.createElement('div');
     actions.style.marginLeft = 'auto';
@@ -57,12 +86,14 @@ document.addEventListener('DOMContentLoaded', () => {
       if (newName === null) return;
       const newRpc = prompt('RPC URL:', n.rpc_url);
       if (newRpc === null) return;
+      const newBackups = prompt('Backup RPC URLs (comma-separated):', (n.backup_rpc_urls || []).join(', '));
+      if (newBackups === null) return;
       const makeDefault = confirm('Set as default? OK = Yes, Cancel = No');
       try {
         const res = await fetch(`/api/networks/${n.id}`, {
           method: 'PUT',
           headers: { 'Content-Type': 'application/json' },
-          body: JSON.stringify({ name: newName, rpc_url: newRpc, is_default: makeDefault })
+          body: JSON.stringify({ name: newName, rpc_url: newRpc, backup_rpc_urls: parseUrls(newBackups), is_default: makeDefault })
         });
         if (!res.ok) {
           const d = await res.json().catch(() => ({}));
@@ -102,6 +133,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const payload = {
       name: nameInput.value.trim(),
       rpc_url: rpcInput.value.trim(),
+      backup_rpc_urls: parseUrls(backupsInput.value),
       is_default: defaultInput.checked,
     };
     if (!payload.name || !payload.rpc_url) {
@@ -0,0 +1,48 @@
+document.addEventListener('DOMContentLoaded', () => {
+    const input = document.getElementById('search-query');
+    const list = document.getElementById('search-suggestions');
+
+    if (!input || !list) {
+        return;
+    }
+
+    let controller = null;
+
+    function render(results) {
+        list.innerHTML = '';
+        results.forEach(result => {
+            const item = document.createElement('li');
+
+            const kind = document.createElement('span');
+            kind.className = 'suggestion-kind';
+            kind.textContent = result.kind;
+            item.appendChild(kind);
+
+            const link = document.createElement('a');
+            link.href = result.url;
+            link.textContent = result.kind === 'contract' ? `${result.value} (${result.address})` : String(result.value);
+            item.appendChild(link);
+
+            list.appendChild(item);
+        });
+    }
+
+    input.addEventListener('input', async () => {
+        const query = input.value.trim();
+        // Only the latest keystroke's results matter
+        if (controller) controller.abort();
+        if (!query) {
+            render([]);
+            return;
+        }
+        controller = new AbortController();
+        try {
+            const res = await fetch('/api/search?q=' + encodeURIComponent(query), { signal: controller.signal });
+            if (!res.ok) return;
+            const data = await res.json();
+            render(data.results || []);
+        } catch (e) {
+            if (e.name !== 'AbortError') console.error(e);
+        }
+    });
+});
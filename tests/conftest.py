@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_node import FakeNode, LatencyProfile, SyntheticChain  # noqa: E402
+
+
+@pytest.fixture
+def start_node():
+    """Starts in-process fake JSON-RPC nodes: start_node(chain=None, latency_ms=1, **profile) -> FakeNode."""
+    nodes = []
+
+    def start(chain=None, latency_ms=1, **profile):
+        profile.setdefault('per_call_ms', 0)
+        node = FakeNode(chain or SyntheticChain(head=100, txs_per_block=4, logs_per_receipt=1),
+                        LatencyProfile(latency_ms, **profile)).start()
+        node.url = f'http://127.0.0.1:{node.port}'
+        nodes.append(node)
+        return node
+
+    yield start
+    for node in nodes:
+        node.stop()
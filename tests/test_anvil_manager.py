@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+from anvil_manager import DEFAULT_FORK, AnvilManager
+
+
+def test_stopped_default_fork_does_not_claim_its_port(start_node):
+    # An external node listens where the default fork would; the fork itself never started
+    node = start_node()
+    manager = AnvilManager(port=node.port)
+    assert not manager.get_fork(DEFAULT_FORK).is_running()
+    assert manager.fork_for_port(node.port) is None
+
+
+def test_running_fork_is_found_by_port(start_node):
+    node = start_node()
+    manager = AnvilManager(port=node.port)
+    fork = manager.get_fork(DEFAULT_FORK)
+    fork.process = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+    try:
+        assert manager.fork_for_port(node.port) is fork
+    finally:
+        fork.process.kill()
+        fork.process.wait()
+    assert manager.fork_for_port(node.port) is None
@@ -0,0 +1,26 @@
+import sqlite3
+
+from chain_cache import UNVERIFIED_SCOPE, ChainCache
+
+
+def stored_rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute('SELECT scope, kind, key FROM chain_objects').fetchall()
+
+
+def test_final_objects_are_persisted(tmp_path):
+    path = str(tmp_path / 'chain_cache.db')
+    ChainCache(path).put('1:abcd', 'block', '5', {'number': '0x5'}, final=True)
+    assert ChainCache(path).get('1:abcd', 'block', '5') == {'number': '0x5'}
+
+
+def test_unverified_scopes_are_never_cached(tmp_path):
+    path = str(tmp_path / 'chain_cache.db')
+    cache = ChainCache(path)
+    scope = f'{UNVERIFIED_SCOPE}1:0123'
+    cache.put(scope, 'block', '5', {'number': '0x5'}, final=True)
+    cache.put(scope, 'receipt', '0xaa', {'status': '0x1'}, final=False)
+    assert cache.get(scope, 'block', '5') is None
+    assert cache.total_bytes == 0
+    cache.put('1:abcd', 'block', '6', {'number': '0x6'}, final=True)
+    assert stored_rows(path) == [('1:abcd', 'block', '6')]
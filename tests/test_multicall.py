@@ -0,0 +1,95 @@
+from eth_abi import decode, encode
+
+import multicall
+from benchmarks.fake_node import (BALANCE_OF_SELECTOR, INSUFFICIENT_BALANCE_SELECTOR, TRANSFER_SELECTOR, RpcFault,
+                                  SyntheticChain, contract_address, sender_address)
+from multicall import MULTICALL3_ADDRESS, read_many
+from rpc_clients import RpcClient
+
+
+class MulticallChain(SyntheticChain):
+    """SyntheticChain with Multicall3 deployed; aggregate3 runs its calls through SyntheticChain.call()."""
+
+    def __init__(self, deployed=True, aggregate_fails=False):
+        super().__init__(head=100, txs_per_block=4, logs_per_receipt=1, failed_every=2)
+        self.deployed = deployed
+        self.aggregate_fails = aggregate_fails
+
+    def handle(self, method, params):
+        is_multicall = isinstance(params and params[0], (str, dict)) and \
+            (params[0] if isinstance(params[0], str) else params[0].get('to', '')).lower() == MULTICALL3_ADDRESS.lower()
+        if method == 'eth_getCode' and is_multicall:
+            return '0x6080604052' if self.deployed else '0x'
+        if method == 'eth_call' and is_multicall and self.deployed:
+            return self.aggregate3(params[0]['data'])
+        return super().handle(method, params)
+
+    def aggregate3(self, data):
+        if self.aggregate_fails:
+            raise RpcFault(-32000, 'out of gas')
+        (calls,) = decode(['(address,bool,bytes)[]'], bytes.fromhex(data[10:]))
+        results = []
+        for target, _, call_data in calls:
+            try:
+                results.append((True, bytes.fromhex(self.call({'to': target, 'data': '0x' + call_data.hex()})[2:])))
+            except RpcFault as e:
+                results.append((False, bytes.fromhex(e.data[2:])))
+        return '0x' + encode(['(bool,bytes)[]'], [results]).hex()
+
+
+def word(value):
+    return value.to_bytes(32, 'big')
+
+
+def balance_of(index):
+    return contract_address(index), bytes.fromhex(BALANCE_OF_SELECTOR) + word(int(sender_address(index), 16))
+
+
+def transfer(number, index):
+    # SyntheticChain reverts transfers of the failing transactions (every second one here)
+    return contract_address(0), bytes.fromhex(TRANSFER_SELECTOR) + word(1) + word(number * 100_000 + index + 1)
+
+
+CALLS = [balance_of(0), transfer(5, 1), balance_of(1), transfer(5, 0)]
+
+
+def check_results(results):
+    assert [result.success for result in results] == [True, False, True, True]
+    assert results[0].data == word(10 ** 18)
+    assert results[1].data[:4] == bytes.fromhex(INSUFFICIENT_BALANCE_SELECTOR)
+    assert results[3].data == word(1)
+
+
+def test_reads_are_packed_into_one_aggregate3(start_node):
+    node = start_node(MulticallChain())
+    client = RpcClient(node.url, pool_size=4, timeout=5)
+    check_results(read_many(client, CALLS))
+    assert client.supports_multicall is True
+    assert node.methods['eth_call'] == 1
+
+
+def test_large_reads_are_split_into_batched_aggregates(start_node, monkeypatch):
+    monkeypatch.setattr(multicall, 'MAX_CALLS_PER_AGGREGATE', 3)
+    node = start_node(MulticallChain())
+    client = RpcClient(node.url, pool_size=4, timeout=5)
+    results = read_many(client, CALLS * 2)
+    check_results(results[:4])
+    check_results(results[4:])
+    assert node.methods['eth_call'] == 3
+    assert node.requests == 2  # eth_getCode, then the three aggregates in one batch
+
+
+def test_failed_aggregate_falls_back_to_single_calls(start_node):
+    node = start_node(MulticallChain(aggregate_fails=True))
+    client = RpcClient(node.url, pool_size=4, timeout=5)
+    check_results(read_many(client, CALLS))
+    assert node.methods['eth_call'] == 1 + len(CALLS)
+
+
+def test_chains_without_multicall3_use_batched_calls(start_node):
+    node = start_node(MulticallChain(deployed=False))
+    client = RpcClient(node.url, pool_size=4, timeout=5)
+    check_results(read_many(client, CALLS))
+    assert client.supports_multicall is False
+    assert node.methods['eth_call'] == len(CALLS)
+    assert not read_many(client, [])
@@ -0,0 +1,102 @@
+import json
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from rpc_batch import request as rpc_request
+from rpc_clients import RpcClient
+
+BLOCK_NUMBER = json.dumps({'jsonrpc': '2.0', 'id': 1, 'method': 'eth_blockNumber', 'params': []}).encode()
+
+
+def closed_port_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f'http://127.0.0.1:{sock.getsockname()[1]}'
+
+
+def concurrent_block_numbers(client, count=16):
+    started = time.perf_counter()
+    with ThreadPoolExecutor(count) as pool:
+        results = list(pool.map(lambda _: rpc_request(client, 'eth_blockNumber', []), range(count)))
+    assert results == [hex(100)] * count
+    return time.perf_counter() - started
+
+
+def rank(client, *latencies):
+    """Makes routing rank the endpoints in the given order."""
+    for endpoint, seconds in zip(client.endpoints, latencies):
+        endpoint.ewma = seconds
+
+
+def test_backup_endpoint_does_not_slow_down_concurrent_calls(start_node):
+    primary, backup = start_node(latency_ms=100), start_node(latency_ms=100)
+    single = RpcClient(primary.url, pool_size=16, timeout=10)
+    routed = RpcClient([primary.url, backup.url], pool_size=16, timeout=10)
+    rank(routed, 0.1, 0.2)
+
+    single_seconds = concurrent_block_numbers(single)
+    routed_seconds = concurrent_block_numbers(routed)
+    assert routed_seconds < single_seconds + 0.1
+    # Nothing was slow, so nothing was hedged
+    assert primary.calls == 32 and backup.calls == 0
+
+
+def test_slow_primary_is_hedged_and_cut_short(start_node):
+    primary, backup = start_node(latency_ms=2000), start_node(latency_ms=10)
+    client = RpcClient([primary.url, backup.url], pool_size=4, timeout=10, hedge_min_delay=0.05)
+    rank(client, 0.01, 0.02)
+    for _ in range(5):
+        client.endpoints[0].record_success(0.01, 'eth_blockNumber')
+
+    started = time.perf_counter()
+    assert rpc_request(client, 'eth_blockNumber', []) == hex(100)
+    assert time.perf_counter() - started < 0.5
+    slow = client.endpoints[0]
+    assert slow.hedges == 1
+    # Losing the race is not a failure of the endpoint
+    assert slow.failures == 0 and slow.available()
+    assert backup.calls == 1
+
+
+def test_failed_primary_fails_over_on_the_calling_thread(start_node):
+    backup = start_node()
+    client = RpcClient([closed_port_url(), backup.url], pool_size=4, timeout=5, failure_threshold=1)
+    rank(client, 0.01, 0.02)
+    assert client.post(BLOCK_NUMBER, ('eth_blockNumber',)).json()['result'] == hex(100)
+    assert client.endpoints[0].failures == 1 and not client.endpoints[0].available()
+    # The open breaker sends the next request straight to the backup
+    assert client.ranked_endpoints()[0].url == backup.url
+
+
+def test_transactions_are_never_hedged(start_node):
+    primary, backup = start_node(latency_ms=300), start_node()
+    client = RpcClient([primary.url, backup.url], pool_size=4, timeout=5, hedge_min_delay=0.01)
+    rank(client, 0.01, 0.02)
+    for _ in range(5):
+        client.endpoints[0].record_success(0.01, 'eth_sendRawTransaction')
+    assert isinstance(rpc_request(client, 'eth_sendRawTransaction', ['0x00']), str)
+    assert backup.calls == 0
+
+
+def test_health_probes_do_not_set_the_hedge_delay(start_node):
+    primary, backup = start_node(), start_node()
+    client = RpcClient([primary.url, backup.url], pool_size=4, timeout=8, hedge_min_delay=0.05)
+    for _ in range(10):
+        assert client.check_health()
+    endpoint = client.endpoints[0]
+    assert endpoint.ewma is not None
+    assert endpoint.p95('eth_getLogs') is None
+    # Without samples of its own, a method is hedged only after a quarter of the timeout
+    assert client.hedge_delay(endpoint, 'eth_getLogs') == 2
+
+
+def test_hedges_stay_within_the_budget(start_node):
+    primary, backup = start_node(latency_ms=200), start_node()
+    client = RpcClient([primary.url, backup.url], pool_size=8, timeout=5, hedge_min_delay=0.01, hedge_budget=0)
+    rank(client, 0.01, 0.02)
+    for _ in range(5):
+        client.endpoints[0].record_success(0.01, 'eth_blockNumber')
+    concurrent_block_numbers(client, 4)
+    # One hedge from the starting token, then the budget is spent
+    assert backup.calls == 1 and primary.calls == 4
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from web3 import Web3
+
+from benchmarks.fake_node import contract_address
+from rpc_clients import RpcClient
+from tx_sender import TxError, TxSender
+
+PRIVATE_KEY = '0x' + '11' * 32
+SENDER = '0x19E7E376E7C213B7E7e7e46cc70A5dD086DAff2A'
+SCOPE = '31337:test'
+
+
+def transfer_call(data='0xa9059cbb'):
+    return {'to': Web3.to_checksum_address(contract_address(0)), 'data': data, 'value': 0}
+
+
+def test_nonces_are_consecutive_and_read_from_the_node_once(start_node):
+    node = start_node()
+    client = RpcClient(node.url, pool_size=4, timeout=5)
+    sender = TxSender()
+    with ThreadPoolExecutor(8) as pool:
+        firsts = list(pool.map(lambda _: sender.nonces.reserve(client, SCOPE, SENDER, 3), range(8)))
+    # The fake node reports 5 transactions sent so far
+    assert sorted(firsts) == list(range(5, 5 + 8 * 3, 3))
+    assert node.methods['eth_getTransactionCount'] == 1
+
+
+def test_send_assigns_nonces_in_order(start_node):
+    node = start_node()
+    client = RpcClient(node.url, pool_size=4, timeout=5)
+    results, stats = TxSender().send(client, SCOPE, PRIVATE_KEY, [transfer_call()] * 3)
+    assert [result['nonce'] for result in results] == [5, 6, 7]
+    assert stats['submitted'] == 3
+    assert node.methods['eth_sendRawTransaction'] == 3
+
+
+def test_signing_failure_resyncs_the_reserved_nonces(start_node):
+    node = start_node()
+    client = RpcClient(node.url, pool_size=4, timeout=5)
+    sender = TxSender()
+    with pytest.raises(TxError, match='Could not sign transaction 1'):
+        sender.send(client, SCOPE, PRIVATE_KEY, [transfer_call(), transfer_call('0xnot-hex')])
+    assert 'eth_sendRawTransaction' not in node.methods
+    # Nothing went out, so the next batch starts again from the node's count
+    results, _ = sender.send(client, SCOPE, PRIVATE_KEY, [transfer_call()])
+    assert results[0]['nonce'] == 5
+    assert node.methods['eth_getTransactionCount'] == 2
@@ -0,0 +1,224 @@
+import threading
+import time
+
+from eth_account import Account
+
+from rpc_batch import RpcError, batch_request
+
+# Used when eth_estimateGas fails, e.g. for a call that depends on an earlier, still pending one
+DEFAULT_GAS_LIMIT = 2_000_000
+# Head room on top of eth_estimateGas, which is exact for the state it was run against
+GAS_ESTIMATE_MARGIN = 1.2
+DEFAULT_PRIORITY_FEE = 10 ** 9
+
+
+class TxError(Exception):
+    pass
+
+
+class NonceManager:
+    """Hands out consecutive nonces per (network scope, sender) without asking the node each time.
+
+    The first nonce comes from eth_getTransactionCount(..., 'pending'); later ones are
+    counted locally, so concurrent submissions from one key never collide. Callers
+    resync() after a failed send so the next reservation re-reads the node.
+    """
+
+    def __init__(self):
+        self.next_nonces = {}  # (scope, address) -> next nonce
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self.lock:
+            return self.locks.setdefault(key, threading.Lock())
+
+    def reserve(self, client, scope, address, count=1):
+        """Returns the first of `count` consecutive nonces reserved for `address`."""
+        key = (scope, address.lower())
+        with self._key_lock(key):
+            nonce = self.next_nonces.get(key)
+            if nonce is None:
+                raw = batch_request(client, [('eth_getTransactionCount', [address, 'pending'])])[0]
+                if isinstance(raw, RpcError):
+                    raise TxError(f"Could not read the nonce of {address}: {raw}")
+                nonce = int(raw, 16)
+            self.next_nonces[key] = nonce + count
+            return nonce
+
+    def resync(self, scope, address):
+        key = (scope, address.lower())
+        with self._key_lock(key):
+            self.next_nonces.pop(key, None)
+
+    def drop_scopes(self, prefix):
+        with self.lock:
+            for key in [k for k in self.next_nonces if k[0].startswith(prefix)]:
+                del self.next_nonces[key]
+
+
+class TxSender:
+    """Builds, signs and submits contract transactions.
+
+    Fees follow EIP-1559 when the chain has a base fee (legacy gasPrice otherwise)
+    and are cached for `fee_ttl` seconds; gas estimates are cached per exact call
+    for `estimate_ttl` seconds. Signing is local, and a batch of transactions is
+    submitted as a single JSON-RPC batch of eth_sendRawTransaction.
+    """
+
+    def __init__(self, fee_ttl=3, estimate_ttl=30, receipt_poll_interval=0.5):
+        self.fee_ttl = fee_ttl
+        self.estimate_ttl = estimate_ttl
+        self.receipt_poll_interval = receipt_poll_interval
+        self.nonces = NonceManager()
+        self.fees = {}  # scope -> (fee fields, expires_at)
+        self.estimates = {}  # (scope, from, to, data, value) -> (gas, expires_at)
+        self.lock = threading.Lock()
+
+    # --- Fees and gas ---
+
+    def fee_fields(self, client, scope):
+        """{'maxFeePerGas', 'maxPriorityFeePerGas'} or {'gasPrice'} for new transactions."""
+        with self.lock:
+            cached = self.fees.get(scope)
+            if cached and cached[1] > time.time():
+                return cached[0]
+        latest, priority_fee, gas_price = batch_request(client, [
+            ('eth_getBlockByNumber', ['latest', False]),
+            ('eth_maxPriorityFeePerGas', []),
+            ('eth_gasPrice', []),
+        ])
+        if isinstance(latest, dict) and latest.get('baseFeePerGas'):
+            base_fee = int(latest['baseFeePerGas'], 16)
+            tip = int(priority_fee, 16) if isinstance(priority_fee, str) else DEFAULT_PRIORITY_FEE
+            # Stays valid through several consecutive full blocks of base fee increases
+            fields = {'maxFeePerGas': 2 * base_fee + tip, 'maxPriorityFeePerGas': tip}
+        elif isinstance(gas_price, str):
+            fields = {'gasPrice': int(gas_price, 16)}
+        else:
+            raise TxError(f"Could not read gas fees: {gas_price}")
+        with self.lock:
+            self.fees[scope] = (fields, time.time() + self.fee_ttl)
+        return fields
+
+    def estimate_gas(self, client, scope, sender, txs):
+        """Gas limits for `txs` ({'to', 'data', 'value'} dicts), estimating uncached ones in one batch.
+
+        Returns a list of (gas, estimated) where `estimated` is False if the node could
+        not estimate the call and DEFAULT_GAS_LIMIT is used instead.
+        """
+        now = time.time()
+        keys = [(scope, sender, tx['to'], tx['data'], tx.get('value', 0)) for tx in txs]
+        results = [None] * len(txs)
+        with self.lock:
+            for i, key in enumerate(keys):
+                cached = self.estimates.get(key)
+                if cached and cached[1] > now:
+                    results[i] = (cached[0], True)
+        missing = [i for i, result in enumerate(results) if result is None]
+        # Identical calls in one batch only need one estimate
+        unique = list(dict.fromkeys(keys[i] for i in missing))
+        estimates = batch_request(client, [
+            ('eth_estimateGas', [{'from': sender, 'to': to, 'data': data, 'value': hex(value)}])
+            for _, _, to, data, value in unique
+        ])
+        by_key = {}
+        with self.lock:
+            for key, raw in zip(unique, estimates):
+                if isinstance(raw, RpcError) or raw is None:
+                    by_key[key] = (DEFAULT_GAS_LIMIT, False)
+                    continue
+                gas = int(int(raw, 16) * GAS_ESTIMATE_MARGIN)
+                by_key[key] = (gas, True)
+                self.estimates[key] = (gas, now + self.estimate_ttl)
+        for i in missing:
+            results[i] = by_key[keys[i]]
+        return results
+
+    # --- Submission ---
+
+    def send(self, client, scope, private_key, txs, wait=False, timeout=60):
+        """Signs and submits `txs` ({'to', 'data', 'value'} dicts) in order from one key.
+
+        Returns (results, stats): one dict per transaction with its hash, nonce, gas and
+        any error (plus status/block when `wait` is set), and throughput figures.
+        """
+        account = Account.from_key(private_key)
+        started = time.time()
+        chain_id = client.chain_id()
+        fees = self.fee_fields(client, scope)
+        gas_limits = self.estimate_gas(client, scope, account.address, txs)
+
+        first_nonce = self.nonces.reserve(client, scope, account.address, len(txs))
+        results, raw_txs = [], []
+        try:
+            for i, (tx, (gas, estimated)) in enumerate(zip(txs, gas_limits)):
+                nonce = first_nonce + i
+                try:
+                    signed = Account.sign_transaction({
+                        'to': tx['to'], 'data': tx['data'], 'value': tx.get('value', 0),
+                        'nonce': nonce, 'gas': gas, 'chainId': chain_id, **fees,
+                    }, private_key)
+                except Exception as e:
+                    raise TxError(f"Could not sign transaction {i}: {e}") from e
+                raw_txs.append('0x' + bytes(signed.raw_transaction).hex())
+                results.append({'index': i, 'nonce': nonce, 'gas': gas, 'gas_estimated': estimated,
+                                'hash': '0x' + bytes(signed.hash).hex()})
+
+            sent = batch_request(client, [('eth_sendRawTransaction', [raw]) for raw in raw_txs])
+        except Exception:
+            # None of the reserved nonces went out; the next reservation re-reads the node
+            self.nonces.resync(scope, account.address)
+            raise
+        failed = False
+        for result, outcome in zip(results, sent):
+            if isinstance(outcome, RpcError):
+                result['error'] = str(outcome)
+                failed = True
+        if failed:
+            # Later nonces may now be gapped; let the node tell us where we really are
+            self.nonces.resync(scope, account.address)
+        submitted = time.time()
+
+        stats = {
+            'submitted': sum(1 for result in results if 'error' not in result),
+            'failed': sum(1 for result in results if 'error' in result),
+            'submit_seconds': round(submitted - started, 3),
+            'submit_tx_per_sec': round(len(txs) / max(submitted - started, 1e-6), 1),
+        }
+        if wait:
+            pending = [result for result in results if 'error' not in result]
+            self._wait_for_receipts(client, pending, timeout)
+            finished = time.time()
+            confirmed = [result for result in pending if 'status' in result]
+            stats.update({
+                'confirmed': len(confirmed),
+                'reverted': sum(1 for result in confirmed if result['status'] == 0),
+                'timed_out': len(pending) - len(confirmed),
+                'total_seconds': round(finished - started, 3),
+                'confirmed_tx_per_sec': round(len(confirmed) / max(finished - started, 1e-6), 1),
+            })
+        return results, stats
+
+    def _wait_for_receipts(self, client, pending, timeout):
+        """Polls all outstanding receipts in one batch per round until mined or `timeout`."""
+        deadline = time.time() + timeout
+        while pending and time.time() < deadline:
+            receipts = batch_request(client, [('eth_getTransactionReceipt', [r['hash']]) for r in pending])
+            still_pending = []
+            for result, receipt in zip(pending, receipts):
+                if receipt is None or isinstance(receipt, RpcError):
+                    still_pending.append(result)
+                    continue
+                result.update({
+                    'status': int(receipt['status'], 16),
+                    'block': int(receipt['blockNumber'], 16),
+                    'gas_used': int(receipt['gasUsed'], 16),
+                })
+            pending = still_pending
+            if pending:
+                time.sleep(self.receipt_poll_interval)
+
+
+# Global instance
+tx_sender = TxSender()